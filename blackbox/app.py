@@ -1,7 +1,7 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+import os
+import math
 import json
-import base64
-import hashlib
 import random
 import time
 from datetime import datetime
@@ -9,13 +9,47 @@ import re
 
 from flask_cors import CORS
 
+from sessions import open_store
+import primes
+from primes import is_prime, get_primes_from, iter_primes_from
+from operations import BatchRunner, transform_data, filter_content, run_cipher
+
 app = Flask(__name__)
 CORS(app)
 
 
 # Global state for some endpoints
 request_counter = 0
-user_sessions = {}
+# Session backend: 'memory' (per process) or 'sqlite' (shared by worker processes)
+user_sessions = open_store(
+    os.environ.get('BLACKBOX_SESSION_BACKEND', 'memory'),
+    path=os.environ.get('BLACKBOX_SESSION_DB'),
+    shards=int(os.environ.get('BLACKBOX_SESSION_SHARDS', 16)),
+    max_items=int(os.environ.get('BLACKBOX_SESSION_MAX_ITEMS', 1000)),
+    ttl=float(os.environ.get('BLACKBOX_SESSION_TTL', 3600)),
+    max_sessions=int(os.environ.get('BLACKBOX_MAX_SESSIONS', 10000)),
+    max_bytes=int(os.environ.get('BLACKBOX_SESSION_MAX_MB', 64)) * 1024 * 1024,
+)
+
+# /api/sequence limits: terms in a buffered response, terms in a streamed one,
+# and digits in the largest term (Python refuses to print bigger ints anyway)
+SEQUENCE_MAX_COUNT = int(os.environ.get('BLACKBOX_SEQUENCE_MAX_COUNT', 10000))
+SEQUENCE_STREAM_MAX_COUNT = int(os.environ.get('BLACKBOX_SEQUENCE_STREAM_MAX_COUNT', 10_000_000))
+SEQUENCE_MAX_DIGITS = int(os.environ.get('BLACKBOX_SEQUENCE_MAX_DIGITS', 4300))
+# Seeds are capped for every pattern, and primes past the sieve (each costing
+# Miller-Rabin tests on every candidate) are capped per request
+SEQUENCE_MAX_SEED_DIGITS = int(os.environ.get('BLACKBOX_SEQUENCE_MAX_SEED_DIGITS', 30))
+SEQUENCE_PRIMES_MAX_COUNT = int(os.environ.get('BLACKBOX_SEQUENCE_PRIMES_MAX_COUNT', 1000))
+# Terms per chunk of a streamed sequence
+SEQUENCE_CHUNK = 1024
+
+# /api/batch: operations per request, and the batch size from which they are
+# spread over worker processes (BLACKBOX_BATCH_WORKERS, default one per CPU)
+BATCH_MAX_OPS = int(os.environ.get('BLACKBOX_BATCH_MAX_OPS', 10000))
+batch_runner = BatchRunner(
+    workers=int(os.environ.get('BLACKBOX_BATCH_WORKERS', 0)) or None,
+    pool_min=int(os.environ.get('BLACKBOX_BATCH_POOL_MIN', 2000)),
+)
 
 @app.route('/api/echo', methods=['POST'])
 def mysterious_echo():
@@ -45,71 +79,16 @@ def data_transformer():
     """
     Transforms data based on mysterious rules
     """
-    data = request.get_json()
-    if not data:
-        return jsonify({"error": "Missing data"}), 400
-    
-    text = data.get('input', '')
-    
-    # Hidden behavior: Different transformations based on input length
-    length = len(text)
-    
-    if length < 5:
-        # ROT13 for short inputs
-        result = ''.join(chr((ord(c) - 97 + 13) % 26 + 97) if c.islower() 
-                        else chr((ord(c) - 65 + 13) % 26 + 65) if c.isupper() 
-                        else c for c in text)
-    elif length < 15:
-        # Base64 encode for medium inputs
-        result = base64.b64encode(text.encode()).decode()
-    elif length < 30:
-        # Pig Latin for longer inputs
-        words = text.split()
-        result = ' '.join(word[1:] + word[0] + 'ay' if word and word[0] not in 'aeiou' 
-                         else word + 'way' for word in words)
-    else:
-        # Hash for very long inputs
-        result = hashlib.md5(text.encode()).hexdigest()
-    
-    return jsonify({
-        "original": text,
-        "transformed": result,
-        "method": "classified"
-    })
+    body, status = transform_data(request.get_json())
+    return jsonify(body), status
 
 @app.route('/api/filter', methods=['POST'])
 def content_filter():
     """
     Filters content based on hidden criteria
     """
-    data = request.get_json()
-    if not data:
-        return jsonify({"error": "No content to filter"}), 400
-    
-    content = data.get('content', '')
-    filter_type = data.get('type', 'default')
-    
-    # Hidden behavior: Different filters based on type and content
-    if filter_type == 'numbers':
-        # Only keeps numbers
-        result = ''.join(c for c in content if c.isdigit())
-    elif filter_type == 'vowels':
-        # Removes vowels
-        result = ''.join(c for c in content if c.lower() not in 'aeiou')
-    elif filter_type == 'reverse':
-        # Keeps only consonants but reverses them
-        consonants = ''.join(c for c in content if c.isalpha() and c.lower() not in 'aeiou')
-        result = consonants[::-1]
-    else:
-        # Default: removes words with even length
-        words = content.split()
-        result = ' '.join(word for word in words if len(word) % 2 != 0)
-    
-    return jsonify({
-        "original": content,
-        "filtered": result,
-        "characters_removed": len(content) - len(result)
-    })
+    body, status = filter_content(request.get_json())
+    return jsonify(body), status
 
 @app.route('/api/sequence', methods=['POST'])
 def sequence_generator():
@@ -122,32 +101,131 @@ def sequence_generator():
     
     seed = data.get('seed', 1)
     count = data.get('count', 5)
+    stream = data.get('stream')
+    
+    if stream not in (None, False, 'ndjson', 'json'):
+        return jsonify({"error": "stream must be 'ndjson' or 'json'"}), 400
     
     # Hidden behavior: Different sequences based on seed value
-    if seed % 2 == 0:
+    pattern = sequence_pattern(seed)
+    
+    error = check_sequence_limits(seed, count, pattern, bool(stream))
+    if error:
+        return jsonify({"error": error}), 400
+    
+    hint = f"Pattern detected: {len(pattern)} characters"
+    if stream:
+        return stream_sequence(seed, count, pattern, hint, stream)
+    
+    if pattern == "fibonacci_variant":
         # Fibonacci for even seeds
         sequence = fibonacci_sequence(count, seed)
-        pattern = "fibonacci_variant"
-    elif seed % 3 == 0:
+    elif pattern == "exponential":
         # Powers of seed for multiples of 3
         sequence = [seed ** i for i in range(count)]
-        pattern = "exponential"
-    elif seed % 5 == 0:
+    elif pattern == "primes":
         # Prime numbers starting from seed
         sequence = get_primes_from(seed, count)
-        pattern = "primes"
     else:
         # Collatz-like sequence
         sequence = collatz_variant(seed, count)
-        pattern = "chaotic"
     
     return jsonify({
         "sequence": sequence,
         "seed": seed,
         "count": count,
-        "hint": f"Pattern detected: {len(pattern)} characters"
+        "hint": hint
     })
 
+def sequence_pattern(seed):
+    if seed % 2 == 0:
+        return "fibonacci_variant"
+    elif seed % 3 == 0:
+        return "exponential"
+    elif seed % 5 == 0:
+        return "primes"
+    else:
+        return "chaotic"
+
+def check_sequence_limits(seed, count, pattern, stream):
+    """Return why a sequence request is refused, or None."""
+    if stream and not (isinstance(seed, int) and isinstance(count, int)):
+        return "Streamed sequences need an integer seed and count"
+    if isinstance(seed, (int, float)) and abs(seed) >= 10 ** SEQUENCE_MAX_SEED_DIGITS:
+        return f"seed must have at most {SEQUENCE_MAX_SEED_DIGITS} digits"
+    limit = SEQUENCE_STREAM_MAX_COUNT if stream else SEQUENCE_MAX_COUNT
+    if count > limit:
+        hint = "" if stream else "; use \"stream\": \"ndjson\" for longer sequences"
+        return f"count must be at most {limit}{hint}"
+    if pattern == "primes" and isinstance(seed, (int, float)):
+        # Only whole seeds are multiples of 5, so this is never trial division.
+        # The primes still in the sieve from seed on are cheap; x / ln x
+        # undercounts them, so the estimate errs on the strict side
+        in_sieve = primes.MAX_SIEVE / math.log(primes.MAX_SIEVE) - (seed / math.log(seed) if seed > 2 else 0)
+        limit = SEQUENCE_PRIMES_MAX_COUNT + max(int(in_sieve), 0)
+        if count > limit:
+            return f"count must be at most {limit} for this seed"
+    # Powers and Fibonacci numbers grow by a fixed factor per term, so the
+    # size of the last one is known before computing anything
+    growth = {"exponential": abs(seed), "fibonacci_variant": (1 + 5 ** 0.5) / 2}.get(pattern)
+    if growth and seed and count > 1:
+        digits = math.log10(abs(seed)) * (pattern == "fibonacci_variant") + (count - 1) * math.log10(growth)
+        if digits > SEQUENCE_MAX_DIGITS:
+            return f"Terms would exceed {SEQUENCE_MAX_DIGITS} digits; lower count"
+    return None
+
+def iter_sequence(seed, count, pattern):
+    """Yield the same terms as the buffered sequence, one at a time (integer seed and count)."""
+    if pattern == "fibonacci_variant":
+        if count > 0:
+            yield seed
+        previous, current = seed, seed
+        for _ in range(count - 1):
+            yield current
+            previous, current = current, previous + current
+    elif pattern == "exponential":
+        power = 1
+        for _ in range(count):
+            yield power
+            power *= seed
+    elif pattern == "primes":
+        if count > 0:
+            for i, prime in enumerate(iter_primes_from(seed), 1):
+                yield prime
+                if i >= count:
+                    break
+    else:
+        current = seed
+        for i in range(max(count, 1)):
+            if i:
+                current = current // 2 if current % 2 == 0 else current * 3 + 1
+            yield current
+
+def stream_sequence(seed, count, pattern, hint, stream):
+    """Stream a sequence as NDJSON (a header line, then one term per line) or as the buffered JSON document."""
+    # Sorted keys and compact separators, as jsonify writes them outside debug mode
+    header = app.json.dumps({"seed": seed, "count": count, "hint": hint}, separators=(',', ':'))
+    
+    def generate():
+        terms = iter_sequence(seed, count, pattern)
+        if stream == 'ndjson':
+            yield header + '\n'
+            separator, tail = '\n', '\n'
+        else:
+            yield header[:-1] + ',"sequence":['
+            separator, tail = ',', ']}\n'
+        first = True
+        while True:
+            chunk = [str(term) for _, term in zip(range(SEQUENCE_CHUNK), terms)]
+            if not chunk:
+                break
+            yield ('' if first else separator) + separator.join(chunk)
+            first = False
+        yield '' if first and stream == 'ndjson' else tail
+    
+    mimetype = 'application/x-ndjson' if stream == 'ndjson' else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
 @app.route('/api/memory', methods=['POST'])
 def memory_bank():
     """
@@ -162,50 +240,43 @@ def memory_bank():
     session_id = data.get('session', 'default')
     action = data.get('action', 'store')
     
-    if session_id not in user_sessions:
-        user_sessions[session_id] = {
-            'data': [],
-            'access_count': 0,
-            'creation_time': time.time()
-        }
-    
-    session = user_sessions[session_id]
-    session['access_count'] += 1
-    
     if action == 'store':
         value = data.get('value')
-        # Hidden behavior: corrupts data after 10 accesses
-        if session['access_count'] > 10:
-            if isinstance(value, str):
-                value = ''.join(random.choice('!@#$%') if random.random() < 0.3 else c for c in value)
         
-        session['data'].append({
-            'value': value,
-            'timestamp': time.time(),
-            'corrupted': session['access_count'] > 10
-        })
+        def make_item(access_count):
+            # Hidden behavior: corrupts data after 10 accesses
+            corrupted = access_count > 10
+            stored = value
+            if corrupted and isinstance(stored, str):
+                stored = ''.join(random.choice('!@#$%') if random.random() < 0.3 else c for c in stored)
+            return {
+                'value': stored,
+                'timestamp': time.time(),
+                'corrupted': corrupted
+            }
+        
+        total_items, access_count = user_sessions.store(session_id, make_item)
         
         return jsonify({
             "status": "stored",
             "session": session_id,
-            "total_items": len(session['data']),
-            "warnings": session['access_count']
+            "total_items": total_items,
+            "warnings": access_count
         })
     
     elif action == 'retrieve':
         # Hidden behavior: randomly shuffles data after session gets old
-        age = time.time() - session['creation_time']
-        if age > 300:  # 5 minutes
-            random.shuffle(session['data'])
+        items, age = user_sessions.retrieve(session_id, shuffle_after=300)  # 5 minutes
         
         return jsonify({
-            "data": session['data'],
+            "data": items,
             "session": session_id,
             "age_seconds": int(age),
             "integrity": "questionable" if age > 300 else "stable"
         })
     
     else:
+        user_sessions.touch(session_id)
         return jsonify({"error": "Unknown action"}), 400
 
 @app.route('/api/validator', methods=['POST'])
@@ -258,60 +329,28 @@ def cipher_machine():
     """
     Encodes/decodes text with mysterious cipher
     """
+    body, status = run_cipher(request.get_json())
+    return jsonify(body), status
+
+@app.route('/api/batch', methods=['POST'])
+def batch_processor():
+    """
+    Runs many transform, filter and cipher operations in one request
+    """
     data = request.get_json()
-    if not data:
-        return jsonify({"error": "No cipher data"}), 400
-    
-    text = data.get('text', '')
-    operation = data.get('operation', 'encode')
-    key = data.get('key', 0)
-    
-    # Hidden behavior: Different ciphers based on key value
-    if key == 0:
-        # Simple Caesar cipher
-        shift = 3
-        if operation == 'encode':
-            result = caesar_cipher(text, shift)
-        else:
-            result = caesar_cipher(text, -shift)
-    
-    elif key % 7 == 0:
-        # Atbash cipher (A=Z, B=Y, etc.)
-        result = atbash_cipher(text)
-    
-    elif key % 4 == 0:
-        # Reverse + ROT13
-        if operation == 'encode':
-            result = text[::-1]
-            result = ''.join(chr((ord(c) - 97 + 13) % 26 + 97) if c.islower() 
-                           else chr((ord(c) - 65 + 13) % 26 + 65) if c.isupper() 
-                           else c for c in result)
-        else:
-            result = ''.join(chr((ord(c) - 97 + 13) % 26 + 97) if c.islower() 
-                           else chr((ord(c) - 65 + 13) % 26 + 65) if c.isupper() 
-                           else c for c in text)
-            result = result[::-1]
-    
-    else:
-        # XOR with key
-        result = ''.join(chr(ord(c) ^ (key % 256)) for c in text)
+    operations = data.get('operations') if isinstance(data, dict) else data
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "Expected a list of operations"}), 400
+    if len(operations) > BATCH_MAX_OPS:
+        return jsonify({"error": f"At most {BATCH_MAX_OPS} operations per batch"}), 413
     
+    # Each result is what the endpoint would have answered: {"status", "body"}
     return jsonify({
-        "result": result,
-        "operation": operation,
-        "key_type": get_key_type(key),
-        "reversible": key != 0
+        "count": len(operations),
+        "results": batch_runner.run(operations)
     })
 
-# Helper functions
-def is_prime(n):
-    if n < 2:
-        return False
-    for i in range(2, int(n ** 0.5) + 1):
-        if n % i == 0:
-            return False
-    return True
-
+# Helper functions (is_prime and get_primes_from live in primes.py, the ciphers in operations.py)
 def fibonacci_sequence(count, start=1):
     if count <= 0:
         return []
@@ -324,17 +363,6 @@ def fibonacci_sequence(count, start=1):
     
     return sequence[:count]
 
-def get_primes_from(start, count):
-    primes = []
-    candidate = max(start, 2)
-    
-    while len(primes) < count:
-        if is_prime(candidate):
-            primes.append(candidate)
-        candidate += 1
-    
-    return primes
-
 def collatz_variant(start, count):
     sequence = [start]
     current = start
@@ -348,38 +376,6 @@ def collatz_variant(start, count):
     
     return sequence
 
-def caesar_cipher(text, shift):
-    result = ""
-    for char in text:
-        if char.isalpha():
-            base = ord('A') if char.isupper() else ord('a')
-            result += chr((ord(char) - base + shift) % 26 + base)
-        else:
-            result += char
-    return result
-
-def atbash_cipher(text):
-    result = ""
-    for char in text:
-        if char.isalpha():
-            if char.isupper():
-                result += chr(ord('Z') - (ord(char) - ord('A')))
-            else:
-                result += chr(ord('z') - (ord(char) - ord('a')))
-        else:
-            result += char
-    return result
-
-def get_key_type(key):
-    if key == 0:
-        return "default"
-    elif key % 7 == 0:
-        return "reflection"
-    elif key % 4 == 0:
-        return "compound"
-    else:
-        return "numeric"
-
 @app.route('/api/status', methods=['GET'])
 def api_status():
     """
@@ -391,7 +387,9 @@ def api_status():
         "status": "operational",
         "total_requests": request_counter,
         "active_sessions": len(user_sessions),
-        "endpoints": 7,
+        "session_memory": user_sessions.stats(),
+        "prime_cache": primes.stats(),
+        "endpoints": 8,
         "hint": "Not all behaviors are immediately obvious",
         "challenge": "Reverse engineer each endpoint's hidden logic"
     })
@@ -0,0 +1,93 @@
+"""
+Throughput benchmark for /api/batch.
+
+Serves the app on a local port and runs the same mix of transform, filter
+and cipher operations as one request each and as batches, reporting
+operations per second.
+
+    python bench_batch.py
+    python bench_batch.py --ops 20000 --batch-sizes 100 1000 10000 --workers 4
+"""
+
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+import http.client
+
+from werkzeug.serving import make_server
+
+import app as blackbox
+
+
+WORDS = ['alpha', 'Beta', 'gamma', 'delta 42', 'echo', 'fox', 'umbrella', 'Io', '7 seas', 'quiet']
+
+
+def make_operations(count, seed=0):
+    """A reproducible mix of the three operations, with inputs of every length class."""
+    rng = random.Random(seed)
+    operations = []
+    for _ in range(count):
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 8)))
+        op = rng.choice(('transform', 'filter', 'cipher'))
+        if op == 'transform':
+            data = {'input': text}
+        elif op == 'filter':
+            data = {'content': text, 'type': rng.choice(('numbers', 'vowels', 'reverse', 'default'))}
+        else:
+            data = {'text': text, 'key': rng.choice((0, 7, 8, 13)), 'operation': rng.choice(('encode', 'decode'))}
+        operations.append({'op': op, 'data': data})
+    return operations
+
+
+def post(connection, path, body):
+    connection.request('POST', path, json.dumps(body), {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    payload = response.read()
+    if response.status not in (200, 400):
+        raise SystemExit(f"{path}: HTTP {response.status}")
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark single-operation requests against /api/batch')
+    parser.add_argument('--ops', type=int, default=10000, help='Operations per run (default: 10000)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[100, 1000, 10000],
+                        help='Operations per batch request')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Worker processes for batches from --pool-min up (default: one per CPU)')
+    parser.add_argument('--pool-min', type=int, default=blackbox.batch_runner.pool_min,
+                        help='Batch size from which the worker pool is used')
+    args = parser.parse_args()
+
+    blackbox.BATCH_MAX_OPS = max(args.batch_sizes + [blackbox.BATCH_MAX_OPS])
+    blackbox.batch_runner = blackbox.BatchRunner(workers=args.workers or None, pool_min=args.pool_min)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, blackbox.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+    operations = make_operations(args.ops)
+
+    print(f"{args.ops} operations, {blackbox.batch_runner.workers} worker(s) from {args.pool_min} per batch")
+    print(f"{'batch':>7} {'requests':>9} {'seconds':>9} {'ops/s':>10}")
+    start = time.perf_counter()
+    for operation in operations:
+        post(http.client.HTTPConnection('127.0.0.1', port), '/api/' + operation['op'], operation['data'])
+    elapsed = time.perf_counter() - start
+    print(f"{'single':>7} {args.ops:>9} {elapsed:>9.2f} {args.ops / elapsed:>10.0f}")
+
+    for size in args.batch_sizes:
+        start = time.perf_counter()
+        requests = 0
+        for i in range(0, len(operations), size):
+            post(http.client.HTTPConnection('127.0.0.1', port), '/api/batch', operations[i:i + size])
+            requests += 1
+        elapsed = time.perf_counter() - start
+        print(f"{size:>7} {requests:>9} {elapsed:>9.2f} {args.ops / elapsed:>10.0f}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Time-to-first-byte benchmark for /api/sequence.
+
+Serves the app on a local port and requests growing sequences buffered
+(the whole JSON body at once) and streamed (NDJSON and chunked JSON),
+reporting time to the first body byte, total time, size and the peak
+memory allocated while the response was produced.
+
+    python bench_sequence.py
+    python bench_sequence.py --seed 5 --counts 1000 100000 1000000
+"""
+
+import json
+import time
+import logging
+import argparse
+import threading
+import tracemalloc
+import http.client
+
+from werkzeug.serving import make_server
+
+import app as blackbox
+
+
+def peak_mb():
+    return tracemalloc.get_traced_memory()[1] / 1e6 if tracemalloc.is_tracing() else None
+
+
+def fetch(port, body):
+    """POST to /api/sequence; return (status, seconds to first body byte, total seconds, bytes, peak MB)."""
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    start = time.perf_counter()
+    connection.request('POST', '/api/sequence', json.dumps(body), {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    first = response.read1(1)
+    ttfb = time.perf_counter() - start
+    size = len(first)
+    while True:
+        chunk = response.read1(65536)
+        if not chunk:
+            break
+        size += len(chunk)
+    total = time.perf_counter() - start
+    # Read the peak before closing: werkzeug drains the socket after each
+    # response with a 10 MB read, which the close wakes up
+    peak = peak_mb()
+    connection.close()
+    time.sleep(0.05)
+    return response.status, ttfb, total, size, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark buffered and streamed /api/sequence responses')
+    parser.add_argument('--seed', type=int, default=7, help='Sequence seed (default: 7, the chaotic pattern)')
+    parser.add_argument('--counts', type=int, nargs='+', default=[1000, 10000, 100000, 1000000],
+                        help='Sequence lengths to request')
+    parser.add_argument('--no-memory', action='store_true', help='Skip tracemalloc (it slows every request)')
+    args = parser.parse_args()
+
+    # Lift the buffered limit so both modes can be compared at every size
+    blackbox.SEQUENCE_MAX_COUNT = max(args.counts)
+    # One request at a time, so each peak belongs to a single response
+    server = make_server('127.0.0.1', 0, blackbox.app)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    if not args.no_memory:
+        tracemalloc.start()
+    print(f"seed {args.seed}, pattern {blackbox.sequence_pattern(args.seed)}")
+    print(f"{'count':>9} {'mode':<9} {'TTFB ms':>9} {'total ms':>10} {'MB':>8} {'peak MB':>8}")
+    for count in args.counts:
+        for mode in (None, 'ndjson', 'json'):
+            body = {'seed': args.seed, 'count': count}
+            if mode:
+                body['stream'] = mode
+            if not args.no_memory:
+                tracemalloc.reset_peak()
+            status, ttfb, total, size, peak = fetch(port, body)
+            peak = '' if peak is None else f"{peak:.1f}"
+            if status != 200:
+                print(f"{count:>9} {mode or 'buffered':<9} HTTP {status}")
+                continue
+            print(f"{count:>9} {mode or 'buffered':<9} {ttfb * 1000:>9.1f} {total * 1000:>10.1f} "
+                  f"{size / 1e6:>8.2f} {peak:>8}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Load benchmark for the /api/memory session backends.
+
+Runs the same mixed store / retrieve workload against the in-memory and
+SQLite stores from several threads (and, for SQLite, several processes
+sharing one database) and reports throughput and latency percentiles.
+
+    python bench_sessions.py --threads 8 --ops 20000
+    python bench_sessions.py --backend sqlite --processes 4
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+import threading
+import multiprocessing
+
+from sessions import open_store
+
+
+def make_item(access_count):
+    return {'value': 'x' * 32, 'timestamp': time.time(), 'corrupted': access_count > 10}
+
+
+def run_worker(store, ops, sessions, retrieve_ratio, seed, latencies):
+    rng = random.Random(seed)
+    for _ in range(ops):
+        session_id = f'session-{rng.randrange(sessions)}'
+        start = time.perf_counter()
+        if rng.random() < retrieve_ratio:
+            store.retrieve(session_id, shuffle_after=300)
+        else:
+            store.store(session_id, make_item)
+        latencies.append(time.perf_counter() - start)
+
+
+def run_process(backend, path, threads, ops, sessions, retrieve_ratio, seed, results):
+    """Run `threads` threads against one store; put (latencies, elapsed) on `results`."""
+    store = open_store(backend, path=path, max_items=100)
+    latencies = []
+    workers = [threading.Thread(target=run_worker,
+                                args=(store, ops // threads, sessions, retrieve_ratio, seed + i, latencies))
+               for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put((latencies, time.perf_counter() - start))
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def bench(backend, path, processes, threads, ops, sessions, retrieve_ratio):
+    results = multiprocessing.Queue()
+    if processes == 1:
+        run_process(backend, path, threads, ops, sessions, retrieve_ratio, 0, results)
+    else:
+        workers = [multiprocessing.Process(target=run_process,
+                                           args=(backend, path, threads, ops // processes, sessions,
+                                                 retrieve_ratio, i * 1000, results))
+                   for i in range(processes)]
+        for worker in workers:
+            worker.start()
+    latencies, elapsed = [], 0.0
+    for _ in range(processes):
+        process_latencies, process_elapsed = results.get()
+        latencies.extend(process_latencies)
+        elapsed = max(elapsed, process_elapsed)
+    if processes > 1:
+        for worker in workers:
+            worker.join()
+    latencies.sort()
+    return {
+        'ops': len(latencies),
+        'ops_per_second': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the session backends under concurrency')
+    parser.add_argument('--backend', choices=['memory', 'sqlite', 'both'], default='both')
+    parser.add_argument('--threads', type=int, default=8, help='Threads per process (default: 8)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Processes sharing the SQLite database (default: 1)')
+    parser.add_argument('--ops', type=int, default=20000, help='Operations in total (default: 20000)')
+    parser.add_argument('--sessions', type=int, default=1000, help='Distinct sessions (default: 1000)')
+    parser.add_argument('--retrieve-ratio', type=float, default=0.2,
+                        help='Share of operations that retrieve (default: 0.2)')
+    parser.add_argument('--db', help='SQLite database to use (default: a temporary file)')
+    args = parser.parse_args()
+
+    backends = ['memory', 'sqlite'] if args.backend == 'both' else [args.backend]
+    print(f"{args.ops} ops, {args.threads} thread(s) x {args.processes} process(es), "
+          f"{args.sessions} sessions, {args.retrieve_ratio:.0%} retrieves")
+    print(f"{'backend':<8} {'ops/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            # In-memory stores are per process, so sharing only applies to SQLite
+            processes = args.processes if backend == 'sqlite' else 1
+            path = args.db or os.path.join(tmp, 'sessions.sqlite3')
+            result = bench(backend, path, processes, args.threads, args.ops, args.sessions, args.retrieve_ratio)
+            print(f"{backend:<8} {result['ops_per_second']:>10.0f} {result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""
+Text operations behind /api/transform, /api/filter and /api/cipher.
+
+Each takes the request's JSON payload and returns (response body, status),
+so the endpoints and /api/batch share exactly the same logic. Large
+batches are split into chunks and run on a pool of worker processes.
+"""
+
+import os
+import base64
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Operations per task sent to a worker process
+BATCH_CHUNK = 1024
+
+
+def transform_data(data):
+    if not data:
+        return {"error": "Missing data"}, 400
+    
+    text = data.get('input', '')
+    
+    # Hidden behavior: Different transformations based on input length
+    length = len(text)
+    
+    if length < 5:
+        # ROT13 for short inputs
+        result = ''.join(chr((ord(c) - 97 + 13) % 26 + 97) if c.islower() 
+                        else chr((ord(c) - 65 + 13) % 26 + 65) if c.isupper() 
+                        else c for c in text)
+    elif length < 15:
+        # Base64 encode for medium inputs
+        result = base64.b64encode(text.encode()).decode()
+    elif length < 30:
+        # Pig Latin for longer inputs
+        words = text.split()
+        result = ' '.join(word[1:] + word[0] + 'ay' if word and word[0] not in 'aeiou' 
+                         else word + 'way' for word in words)
+    else:
+        # Hash for very long inputs
+        result = hashlib.md5(text.encode()).hexdigest()
+    
+    return {
+        "original": text,
+        "transformed": result,
+        "method": "classified"
+    }, 200
+
+def filter_content(data):
+    if not data:
+        return {"error": "No content to filter"}, 400
+    
+    content = data.get('content', '')
+    filter_type = data.get('type', 'default')
+    
+    # Hidden behavior: Different filters based on type and content
+    if filter_type == 'numbers':
+        # Only keeps numbers
+        result = ''.join(c for c in content if c.isdigit())
+    elif filter_type == 'vowels':
+        # Removes vowels
+        result = ''.join(c for c in content if c.lower() not in 'aeiou')
+    elif filter_type == 'reverse':
+        # Keeps only consonants but reverses them
+        consonants = ''.join(c for c in content if c.isalpha() and c.lower() not in 'aeiou')
+        result = consonants[::-1]
+    else:
+        # Default: removes words with even length
+        words = content.split()
+        result = ' '.join(word for word in words if len(word) % 2 != 0)
+    
+    return {
+        "original": content,
+        "filtered": result,
+        "characters_removed": len(content) - len(result)
+    }, 200
+
+def run_cipher(data):
+    if not data:
+        return {"error": "No cipher data"}, 400
+    
+    text = data.get('text', '')
+    operation = data.get('operation', 'encode')
+    key = data.get('key', 0)
+    
+    # Hidden behavior: Different ciphers based on key value
+    if key == 0:
+        # Simple Caesar cipher
+        shift = 3
+        if operation == 'encode':
+            result = caesar_cipher(text, shift)
+        else:
+            result = caesar_cipher(text, -shift)
+    
+    elif key % 7 == 0:
+        # Atbash cipher (A=Z, B=Y, etc.)
+        result = atbash_cipher(text)
+    
+    elif key % 4 == 0:
+        # Reverse + ROT13
+        if operation == 'encode':
+            result = text[::-1]
+            result = ''.join(chr((ord(c) - 97 + 13) % 26 + 97) if c.islower() 
+                           else chr((ord(c) - 65 + 13) % 26 + 65) if c.isupper() 
+                           else c for c in result)
+        else:
+            result = ''.join(chr((ord(c) - 97 + 13) % 26 + 97) if c.islower() 
+                           else chr((ord(c) - 65 + 13) % 26 + 65) if c.isupper() 
+                           else c for c in text)
+            result = result[::-1]
+    
+    else:
+        # XOR with key
+        result = ''.join(chr(ord(c) ^ (key % 256)) for c in text)
+    
+    return {
+        "result": result,
+        "operation": operation,
+        "key_type": get_key_type(key),
+        "reversible": key != 0
+    }, 200
+
+def caesar_cipher(text, shift):
+    result = ""
+    for char in text:
+        if char.isalpha():
+            base = ord('A') if char.isupper() else ord('a')
+            result += chr((ord(char) - base + shift) % 26 + base)
+        else:
+            result += char
+    return result
+
+def atbash_cipher(text):
+    result = ""
+    for char in text:
+        if char.isalpha():
+            if char.isupper():
+                result += chr(ord('Z') - (ord(char) - ord('A')))
+            else:
+                result += chr(ord('z') - (ord(char) - ord('a')))
+        else:
+            result += char
+    return result
+
+def get_key_type(key):
+    if key == 0:
+        return "default"
+    elif key % 7 == 0:
+        return "reflection"
+    elif key % 4 == 0:
+        return "compound"
+    else:
+        return "numeric"
+
+
+# Batch operation names and the endpoints they stand for
+OPERATIONS = {
+    "transform": transform_data,
+    "filter": filter_content,
+    "cipher": run_cipher,
+}
+
+
+def run_operation(operation):
+    """Run one batch entry ({"op": ..., "data": {...}}) and return {"status", "body"}."""
+    if not isinstance(operation, dict) or operation.get('op') not in OPERATIONS:
+        return {"status": 400, "body": {"error": f"op must be one of: {', '.join(OPERATIONS)}"}}
+    try:
+        body, status = OPERATIONS[operation['op']](operation.get('data'))
+    except Exception:
+        # Where the endpoint would have crashed (e.g. a non-numeric cipher key)
+        return {"status": 500, "body": {"error": "Internal Server Error"}}
+    return {"status": status, "body": body}
+
+
+def run_operations(operations):
+    return [run_operation(operation) for operation in operations]
+
+
+class BatchRunner:
+    """Runs batches inline, or on a process pool once they reach `pool_min` operations.
+
+    The pool is started on first use and again in each forked worker
+    process (a pool inherited through fork has no live workers).
+    """
+
+    def __init__(self, workers=None, pool_min=2000):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool_min = pool_min
+        self.lock = threading.Lock()
+        self.executor = None
+        self.pid = None
+
+    def pool(self):
+        if self.pid != os.getpid():
+            with self.lock:
+                if self.pid != os.getpid():
+                    self.executor = ProcessPoolExecutor(max_workers=self.workers)
+                    self.pid = os.getpid()
+        return self.executor
+
+    def run(self, operations):
+        """Return the results of `operations`, in order."""
+        if len(operations) < self.pool_min or self.workers < 2:
+            return run_operations(operations)
+        chunks = [operations[i:i + BATCH_CHUNK] for i in range(0, len(operations), BATCH_CHUNK)]
+        results = []
+        for chunk in self.pool().map(run_operations, chunks):
+            results.extend(chunk)
+        return results
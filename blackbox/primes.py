@@ -0,0 +1,256 @@
+"""
+Prime checks shared by every request.
+
+Numbers below the sieve's current limit are answered from a bytearray
+sieve of the odd numbers, grown lazily one segment at a time (up to
+MAX_SIEVE) as larger numbers are asked about. Beyond it, primality is
+decided by Miller-Rabin with fixed bases (plus a strong Lucas test, i.e.
+Baillie-PSW, where those bases stop being exact), and those answers are
+memoized.
+"""
+
+import math
+import threading
+from functools import lru_cache
+
+# The sieve starts covering [0, INITIAL_SIEVE) and never grows past MAX_SIEVE
+# (one byte per odd number, so 5 MB at the cap)
+INITIAL_SIEVE = 1 << 16
+MAX_SIEVE = 10_000_000
+SEGMENT = 1 << 20
+
+# With these bases Miller-Rabin is exact for every n < MR_EXACT_LIMIT, the
+# smallest composite passing all 13 (1287836182261 * 2575672364521). From
+# there on a strong Lucas test is added, which no known composite passes
+# together with base 2
+MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+MR_EXACT_LIMIT = 3317044064679887385961981
+
+
+class PrimeSieve:
+    """Sieve of Eratosthenes over the odd numbers, extended segment by segment.
+
+    `flags[i]` is 1 when 2*i + 1 is prime, so the sieve covers the numbers
+    below 2 * len(flags). Growth happens under a lock; lookups don't need
+    one, as extending the bytearray never changes existing entries.
+    """
+
+    def __init__(self, limit=INITIAL_SIEVE):
+        self.lock = threading.Lock()
+        self.flags = bytearray(b'\x01') * (limit // 2)
+        self.flags[0] = 0  # 1 is not prime
+        for i in range(1, (math.isqrt(limit) + 1) // 2):
+            if self.flags[i]:
+                p = 2 * i + 1
+                start = p * p // 2
+                self.flags[start::p] = bytes(len(range(start, len(self.flags), p)))
+
+    @property
+    def limit(self):
+        return 2 * len(self.flags)
+
+    def grow(self, n):
+        """Extend the sieve to cover n (doubling at least, capped at MAX_SIEVE)."""
+        with self.lock:
+            target = min(max(n + 1, 2 * self.limit), MAX_SIEVE)
+            target += target % 2
+            while self.limit < target:
+                self.extend(min(self.limit + SEGMENT, target))
+
+    def extend(self, new_limit):
+        """Sieve the segment [limit, new_limit) with the base primes already known."""
+        low = self.limit
+        segment = bytearray(b'\x01') * ((new_limit - low) // 2)
+        # Base primes up to sqrt(new_limit) are always inside the current sieve
+        for i in range(1, (math.isqrt(new_limit) + 1) // 2):
+            if self.flags[i]:
+                p = 2 * i + 1
+                # First odd multiple of p that is at least max(p*p, low)
+                first = max(p * p, (low + p - 1) // p * p)
+                if first % 2 == 0:
+                    first += p
+                start = (first - low) // 2
+                segment[start::p] = bytes(len(range(start, len(segment), p)))
+        self.flags.extend(segment)
+
+    def is_prime(self, n):
+        """Primality of 0 <= n < MAX_SIEVE."""
+        if n < 3:
+            return n == 2
+        if n % 2 == 0:
+            return False
+        if n >= self.limit:
+            self.grow(n)
+        return self.flags[n // 2] == 1
+
+    def next_prime(self, n):
+        """Smallest prime >= n, or None when it lies beyond MAX_SIEVE."""
+        if n <= 2:
+            return 2
+        i = n // 2
+        while True:
+            # Only search what existed before the lookup; another thread may be extending
+            length = len(self.flags)
+            if i < length:
+                found = self.flags.find(1, i, length)
+                if found != -1:
+                    return 2 * found + 1
+                i = length
+            if 2 * length >= MAX_SIEVE:
+                return None
+            if len(self.flags) == length:
+                self.grow(2 * i + 1)
+
+
+@lru_cache(maxsize=65536)
+def miller_rabin(n):
+    """Primality of an odd n > the largest base, by Miller-Rabin with MR_BASES
+    (and strong_lucas from MR_EXACT_LIMIT on)."""
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in MR_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return n < MR_EXACT_LIMIT or strong_lucas(n)
+
+
+def jacobi(a, n):
+    """Jacobi symbol (a/n) for odd n > 0."""
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def strong_lucas(n):
+    """Strong Lucas probable-prime test of an odd n > 2, with Selfridge's parameters."""
+    if math.isqrt(n) ** 2 == n:
+        return False
+    # First D in 5, -7, 9, -11, ... with (D/n) = -1
+    d = 5
+    while True:
+        j = jacobi(d, n)
+        if j == -1:
+            break
+        if j == 0 and abs(d) != n:
+            return False
+        d = -d - 2 if d > 0 else -d + 2
+    q = (1 - d) // 4
+
+    def half(x):
+        x %= n
+        return (x + n if x % 2 else x) // 2
+
+    # n + 1 = k * 2**s with k odd; walk the bits of k for U_k, V_k (P = 1)
+    k, s = n + 1, 0
+    while k % 2 == 0:
+        k //= 2
+        s += 1
+    u, v, qk = 1, 1, q % n
+    for bit in bin(k)[3:]:
+        u, v, qk = u * v % n, (v * v - 2 * qk) % n, qk * qk % n
+        if bit == '1':
+            u, v, qk = half(u + v), half(d * u + v), qk * q % n
+    if u == 0 or v == 0:
+        return True
+    for _ in range(s - 1):
+        v, qk = (v * v - 2 * qk) % n, qk * qk % n
+        if v == 0:
+            return True
+    return False
+
+
+def trial_division(n):
+    """The original check, kept for non-integer input (e.g. floats from JSON)."""
+    if n < 2:
+        return False
+    for i in range(2, int(n ** 0.5) + 1):
+        if n % i == 0:
+            return False
+    return True
+
+
+sieve = PrimeSieve()
+
+
+def is_prime(n):
+    if not isinstance(n, int):
+        return trial_division(n)
+    if n < MAX_SIEVE:
+        return n >= 2 and sieve.is_prime(n)
+    if n % 2 == 0:
+        return False
+    return miller_rabin(n)
+
+
+def get_primes_from(start, count):
+    """The first `count` primes >= start (as floats when start is a float)."""
+    primes = []
+    if not isinstance(start, int):
+        if start != start or abs(start) == float('inf') or start != int(start):
+            # Not a whole number: keep the original candidate-by-candidate walk
+            candidate = max(start, 2)
+            while len(primes) < count:
+                if trial_division(candidate):
+                    primes.append(candidate)
+                candidate += 1
+            return primes
+        primes = get_primes_from(int(start), count)
+        # max(start, 2) kept a float start, but the int 2 for anything smaller
+        return [float(p) for p in primes] if start >= 2 else primes
+
+    if len(primes) < count:
+        for prime in iter_primes_from(start):
+            primes.append(prime)
+            if len(primes) >= count:
+                break
+    return primes
+
+
+def iter_primes_from(start):
+    """Yield the primes >= start (an int) in order, without end."""
+    candidate = max(start, 2)
+    while candidate < MAX_SIEVE:
+        candidate = sieve.next_prime(candidate)
+        if candidate is None:
+            candidate = MAX_SIEVE
+            break
+        yield candidate
+        candidate += 1
+    # Past the sieve, test odd candidates with Miller-Rabin
+    if candidate % 2 == 0:
+        candidate += 1
+    while True:
+        if is_prime(candidate):
+            yield candidate
+        candidate += 2
+
+
+def stats():
+    """Cache sizes for /api/status."""
+    cache = miller_rabin.cache_info()
+    return {
+        "sieve_limit": sieve.limit,
+        "sieve_bytes": len(sieve.flags),
+        "sieve_max": MAX_SIEVE,
+        "miller_rabin_cached": cache.currsize,
+        "miller_rabin_hits": cache.hits,
+        "miller_rabin_misses": cache.misses,
+    }
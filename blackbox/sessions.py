@@ -0,0 +1,490 @@
+"""
+Session stores behind /api/memory.
+
+SessionStore keeps sessions in process memory, spread over lock-striped
+shards so concurrent requests for different sessions rarely contend; each
+shard keeps its sessions in least-recently-used order so idle and excess
+sessions can be evicted from the front without scanning.
+
+SQLiteSessionStore keeps them in a SQLite database in WAL mode, so several
+worker processes (e.g. gunicorn workers) share sessions and they survive
+restarts.
+"""
+
+import os
+import json
+import queue
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Rough per-item and per-session overhead (dicts, floats, list slots) on top
+# of the JSON size of the stored item
+ITEM_OVERHEAD = 200
+SESSION_OVERHEAD = 400
+
+
+class Session:
+    __slots__ = ('data', 'access_count', 'creation_time', 'last_access', 'bytes')
+
+    def __init__(self, now):
+        self.data = []
+        self.access_count = 0
+        self.creation_time = now
+        self.last_access = now
+        self.bytes = SESSION_OVERHEAD
+
+
+def item_size(item):
+    """Approximate memory held by one stored item."""
+    return len(json.dumps(item, default=str)) + ITEM_OVERHEAD
+
+
+class Shard:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions = OrderedDict()
+        self.bytes = 0
+
+
+class SessionBackend:
+    """Interface of the session stores used by memory_bank.
+
+    Every call counts one access to the session, creating it first if
+    needed, and is atomic with respect to other calls for that session.
+    """
+
+    def touch(self, session_id):
+        """Count an access without reading or writing data; return the access count."""
+        raise NotImplementedError
+
+    def store(self, session_id, make_item):
+        """Append make_item(access_count) to the session; return (total items, access count)."""
+        raise NotImplementedError
+
+    def retrieve(self, session_id, shuffle_after=None):
+        """Return (items, age in seconds); items are shuffled in place once the session is older than shuffle_after."""
+        raise NotImplementedError
+
+    def stats(self):
+        """Sizes, evictions and limits for /api/status."""
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class SessionStore(SessionBackend):
+    """Thread-safe in-memory sessions with item caps, idle TTL and LRU eviction.
+
+    - max_items: items kept per session; storing more drops the oldest
+    - ttl: seconds a session may sit idle before it is evicted
+    - max_sessions / max_bytes: totals, split evenly across shards; past
+      them the least recently used sessions of the shard are evicted
+
+    Idle sessions are evicted from the shard being accessed, and from
+    every shard at most once per sweep interval (min(ttl, 60) seconds).
+    """
+
+    def __init__(self, shards=16, max_items=1000, ttl=3600, max_sessions=10000,
+                 max_bytes=64 * 1024 * 1024):
+        self.shards = [Shard() for _ in range(shards)]
+        self.max_items = max_items
+        self.ttl = ttl
+        self.shard_sessions = max(1, max_sessions // shards)
+        self.shard_bytes = max(1, max_bytes // shards)
+        self.stats_lock = threading.Lock()
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+        self.items_dropped = 0
+        self.sweep_interval = min(ttl, 60)
+        self.last_sweep = time.time()
+
+    def shard_for(self, session_id):
+        return self.shards[hash(session_id) % len(self.shards)]
+
+    def access(self, shard, session_id, now):
+        """Return the session (created if needed) with its access counted; hold shard.lock."""
+        session = shard.sessions.get(session_id)
+        if session is None:
+            session = Session(now)
+            shard.sessions[session_id] = session
+            shard.bytes += session.bytes
+        else:
+            shard.sessions.move_to_end(session_id)
+        session.access_count += 1
+        session.last_access = now
+        return session
+
+    def evict(self, shard, now, keep):
+        """Drop idle sessions, then LRU sessions while the shard is over its limits; hold shard.lock."""
+        idle = lru = 0
+        sessions = shard.sessions
+        while sessions:
+            session_id, session = next(iter(sessions.items()))
+            if session_id == keep:
+                break
+            if now - session.last_access > self.ttl:
+                idle += 1
+            elif len(sessions) > self.shard_sessions or shard.bytes > self.shard_bytes:
+                lru += 1
+            else:
+                break
+            del sessions[session_id]
+            shard.bytes -= session.bytes
+        if idle or lru:
+            with self.stats_lock:
+                self.evicted_idle += idle
+                self.evicted_lru += lru
+
+    def sweep(self, now=None):
+        """Evict idle (and excess) sessions from every shard."""
+        now = time.time() if now is None else now
+        self.last_sweep = now
+        for shard in self.shards:
+            with shard.lock:
+                self.evict(shard, now, None)
+
+    def maybe_sweep(self, now):
+        if now - self.last_sweep > self.sweep_interval:
+            self.sweep(now)
+
+    def touch(self, session_id):
+        now = time.time()
+        shard = self.shard_for(session_id)
+        with shard.lock:
+            session = self.access(shard, session_id, now)
+            self.evict(shard, now, session_id)
+            access_count = session.access_count
+        self.maybe_sweep(now)
+        return access_count
+
+    def store(self, session_id, make_item):
+        now = time.time()
+        shard = self.shard_for(session_id)
+        dropped = 0
+        with shard.lock:
+            session = self.access(shard, session_id, now)
+            item = make_item(session.access_count)
+            size = item_size(item)
+            session.data.append((item, size))
+            session.bytes += size
+            shard.bytes += size
+            if len(session.data) > self.max_items:
+                dropped = len(session.data) - self.max_items
+                freed = sum(old_size for _, old_size in session.data[:dropped])
+                del session.data[:dropped]
+                session.bytes -= freed
+                shard.bytes -= freed
+            self.evict(shard, now, session_id)
+            result = len(session.data), session.access_count
+        if dropped:
+            with self.stats_lock:
+                self.items_dropped += dropped
+        self.maybe_sweep(now)
+        return result
+
+    def retrieve(self, session_id, shuffle_after=None):
+        now = time.time()
+        shard = self.shard_for(session_id)
+        with shard.lock:
+            session = self.access(shard, session_id, now)
+            age = now - session.creation_time
+            if shuffle_after is not None and age > shuffle_after:
+                random.shuffle(session.data)
+            items = [item for item, _ in session.data]
+            self.evict(shard, now, session_id)
+        self.maybe_sweep(now)
+        return items, age
+
+    def __len__(self):
+        return sum(len(shard.sessions) for shard in self.shards)
+
+    def stats(self):
+        self.maybe_sweep(time.time())
+        sessions = items = approx_bytes = 0
+        for shard in self.shards:
+            with shard.lock:
+                sessions += len(shard.sessions)
+                items += sum(len(session.data) for session in shard.sessions.values())
+                approx_bytes += shard.bytes
+        with self.stats_lock:
+            evicted_idle, evicted_lru, items_dropped = self.evicted_idle, self.evicted_lru, self.items_dropped
+        return {
+            "backend": "memory",
+            "sessions": sessions,
+            "items": items,
+            "approx_bytes": approx_bytes,
+            "evicted_idle": evicted_idle,
+            "evicted_lru": evicted_lru,
+            "items_dropped": items_dropped,
+            "shards": len(self.shards),
+            "limits": {
+                "max_items": self.max_items,
+                "ttl_seconds": self.ttl,
+                "max_sessions": self.shard_sessions * len(self.shards),
+                "max_bytes": self.shard_bytes * len(self.shards),
+            },
+        }
+
+
+class PendingOp:
+    __slots__ = ('op', 'args', 'done', 'result', 'error')
+
+    def __init__(self, op, args):
+        self.op = op
+        self.args = args
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SQLiteSessionStore(SessionBackend):
+    """Sessions in a SQLite database shared by every worker process.
+
+    Each process runs one writer thread that drains the operations of all
+    its request threads and applies up to `batch_size` of them in one
+    transaction (group commit), so concurrent stores become batched
+    inserts instead of one commit each. Every operation runs in its own
+    savepoint, so one failing does not undo the others. Items are ordered
+    by their `timestamp` column, which an old session's retrieve permutes
+    to keep the shuffle, and (session_id, timestamp) is indexed.
+
+    Idle, excess-session and over-budget eviction runs at most once per
+    sweep interval, inside a batch.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            access_count INTEGER NOT NULL,
+            creation_time REAL NOT NULL,
+            last_access REAL NOT NULL,
+            item_count INTEGER NOT NULL,
+            bytes INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access);
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY,
+            session_id TEXT NOT NULL,
+            timestamp REAL NOT NULL,
+            item TEXT NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS items_session_timestamp ON items (session_id, timestamp);
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, path='blackbox_sessions.sqlite3', max_items=1000, ttl=3600, max_sessions=10000,
+                 max_bytes=64 * 1024 * 1024, batch_size=256):
+        self.path = str(path)
+        self.max_items = max_items
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.sweep_interval = min(ttl, 60)
+        self.last_sweep = time.time()
+        db = self.connect()
+        db.executescript(self.SCHEMA)
+        db.close()
+        self.local = threading.local()
+        self.start_lock = threading.Lock()
+        self.writer_pid = None
+
+    def connect(self):
+        # Autocommit; transactions are explicit. The timeout lets processes wait for each other's writes
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    def reader(self):
+        """This thread's connection for read-only queries."""
+        db = getattr(self.local, 'db', None)
+        if db is None or self.local.pid != os.getpid():
+            db = self.local.db = self.connect()
+            self.local.pid = os.getpid()
+        return db
+
+    def submit(self, op, *args):
+        """Queue op(db, *args) for this process's writer thread and wait for its result."""
+        if self.writer_pid != os.getpid():
+            with self.start_lock:
+                # A forked worker needs its own queue and writer thread
+                if self.writer_pid != os.getpid():
+                    self.pending = queue.Queue()
+                    threading.Thread(target=self.write_loop, args=(self.pending,),
+                                     name='session-writer', daemon=True).start()
+                    self.writer_pid = os.getpid()
+        pending = PendingOp(op, args)
+        self.pending.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def write_loop(self, pending_ops):
+        db = self.connect()
+        while True:
+            batch = [pending_ops.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(pending_ops.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                db.execute('BEGIN IMMEDIATE')
+                for pending in batch:
+                    db.execute('SAVEPOINT op')
+                    try:
+                        pending.result = pending.op(db, *pending.args)
+                    except Exception as e:
+                        db.execute('ROLLBACK TO op')
+                        pending.error = e
+                    db.execute('RELEASE op')
+                now = time.time()
+                if now - self.last_sweep > self.sweep_interval:
+                    self.last_sweep = now
+                    self.evict(db, now)
+                db.execute('COMMIT')
+            except Exception as e:
+                if db.in_transaction:
+                    db.execute('ROLLBACK')
+                for pending in batch:
+                    pending.error = pending.error or e
+            for pending in batch:
+                pending.done.set()
+
+    @staticmethod
+    def key(session_id):
+        # JSON keeps 1 and "1" apart, like dict keys do
+        return json.dumps(session_id)
+
+    def access(self, db, key, now):
+        """Count an access to the session, creating it if needed; return (access count, creation time)."""
+        db.execute('UPDATE sessions SET access_count = access_count + 1, last_access = ? WHERE session_id = ?',
+                   (now, key))
+        row = db.execute('SELECT access_count, creation_time FROM sessions WHERE session_id = ?',
+                         (key,)).fetchone()
+        if row is None:
+            db.execute('INSERT INTO sessions VALUES (?, 1, ?, ?, 0, ?)', (key, now, now, SESSION_OVERHEAD))
+            return 1, now
+        return row
+
+    def count(self, db, name, amount):
+        if amount:
+            db.execute('INSERT INTO counters VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET value = value + ?',
+                       (name, amount, amount))
+
+    def touch_op(self, db, key):
+        return self.access(db, key, time.time())[0]
+
+    def store_op(self, db, key, make_item):
+        now = time.time()
+        access_count, _ = self.access(db, key, now)
+        item = json.dumps(make_item(access_count), default=str)
+        size = len(item) + ITEM_OVERHEAD
+        db.execute('INSERT INTO items (session_id, timestamp, item, size) VALUES (?, ?, ?, ?)',
+                   (key, now, item, size))
+        db.execute('UPDATE sessions SET item_count = item_count + 1, bytes = bytes + ? WHERE session_id = ?',
+                   (size, key))
+        item_count, = db.execute('SELECT item_count FROM sessions WHERE session_id = ?', (key,)).fetchone()
+        if item_count > self.max_items:
+            dropped = item_count - self.max_items
+            oldest = db.execute('SELECT id, size FROM items WHERE session_id = ? ORDER BY timestamp, id LIMIT ?',
+                                (key, dropped)).fetchall()
+            db.executemany('DELETE FROM items WHERE id = ?', [(item_id,) for item_id, _ in oldest])
+            db.execute('UPDATE sessions SET item_count = ?, bytes = bytes - ? WHERE session_id = ?',
+                       (self.max_items, sum(old_size for _, old_size in oldest), key))
+            self.count(db, 'items_dropped', dropped)
+            item_count = self.max_items
+        return item_count, access_count
+
+    def retrieve_op(self, db, key, shuffle_after):
+        now = time.time()
+        _, creation_time = self.access(db, key, now)
+        age = now - creation_time
+        rows = db.execute('SELECT id, timestamp, item FROM items WHERE session_id = ? ORDER BY timestamp, id',
+                          (key,)).fetchall()
+        if shuffle_after is not None and age > shuffle_after and len(rows) > 1:
+            # Hand the same ordering keys out to the rows in a random order
+            timestamps = [timestamp for _, timestamp, _ in rows]
+            random.shuffle(rows)
+            db.executemany('UPDATE items SET timestamp = ? WHERE id = ?',
+                           [(timestamp, row[0]) for timestamp, row in zip(timestamps, rows)])
+        return [json.loads(item) for _, _, item in rows], age
+
+    def evict(self, db, now):
+        """Drop idle sessions, then least recently used ones while over the session or byte limits."""
+        idle = [key for key, in db.execute('SELECT session_id FROM sessions WHERE last_access < ?',
+                                           (now - self.ttl,))]
+        self.drop(db, idle)
+        self.count(db, 'evicted_idle', len(idle))
+
+        sessions, total_bytes = db.execute('SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM sessions').fetchone()
+        if sessions <= self.max_sessions and total_bytes <= self.max_bytes:
+            return
+        victims = []
+        for key, size in db.execute('SELECT session_id, bytes FROM sessions ORDER BY last_access'):
+            if sessions <= self.max_sessions and total_bytes <= self.max_bytes:
+                break
+            victims.append(key)
+            sessions -= 1
+            total_bytes -= size
+        self.drop(db, victims)
+        self.count(db, 'evicted_lru', len(victims))
+
+    def drop(self, db, keys):
+        keys = [(key,) for key in keys]
+        db.executemany('DELETE FROM items WHERE session_id = ?', keys)
+        db.executemany('DELETE FROM sessions WHERE session_id = ?', keys)
+
+    def touch(self, session_id):
+        return self.submit(self.touch_op, self.key(session_id))
+
+    def store(self, session_id, make_item):
+        return self.submit(self.store_op, self.key(session_id), make_item)
+
+    def retrieve(self, session_id, shuffle_after=None):
+        return self.submit(self.retrieve_op, self.key(session_id), shuffle_after)
+
+    def __len__(self):
+        return self.reader().execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+    def stats(self):
+        db = self.reader()
+        sessions, items, approx_bytes = db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(item_count), 0), COALESCE(SUM(bytes), 0) FROM sessions').fetchone()
+        counters = dict(db.execute('SELECT name, value FROM counters'))
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "sessions": sessions,
+            "items": items,
+            "approx_bytes": approx_bytes,
+            "evicted_idle": counters.get('evicted_idle', 0),
+            "evicted_lru": counters.get('evicted_lru', 0),
+            "items_dropped": counters.get('items_dropped', 0),
+            "limits": {
+                "max_items": self.max_items,
+                "ttl_seconds": self.ttl,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+            },
+        }
+
+
+def open_store(backend='memory', path=None, **limits):
+    """Create the session store named by `backend` ('memory' or 'sqlite')."""
+    if backend == 'memory':
+        return SessionStore(**limits)
+    if backend == 'sqlite':
+        limits.pop('shards', None)
+        return SQLiteSessionStore(path or 'blackbox_sessions.sqlite3', **limits)
+    raise ValueError(f"Unknown session backend '{backend}' (expected 'memory' or 'sqlite')")
@@ -0,0 +1,244 @@
+"""
+Batch Conversion
+Converts whole directory trees and glob matches of Markdown files across a
+pool of worker processes.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from markdown import MarkdownToHtml, has_glob_magic
+
+
+# Converter reused by every job that runs in this worker process
+_worker_converter = None
+
+# Converter source, hashed so that a changed converter invalidates the cache
+CONVERTER_SOURCE = Path(__file__).with_name('markdown.py')
+
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def default_manifest_path(output_dir=None):
+    """Place the manifest next to the output directory, or in the current one."""
+    if output_dir:
+        output_dir = Path(output_dir).resolve()
+        return output_dir.parent / f'.{output_dir.name}-manifest.json'
+    return Path('.md-to-html-manifest.json')
+
+
+class BuildManifest:
+    """On-disk record of what each source file last produced.
+
+    Entries are keyed by the absolute source path and hold the source's
+    content hash, the title and CSS option used, and the output written.
+    A job whose entry still matches, and whose output still exists, is
+    skipped. Entries whose source has gone or whose output moved are
+    removed along with their old output.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.removed = 0
+        self.converter = file_digest(CONVERTER_SOURCE)
+        self.load()
+
+    def load(self):
+        """Load the manifest, dropping it if another converter version wrote it."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('converter') == self.converter:
+            self.entries = data.get('files', {})
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'converter': self.converter, 'files': self.entries}, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def select(self, jobs):
+        """Return the jobs whose output is missing or out of date."""
+        stale = []
+        for job in jobs:
+            input_path, output_path, title, include_css, _ = job
+            key = str(Path(input_path).resolve())
+            try:
+                digest = file_digest(input_path)
+            except OSError:
+                digest = None
+            entry = {
+                'hash': digest,
+                'title': title,
+                'css': include_css,
+                'output': str(Path(output_path).resolve()),
+            }
+            if digest and self.entries.get(key) == entry and os.path.exists(output_path):
+                self.hits += 1
+                continue
+            self.misses += 1
+            self.pending[key] = entry
+            stale.append(job)
+        return stale
+
+    def record(self, input_path):
+        """Remember the output of a successfully converted source."""
+        key = str(Path(input_path).resolve())
+        entry = self.pending.pop(key, None)
+        if entry and entry['hash']:
+            previous = self.entries.get(key)
+            if previous and previous['output'] != entry['output']:
+                self.remove_output(previous['output'])
+            self.entries[key] = entry
+
+    def remove_output(self, output_path):
+        try:
+            os.remove(output_path)
+            self.removed += 1
+        except OSError:
+            pass
+
+    def collect_garbage(self):
+        """Drop entries whose source no longer exists, deleting their outputs."""
+        for key in list(self.entries):
+            if not os.path.exists(key):
+                self.remove_output(self.entries.pop(key)['output'])
+
+
+def collect_sources(patterns):
+    """Expand files, directories and globs into (input_path, relative_path) pairs.
+
+    The relative path is what gets mirrored into the output directory:
+    relative to the directory for directories, relative to the part before
+    the first wildcard for globs, and just the file name for plain files.
+    """
+    sources = []
+    seen = set()
+
+    def add(path, relative):
+        key = path.resolve()
+        if key not in seen and path.is_file():
+            seen.add(key)
+            sources.append((path, relative))
+
+    for pattern in patterns:
+        path = Path(pattern)
+        if has_glob_magic(pattern):
+            base_parts = []
+            for part in path.parts:
+                if has_glob_magic(part):
+                    break
+                base_parts.append(part)
+            base = Path(*base_parts) if base_parts else Path('.')
+            for match in sorted(glob.glob(pattern, recursive=True)):
+                add(Path(match), Path(match).relative_to(base))
+        elif path.is_dir():
+            for match in sorted(path.rglob('*.md')):
+                add(match, match.relative_to(path))
+        else:
+            add(path, Path(path.name))
+
+    return sources
+
+
+def plan_jobs(sources, output_dir=None, title=None, include_css=True, stream=False):
+    """Pair each source with its output path and conversion options."""
+    jobs = []
+    for input_path, relative in sources:
+        if output_dir:
+            output_path = Path(output_dir) / relative.with_suffix('.html')
+        else:
+            output_path = input_path.with_suffix('.html')
+        jobs.append((str(input_path), str(output_path), title or input_path.stem, include_css, stream))
+    return jobs
+
+
+def _init_worker():
+    global _worker_converter
+    _worker_converter = MarkdownToHtml()
+
+
+def convert_job(job):
+    """Convert one planned job, returning (input, output, bytes, seconds, error)."""
+    global _worker_converter
+    if _worker_converter is None:
+        _init_worker()
+
+    input_path, output_path, title, include_css, stream = job
+    start = time.perf_counter()
+    try:
+        size = os.path.getsize(input_path)
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        _worker_converter.convert_file(input_path, output_path, title, include_css, stream)
+        error = None
+    except Exception as e:
+        size = 0
+        error = str(e)
+    return input_path, output_path, size, time.perf_counter() - start, error
+
+
+def run_batch(jobs, workers=None, chunksize=8):
+    """Convert every job, in this process or across a process pool.
+
+    Yields one result per job, in job order, as soon as it is available.
+    """
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield convert_job(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        yield from executor.map(convert_job, jobs, chunksize=chunksize)
+
+
+def convert_batch(jobs, workers=None, quiet=False, manifest=None):
+    """Run a batch, print per-file timings and a throughput summary.
+
+    Successful conversions are recorded in `manifest` when one is given.
+    Returns the number of files that failed.
+    """
+    failures = 0
+    total_bytes = 0
+    converted = 0
+    start = time.perf_counter()
+
+    for input_path, output_path, size, seconds, error in run_batch(jobs, workers):
+        if error:
+            failures += 1
+            print(f"Error: {input_path}: {error}", file=sys.stderr)
+            continue
+        converted += 1
+        total_bytes += size
+        if manifest is not None:
+            manifest.record(input_path)
+        if not quiet:
+            print(f"  {seconds * 1000:8.1f} ms  {input_path} -> {output_path}")
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    megabytes = total_bytes / (1024 * 1024)
+    print(f"Converted {converted} file(s), {megabytes:.2f} MB in {elapsed:.2f}s "
+          f"({converted / elapsed:.1f} files/s, {megabytes / elapsed:.2f} MB/s)")
+    if failures:
+        print(f"{failures} file(s) failed", file=sys.stderr)
+    return failures
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Markdown to HTML Benchmarks
+Checks the converter against the fixture corpus and times it against the
+legacy regex-per-pass path. The scenario suite measures throughput and peak
+memory on synthetic and pathological documents and compares them with a
+saved baseline; the fuzzer compares the engine with the legacy path on
+random input. The input comparison converts one large file through each
+way of reading it.
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import filecmp
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from markdown import MarkdownToHtml
+
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+# Synthetic document sizes, in bytes
+SYNTHETIC_SIZES = {
+    '1KB': 1024,
+    '100KB': 100 * 1024,
+    '1MB': 1024 * 1024,
+    '10MB': 10 * 1024 * 1024,
+    '100MB': 100 * 1024 * 1024,
+}
+
+# Pathological inputs: each line is a head followed by a unit repeated
+# thousands of times, with delimiters that never close. Any two '*' (or '_')
+# at least two characters apart pair up, so those lines hold a single
+# unclosed '**' ahead of a long run of text for every pass to scan. The
+# link with a '!' in its text sends its whole line down the replay_inline
+# path, ahead of thousands of unmatched brackets.
+PATHOLOGICAL_UNITS = {
+    'unmatched-stars': ('a **', 'b '),
+    'unmatched-underscores': ('a __', 'b '),
+    'unmatched-brackets': ('', '[a '),
+    'unmatched-link-urls': ('', '[a]('),
+    'unmatched-images': ('', '![a '),
+    'unmatched-strikes': ('', '~~a '),
+    'replayed-link-brackets': ('[a!](b) ', '[x '),
+}
+PATHOLOGICAL_REPEAT = 5000
+PATHOLOGICAL_LINES = 20
+
+# Ways convert_file can read its input, as values of its `stream` option
+INPUT_PATHS = {'read': False, 'stream': True, 'mmap': 'mmap'}
+# Line repeated inside the single code fence of the code-fence input
+FENCED_LINE = '2024-05-01 12:00:00 INFO worker-3 <job id=42> done & flushed, 1024 rows in 0.5s\n'
+
+# Building blocks for fuzzed lines
+FUZZ_PIECES = list('`*_[]()!~ ab#->1.\t') + ['**', '__', '~~', '![', '](', '```', '1. ', '- ', '> ', '# ']
+
+
+class LegacyMarkdownToHtml(MarkdownToHtml):
+    """Converter wired to the original line loop and inline regex passes."""
+
+    convert_inline_formatting = MarkdownToHtml.convert_inline_formatting_legacy
+    convert_markdown_to_html = MarkdownToHtml.convert_markdown_to_html_legacy
+
+
+def load_fixtures():
+    """Return (name, markdown, expected_html) for every fixture pair."""
+    fixtures = []
+    for md_path in sorted(FIXTURES_DIR.glob('*.md')):
+        html_path = md_path.with_suffix('.html')
+        if not html_path.exists():
+            continue
+        fixtures.append((
+            md_path.name,
+            md_path.read_text(encoding='utf-8'),
+            html_path.read_text(encoding='utf-8'),
+        ))
+    return fixtures
+
+
+def check_fixtures(fixtures):
+    """Verify both engines reproduce the expected HTML byte for byte."""
+    failures = 0
+    for name, markdown, expected in fixtures:
+        for label, converter in (('engine', MarkdownToHtml()), ('legacy', LegacyMarkdownToHtml())):
+            if converter.convert_markdown_to_html(markdown) != expected:
+                print(f"  MISMATCH {label}: {name}")
+                failures += 1
+    print(f"Fixtures: {len(fixtures)} checked, {failures} mismatches")
+    return failures == 0
+
+
+def time_conversion(converter, markdown, repeat):
+    """Return the best wall time over `repeat` conversions."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        converter.convert_markdown_to_html(markdown)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare_engines(fixtures, size_mb, repeat):
+    """Time the legacy path and the engine on a document built from the fixtures."""
+    corpus = '\n'.join(markdown for _, markdown, _ in fixtures)
+    copies = max(1, int(size_mb * 1024 * 1024 / len(corpus.encode('utf-8'))))
+    document = '\n'.join([corpus] * copies)
+    size = len(document.encode('utf-8')) / (1024 * 1024)
+
+    legacy = time_conversion(LegacyMarkdownToHtml(), document, repeat)
+    engine = time_conversion(MarkdownToHtml(), document, repeat)
+
+    print(f"Document: {size:.1f} MB, {document.count(chr(10)) + 1} lines")
+    print(f"  legacy: {legacy:.3f}s ({size / legacy:.1f} MB/s)")
+    print(f"  engine: {engine:.3f}s ({size / engine:.1f} MB/s)")
+    print(f"  speedup: {legacy / engine:.2f}x")
+
+
+def string_keyed_line(line):
+    """Block pattern checks as they were written before: one re.match per pattern."""
+    cls = MarkdownToHtml
+    for pattern in (cls.HEADER_RE, cls.UNORDERED_RE, cls.ORDERED_RE, cls.BLOCKQUOTE_RE):
+        re.match(pattern.pattern, line)
+    re.match(cls.HR_RE.pattern, line.strip())
+
+
+def compiled_line(line):
+    """The same block pattern checks through the class-level compiled patterns."""
+    cls = MarkdownToHtml
+    for pattern in (cls.HEADER_RE, cls.UNORDERED_RE, cls.ORDERED_RE, cls.BLOCKQUOTE_RE):
+        pattern.match(line)
+    cls.HR_RE.match(line.strip())
+
+
+def string_keyed_inline(text):
+    """Inline regex passes as they were written before: re.sub with pattern strings."""
+    for pattern, replacement in MarkdownToHtml.INLINE_RULES:
+        text = re.sub(pattern.pattern, replacement, text)
+    return text
+
+
+def formatted_document(body_content, title, include_css):
+    """The document as it was built before: one f-string per call, with the
+    stylesheet formatted in each time, encoded afterwards."""
+    if not include_css:
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+</head>
+<body>
+{body_content}
+</body>
+</html>""".encode('utf-8')
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            line-height: 1.6;
+            max-width: 800px;
+            margin: 0 auto;
+            padding: 20px;
+            color: #333;
+        }}
+        h1, h2, h3, h4, h5, h6 {{
+            margin-top: 1.5em;
+            margin-bottom: 0.5em;
+        }}
+        h1 {{ font-size: 2em; }}
+        h2 {{ font-size: 1.5em; }}
+        h3 {{ font-size: 1.25em; }}
+        code {{
+            background-color: #f4f4f4;
+            padding: 2px 4px;
+            border-radius: 3px;
+            font-family: 'Courier New', Courier, monospace;
+        }}
+        pre {{
+            background-color: #f4f4f4;
+            padding: 15px;
+            border-radius: 5px;
+            overflow-x: auto;
+        }}
+        pre code {{
+            background-color: transparent;
+            padding: 0;
+        }}
+        blockquote {{
+            border-left: 4px solid #ddd;
+            margin: 0;
+            padding-left: 20px;
+            color: #666;
+        }}
+        a {{
+            color: #0066cc;
+            text-decoration: none;
+        }}
+        a:hover {{
+            text-decoration: underline;
+        }}
+        hr {{
+            border: none;
+            height: 1px;
+            background-color: #ddd;
+            margin: 2em 0;
+        }}
+        img {{
+            max-width: 100%;
+            height: auto;
+        }}
+        ul, ol {{
+            margin: 1em 0;
+            padding-left: 2em;
+        }}
+        li {{
+            margin: 0.5em 0;
+        }}
+    </style>
+</head>
+<body>
+{body_content}
+</body>
+</html>""".encode('utf-8')
+
+
+def time_per_call(func, args, repeat):
+    """Return the best mean time per call, in microseconds, over `repeat` rounds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for arg in args:
+            func(*arg)
+        best = min(best, (time.perf_counter() - start) / len(args))
+    return best * 1e6
+
+
+def report(label, before, after):
+    print(f"  {label:<22} before {before:8.2f} us   after {after:8.2f} us   ({before / after:.2f}x)")
+
+
+def micro_benchmarks(fixtures, repeat):
+    """Measure per-line and per-document overhead before and after precompiling."""
+    lines = [(line,) for _, markdown, _ in fixtures for line in markdown.split('\n') if line.strip()]
+    lines = lines * max(1, 20000 // len(lines))
+    converter = MarkdownToHtml()
+    body = converter.convert_markdown_to_html(fixtures[0][1])
+    documents = [(body, 'Benchmark', include_css) for include_css in (True, False)] * 2000
+
+    print(f"Per line ({len(lines)} lines):")
+    report('block patterns', time_per_call(string_keyed_line, lines, repeat),
+           time_per_call(compiled_line, lines, repeat))
+    report('inline passes', time_per_call(string_keyed_inline, lines, repeat),
+           time_per_call(converter.convert_inline_formatting_legacy, lines, repeat))
+
+    print(f"Per document ({len(body)} character body):")
+    if any(formatted_document(*doc) != converter.create_document_bytes(*doc) for doc in documents[:2]):
+        print("  MISMATCH: the prebuilt shell differs from the original template")
+    report('document shell', time_per_call(formatted_document, documents, repeat),
+           time_per_call(converter.create_document_bytes, documents, repeat))
+
+
+def synthetic_document(size):
+    """Build a document of about `size` bytes from the fixture corpus."""
+    corpus = '\n'.join(markdown for _, markdown, _ in load_fixtures()) + '\n'
+    copies = size // len(corpus.encode('utf-8')) + 1
+    return (corpus * copies)[:size]
+
+
+def pathological_document(head, unit):
+    """Build lines made of thousands of unmatched delimiters."""
+    line = head + unit * PATHOLOGICAL_REPEAT
+    return '\n'.join([line] * PATHOLOGICAL_LINES)
+
+
+def scenario_names(max_size):
+    names = [f'synthetic-{label}' for label, size in SYNTHETIC_SIZES.items() if size <= max_size]
+    return names + list(PATHOLOGICAL_UNITS)
+
+
+def build_scenario(name):
+    if name.startswith('synthetic-'):
+        return synthetic_document(SYNTHETIC_SIZES[name[len('synthetic-'):]])
+    return pathological_document(*PATHOLOGICAL_UNITS[name])
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def measure_scenario(name):
+    """Convert one scenario document; runs in a fresh process per scenario."""
+    document = build_scenario(name)
+    size = len(document.encode('utf-8'))
+    converter = MarkdownToHtml()
+    rss_before = peak_rss_mb()
+    # Small documents are converted repeatedly and the best run is kept
+    seconds = float('inf')
+    total = 0.0
+    while total < 0.2:
+        start = time.perf_counter()
+        converter.convert_markdown_to_html(document)
+        elapsed = time.perf_counter() - start
+        seconds = min(seconds, elapsed)
+        total += elapsed
+    rss_after = peak_rss_mb()
+    return {
+        'bytes': size,
+        'seconds': round(seconds, 6),
+        'mb_per_s': round(size / (1024 * 1024) / max(seconds, 1e-9), 3),
+        'peak_rss_mb': round(rss_after, 1) if rss_after is not None else None,
+        'conversion_rss_mb': round(rss_after - rss_before, 1) if rss_after is not None else None,
+    }
+
+
+def run_suite(max_size):
+    """Measure every scenario in its own process so peak RSS is per scenario."""
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for name in scenario_names(max_size):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(measure_scenario, name).result()
+        results[name] = result
+        rss = f"{result['peak_rss_mb']:8.1f} MB peak" if result['peak_rss_mb'] is not None else ''
+        print(f"  {name:<24} {result['bytes'] / 1024:12.1f} KB {result['seconds']:9.3f}s "
+              f"{result['mb_per_s']:9.2f} MB/s {rss}")
+    return results
+
+
+def measure_input_path(input_path, output_path, stream):
+    """Convert a file one way; runs in a fresh process so peak RSS is its own."""
+    start = time.perf_counter()
+    MarkdownToHtml().convert_file(input_path, output_path, 'Benchmark', stream=stream)
+    return time.perf_counter() - start, peak_rss_mb()
+
+
+def write_input(path, size, workload):
+    """Write a `size` byte input file of the fixture corpus, or of one code fence."""
+    if workload == 'code-fence':
+        head, tail = b'# Log\n\n```\n', b'```\n'
+        unit = (FENCED_LINE * (1024 * 1024 // len(FENCED_LINE))).encode('utf-8')
+    else:
+        head, tail = b'', b''
+        unit = synthetic_document(1024 * 1024).encode('utf-8')
+    size -= len(head) + len(tail)
+    # Written a unit at a time: a child's peak RSS starts from its parent's
+    with open(path, 'wb') as f:
+        f.write(head)
+        for _ in range(size // len(unit)):
+            f.write(unit)
+        f.write(unit[:size % len(unit)])
+        f.write(tail)
+
+
+def compare_input_paths(size_mb):
+    """Convert large files by reading them whole, streaming them and memory-mapping them."""
+    size = int(size_mb * 1024 * 1024)
+    context = multiprocessing.get_context('spawn')
+    matched = True
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = Path(tmp) / 'input.md'
+        for workload in ('prose', 'code-fence'):
+            write_input(input_path, size, workload)
+            print(f"Input paths ({size / (1024 * 1024):.1f} MB {workload} document):")
+            outputs = []
+            for name, stream in INPUT_PATHS.items():
+                output_path = Path(tmp) / f'{name}.html'
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    seconds, peak = executor.submit(
+                        measure_input_path, str(input_path), str(output_path), stream).result()
+                rss = f"{peak:8.1f} MB peak" if peak is not None else ''
+                print(f"  {name:<8} {seconds:8.3f}s {size / (1024 * 1024) / seconds:8.2f} MB/s {rss}")
+                outputs.append(output_path)
+            if not all(filecmp.cmp(outputs[0], output, shallow=False) for output in outputs[1:]):
+                print("  MISMATCH: the input paths produced different HTML")
+                matched = False
+    return matched
+
+
+def find_regressions(results, baseline, threshold):
+    """Return messages for scenarios slower or bigger than baseline by more than `threshold`."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result['mb_per_s'] < base['mb_per_s'] * (1 - threshold):
+            regressions.append(f"{name}: throughput {result['mb_per_s']:.2f} MB/s, "
+                               f"baseline {base['mb_per_s']:.2f} MB/s")
+        if (result.get('peak_rss_mb') and base.get('peak_rss_mb')
+                and result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + threshold)):
+            regressions.append(f"{name}: peak RSS {result['peak_rss_mb']:.1f} MB, "
+                               f"baseline {base['peak_rss_mb']:.1f} MB")
+    return regressions
+
+
+def fuzz(iterations, seed):
+    """Compare the engine with the legacy path on random lines and documents."""
+    rng = random.Random(seed)
+    engine, legacy = MarkdownToHtml(), LegacyMarkdownToHtml()
+    for _ in range(iterations):
+        text = ''.join(rng.choice(FUZZ_PIECES) for _ in range(rng.randint(0, 60)))
+        document = '\n'.join(text[i:i + 12] for i in range(0, len(text), 12))
+        if (engine.convert_inline_formatting(text) != legacy.convert_inline_formatting(text)
+                or engine.convert_markdown_to_html(document) != legacy.convert_markdown_to_html(document)):
+            print(f"  MISMATCH: {text!r}")
+            return False
+    print(f"Fuzz: {iterations} inputs matched the legacy path (seed {seed})")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Markdown to HTML converter')
+    parser.add_argument('--size', type=float, default=4.0, help='Benchmark document size in MB (default: 4)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per engine, best is reported (default: 3)')
+    parser.add_argument('--micro', action='store_true',
+                        help='Measure per-line and per-document overhead instead of whole documents')
+    parser.add_argument('--suite', action='store_true',
+                        help='Run the synthetic and pathological scenario suite')
+    parser.add_argument('--max-size', default='100MB', choices=list(SYNTHETIC_SIZES),
+                        help='Largest synthetic document in the suite (default: 100MB)')
+    parser.add_argument('--baseline', help='Baseline JSON to compare the suite against')
+    parser.add_argument('--save-baseline', help='Write the suite results to this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown or memory growth against the baseline (default: 0.25)')
+    parser.add_argument('--inputs', action='store_true',
+                        help='Compare reading, streaming and memory-mapping --size MB prose and code-fence inputs')
+    parser.add_argument('--fuzz', type=int, metavar='N', help='Compare N random inputs against the legacy path')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for --fuzz (default: 0)')
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    if not fixtures:
+        print(f"Error: No fixtures found in '{FIXTURES_DIR}'", file=sys.stderr)
+        sys.exit(1)
+
+    if not check_fixtures(fixtures):
+        sys.exit(1)
+
+    if args.micro:
+        micro_benchmarks(fixtures, args.repeat)
+        return
+
+    if args.inputs:
+        sys.exit(0 if compare_input_paths(args.size) else 1)
+
+    if args.fuzz:
+        sys.exit(0 if fuzz(args.fuzz, args.seed) else 1)
+
+    if args.suite:
+        print("Scenarios:")
+        results = run_suite(SYNTHETIC_SIZES[args.max_size])
+        if args.save_baseline:
+            with open(args.save_baseline, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            print(f"Baseline saved to '{args.save_baseline}'")
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                regressions = find_regressions(results, json.load(f), args.threshold)
+            for message in regressions:
+                print(f"  REGRESSION {message}")
+            if regressions:
+                sys.exit(1)
+            print(f"No regressions beyond {args.threshold:.0%} of '{args.baseline}'")
+        return
+
+    compare_engines(fixtures, args.size, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
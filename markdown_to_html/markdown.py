@@ -1,352 +1,1166 @@
-#!/usr/bin/env python3
-"""
-Markdown to HTML Converter
-A command-line tool that converts Markdown files to clean HTML files.
-"""
-
-import re
-import sys
-import argparse
-from pathlib import Path
-
-
-class MarkdownToHtml:
-    def __init__(self):
-        self.html_content = []
-        self.in_code_block = False
-        self.in_list = False
-        self.list_type = None
-        self.list_level = 0
-    
-    def convert_inline_formatting(self, text):
-        """Convert inline Markdown formatting to HTML."""
-        # Code blocks (backticks) - handle first to avoid conflicts
-        text = re.sub(r'`([^`]+)`', r'<code>\1</code>', text)
-        
-        # Bold (**text** or __text__)
-        text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
-        text = re.sub(r'__(.+?)__', r'<strong>\1</strong>', text)
-        
-        # Italics (*text* or _text_)
-        text = re.sub(r'\*(.+?)\*', r'<em>\1</em>', text)
-        text = re.sub(r'_(.+?)_', r'<em>\1</em>', text)
-        
-        # Links [text](url)
-        text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
-        
-        # Images ![alt](url)
-        text = re.sub(r'!\[([^\]]*)\]\(([^)]+)\)', r'<img src="\2" alt="\1">', text)
-        
-        # Strikethrough ~~text~~
-        text = re.sub(r'~~(.+?)~~', r'<del>\1</del>', text)
-        
-        return text
-    
-    def process_headers(self, line):
-        """Process header lines (#, ##, ###, etc.)."""
-        header_match = re.match(r'^(#{1,6})\s+(.+)$', line)
-        if header_match:
-            level = len(header_match.group(1))
-            text = self.convert_inline_formatting(header_match.group(2))
-            return f'<h{level}>{text}</h{level}>'
-        return None
-    
-    def process_lists(self, line):
-        """Process ordered and unordered lists."""
-        # Unordered list (-, *, +)
-        unordered_match = re.match(r'^(\s*)([-*+])\s+(.+)$', line)
-        if unordered_match:
-            indent = len(unordered_match.group(1))
-            text = self.convert_inline_formatting(unordered_match.group(3))
-            
-            if not self.in_list or self.list_type != 'ul':
-                if self.in_list:
-                    self.html_content.append(f'</{self.list_type}>')
-                self.html_content.append('<ul>')
-                self.in_list = True
-                self.list_type = 'ul'
-            
-            return f'<li>{text}</li>'
-        
-        # Ordered list (1., 2., 3., etc.)
-        ordered_match = re.match(r'^(\s*)(\d+\.)\s+(.+)$', line)
-        if ordered_match:
-            indent = len(ordered_match.group(1))
-            text = self.convert_inline_formatting(ordered_match.group(3))
-            
-            if not self.in_list or self.list_type != 'ol':
-                if self.in_list:
-                    self.html_content.append(f'</{self.list_type}>')
-                self.html_content.append('<ol>')
-                self.in_list = True
-                self.list_type = 'ol'
-            
-            return f'<li>{text}</li>'
-        
-        # Not a list item, close any open list
-        if self.in_list:
-            self.html_content.append(f'</{self.list_type}>')
-            self.in_list = False
-            self.list_type = None
-        
-        return None
-    
-    def process_code_blocks(self, line):
-        """Process code blocks (```language)."""
-        if line.strip().startswith('```'):
-            if not self.in_code_block:
-                # Starting code block
-                lang = line.strip()[3:].strip()
-                if lang:
-                    self.html_content.append(f'<pre><code class="language-{lang}">')
-                else:
-                    self.html_content.append('<pre><code>')
-                self.in_code_block = True
-                return True
-            else:
-                # Ending code block
-                self.html_content.append('</code></pre>')
-                self.in_code_block = False
-                return True
-        
-        if self.in_code_block:
-            # Inside code block, don't process formatting
-            self.html_content.append(line)
-            return True
-        
-        return False
-    
-    def process_horizontal_rule(self, line):
-        """Process horizontal rules (---, ***, ___)."""
-        if re.match(r'^(\*{3,}|-{3,}|_{3,})$', line.strip()):
-            return '<hr>'
-        return None
-    
-    def process_blockquotes(self, line):
-        """Process blockquotes (> text)."""
-        blockquote_match = re.match(r'^>\s+(.+)$', line)
-        if blockquote_match:
-            text = self.convert_inline_formatting(blockquote_match.group(1))
-            return f'<blockquote><p>{text}</p></blockquote>'
-        return None
-    
-    def process_paragraph(self, line):
-        """Process regular paragraphs."""
-        if line.strip():
-            text = self.convert_inline_formatting(line)
-            return f'<p>{text}</p>'
-        return None
-    
-    def convert_markdown_to_html(self, markdown_content):
-        """Convert Markdown content to HTML."""
-        lines = markdown_content.split('\n')
-        self.html_content = []
-        self.in_code_block = False
-        self.in_list = False
-        
-        for line in lines:
-            # Skip empty lines unless in code block
-            if not line.strip() and not self.in_code_block:
-                continue
-            
-            # Process code blocks first
-            if self.process_code_blocks(line):
-                continue
-            
-            # Process other elements
-            html_line = None
-            
-            # Headers
-            html_line = self.process_headers(line)
-            if html_line:
-                self.html_content.append(html_line)
-                continue
-            
-            # Lists
-            html_line = self.process_lists(line)
-            if html_line:
-                self.html_content.append(html_line)
-                continue
-            
-            # Horizontal rules
-            html_line = self.process_horizontal_rule(line)
-            if html_line:
-                self.html_content.append(html_line)
-                continue
-            
-            # Blockquotes
-            html_line = self.process_blockquotes(line)
-            if html_line:
-                self.html_content.append(html_line)
-                continue
-            
-            # Regular paragraphs
-            html_line = self.process_paragraph(line)
-            if html_line:
-                self.html_content.append(html_line)
-        
-        # Close any remaining open lists
-        if self.in_list:
-            self.html_content.append(f'</{self.list_type}>')
-        
-        return '\n'.join(self.html_content)
-    
-    def create_complete_html(self, body_content, title="Converted Document"):
-        """Create a complete HTML document with proper structure."""
-        return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            color: #333;
-        }}
-        h1, h2, h3, h4, h5, h6 {{
-            margin-top: 1.5em;
-            margin-bottom: 0.5em;
-        }}
-        h1 {{ font-size: 2em; }}
-        h2 {{ font-size: 1.5em; }}
-        h3 {{ font-size: 1.25em; }}
-        code {{
-            background-color: #f4f4f4;
-            padding: 2px 4px;
-            border-radius: 3px;
-            font-family: 'Courier New', Courier, monospace;
-        }}
-        pre {{
-            background-color: #f4f4f4;
-            padding: 15px;
-            border-radius: 5px;
-            overflow-x: auto;
-        }}
-        pre code {{
-            background-color: transparent;
-            padding: 0;
-        }}
-        blockquote {{
-            border-left: 4px solid #ddd;
-            margin: 0;
-            padding-left: 20px;
-            color: #666;
-        }}
-        a {{
-            color: #0066cc;
-            text-decoration: none;
-        }}
-        a:hover {{
-            text-decoration: underline;
-        }}
-        hr {{
-            border: none;
-            height: 1px;
-            background-color: #ddd;
-            margin: 2em 0;
-        }}
-        img {{
-            max-width: 100%;
-            height: auto;
-        }}
-        ul, ol {{
-            margin: 1em 0;
-            padding-left: 2em;
-        }}
-        li {{
-            margin: 0.5em 0;
-        }}
-    </style>
-</head>
-<body>
-{body_content}
-</body>
-</html>"""
-
-
-def main():
-    parser = argparse.ArgumentParser(
-        description='Convert Markdown files to HTML',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog='''
-Examples:
-  %(prog)s input.md                    # Creates input.html
-  %(prog)s input.md -o output.html     # Creates output.html
-  %(prog)s input.md --title "My Doc"   # Sets HTML title
-        '''
-    )
-    
-    parser.add_argument('input_file', help='Input Markdown file')
-    parser.add_argument('-o', '--output', help='Output HTML file (defaults to input filename with .html extension)')
-    parser.add_argument('-t', '--title', help='HTML document title (defaults to filename)')
-    parser.add_argument('--no-css', action='store_true', help='Generate HTML without embedded CSS')
-    
-    args = parser.parse_args()
-    
-    # Validate input file
-    input_path = Path(args.input_file)
-    if not input_path.exists():
-        print(f"Error: Input file '{args.input_file}' not found.", file=sys.stderr)
-        sys.exit(1)
-    
-    if not input_path.suffix.lower() == '.md':
-        print(f"Warning: Input file doesn't have .md extension")
-    
-    # Determine output file
-    if args.output:
-        output_path = Path(args.output)
-    else:
-        output_path = input_path.with_suffix('.html')
-    
-    # Determine title
-    title = args.title or input_path.stem
-    
-    try:
-        # Read Markdown file
-        with open(input_path, 'r', encoding='utf-8') as f:
-            markdown_content = f.read()
-        
-        # Convert to HTML
-        converter = MarkdownToHtml()
-        html_body = converter.convert_markdown_to_html(markdown_content)
-        
-        # Create complete HTML document
-        if args.no_css:
-            html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-</head>
-<body>
-{html_body}
-</body>
-</html>"""
-        else:
-            html_content = converter.create_complete_html(html_body, title)
-        
-        # Write HTML file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print(f"Successfully converted '{input_path}' to '{output_path}'")
-        
-    except FileNotFoundError:
-        print(f"Error: Could not read file '{input_path}'", file=sys.stderr)
-        sys.exit(1)
-    except PermissionError:
-        print(f"Error: Permission denied when writing to '{output_path}'", file=sys.stderr)
-        sys.exit(1)
-    except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
-        sys.exit(1)
-
-
-if __name__ == '__main__':
+#!/usr/bin/env python3
+"""
+Markdown to HTML Converter
+A command-line tool that converts Markdown files to clean HTML files.
+"""
+
+import os
+import re
+import sys
+import mmap
+import argparse
+from pathlib import Path
+
+
+# Characters that can start an inline token. Lines without any of them
+# need no inline processing at all.
+INLINE_DELIMS_RE = re.compile(r'[`*_\[~]')
+# Characters that a later pass could pair across a link once its text and
+# URL have been swapped round; lines with such links replay the passes.
+LINK_TEXT_UNSAFE_RE = re.compile(r'[!\[\]()~]')
+LINK_URL_UNSAFE_RE = re.compile(r'[!\[\]()]')
+
+
+# Pieces of the generated HTML document, around the title and the body
+DOCUMENT_START = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>"""
+DOCUMENT_STYLE = """    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            line-height: 1.6;
+            max-width: 800px;
+            margin: 0 auto;
+            padding: 20px;
+            color: #333;
+        }
+        h1, h2, h3, h4, h5, h6 {
+            margin-top: 1.5em;
+            margin-bottom: 0.5em;
+        }
+        h1 { font-size: 2em; }
+        h2 { font-size: 1.5em; }
+        h3 { font-size: 1.25em; }
+        code {
+            background-color: #f4f4f4;
+            padding: 2px 4px;
+            border-radius: 3px;
+            font-family: 'Courier New', Courier, monospace;
+        }
+        pre {
+            background-color: #f4f4f4;
+            padding: 15px;
+            border-radius: 5px;
+            overflow-x: auto;
+        }
+        pre code {
+            background-color: transparent;
+            padding: 0;
+        }
+        blockquote {
+            border-left: 4px solid #ddd;
+            margin: 0;
+            padding-left: 20px;
+            color: #666;
+        }
+        a {
+            color: #0066cc;
+            text-decoration: none;
+        }
+        a:hover {
+            text-decoration: underline;
+        }
+        hr {
+            border: none;
+            height: 1px;
+            background-color: #ddd;
+            margin: 2em 0;
+        }
+        img {
+            max-width: 100%;
+            height: auto;
+        }
+        ul, ol {
+            margin: 1em 0;
+            padding-left: 2em;
+        }
+        li {
+            margin: 0.5em 0;
+        }
+    </style>
+"""
+DOCUMENT_HEAD_END = """</title>
+{style}</head>
+<body>
+"""
+DOCUMENT_TAIL = """
+</body>
+</html>"""
+
+# Bytes of Markdown decoded at a time when converting from a memory map
+MMAP_WINDOW = 1024 * 1024
+
+
+def scan_inline(text):
+    """Convert inline formatting in a single left-to-right scan.
+
+    Produces exactly what the sequential regex passes in
+    ``convert_inline_formatting_legacy`` produce. Each delimiter kind is
+    paired the way its regex would pair it (leftmost opener, nearest
+    closer), and tokens that cross each other are emitted as-is, just like
+    the regex passes do. Returns None for the rare lines where a link's
+    text or URL holds characters a later pass could re-pair after the
+    swap, so the caller can replay the passes one by one (``replay_inline``).
+    Text spanning several lines is handed back the same way, since ``.``
+    stops at newlines.
+    """
+    if '\n' in text:
+        return None
+    find = text.find
+    search = INLINE_DELIMS_RE.search
+    n = len(text)
+    root = parts = []
+    last = pos = 0
+    has_link = False
+
+    # Unmatched single-character openers: (position, list, index in list)
+    code = em_star = em_under = None
+    # Positions of the expected closers of open double-character tokens
+    strong_star = strong_under = strike = -1
+    # Set once a double-character delimiter can no longer find a closer
+    star_done = under_done = tilde_done = False
+    # Open link: end of its text, end of its URL and the list for the URL
+    link_text_end = link_url_end = -1
+    link_url = None
+    image_end = -1
+    # Last ']' and ')' searches as (start, result); a later search starting
+    # between the two gets the same answer, which keeps runs of unmatched
+    # brackets linear instead of rescanning to the end for each one.
+    bracket_search = paren_search = (n + 1, -1)
+
+    while True:
+        match = search(text, pos)
+        p = match.start() if match else n
+
+        # Close any link or image whose end lies before this delimiter
+        if link_text_end >= 0 and p > link_text_end:
+            parts.append(text[last:link_text_end])
+            parts = link_url
+            last = link_text_end + 2
+            link_text_end = -1
+        if link_url_end >= 0 and p > link_url_end:
+            parts.append(text[last:link_url_end])
+            parts = root
+            last = link_url_end + 1
+            link_url_end = -1
+        if image_end >= 0 and p > image_end:
+            parts.append(text[last:image_end])
+            parts.append('" alt="">')
+            last = image_end + 1
+            image_end = -1
+
+        if match is None:
+            break
+
+        char = text[p]
+        pos = p + 1
+
+        if char == '`':
+            if code is not None and p > code[0] + 1:
+                parts.append(text[last:p])
+                parts.append('</code>')
+                code[1][code[2]] = '<code>'
+                code = None
+            else:
+                parts.append(text[last:p])
+                code = (p, parts, len(parts))
+                parts.append('`')
+            last = pos
+
+        elif char == '*' or char == '_':
+            star = char == '*'
+            closer = strong_star if star else strong_under
+            if p == closer:
+                parts.append(text[last:p])
+                parts.append('</strong>')
+                last = pos = p + 2
+                if star:
+                    strong_star = -1
+                else:
+                    strong_under = -1
+                continue
+            if (closer < 0 and not (star_done if star else under_done)
+                    and p + 1 < n and text[p + 1] == char):
+                closer = find(char * 2, p + 3)
+                if closer >= 0:
+                    parts.append(text[last:p])
+                    parts.append('<strong>')
+                    last = pos = p + 2
+                    if star:
+                        strong_star = closer
+                    else:
+                        strong_under = closer
+                    continue
+                if star:
+                    star_done = True
+                else:
+                    under_done = True
+            # Left over for the single-character (emphasis) pass
+            opener = em_star if star else em_under
+            parts.append(text[last:p])
+            last = pos
+            if opener is not None and p > opener[0] + 1:
+                parts.append('</em>')
+                opener[1][opener[2]] = '<em>'
+                opener = None
+            elif opener is None:
+                opener = (p, parts, len(parts))
+                parts.append(char)
+            else:
+                parts.append(char)
+            if star:
+                em_star = opener
+            else:
+                em_under = opener
+
+        elif char == '~':
+            if p == strike:
+                parts.append(text[last:p])
+                parts.append('</del>')
+                last = pos = p + 2
+                strike = -1
+            elif (strike < 0 and not tilde_done
+                    and p + 1 < n and text[p + 1] == '~'):
+                strike = find('~~', p + 3)
+                if strike >= 0:
+                    parts.append(text[last:p])
+                    parts.append('<del>')
+                    last = pos = p + 2
+                else:
+                    tilde_done = True
+
+        else:  # '['
+            start, close = bracket_search
+            if not start <= p + 1 <= (close if close >= 0 else n):
+                close = find(']', p + 1)
+                bracket_search = (p + 1, close)
+            if close > p + 1:
+                if close + 1 < n and text[close + 1] == '(':
+                    start, end = paren_search
+                    if not start <= close + 2 <= (end if end >= 0 else n):
+                        end = find(')', close + 2)
+                        paren_search = (close + 2, end)
+                    if end > close + 2:
+                        if (LINK_TEXT_UNSAFE_RE.search(text, p + 1, close)
+                                or LINK_URL_UNSAFE_RE.search(text, close + 2, end)):
+                            return None
+                        parts.append(text[last:p])
+                        link_url = []
+                        link_text = []
+                        parts.extend(('<a href="', link_url, '">', link_text, '</a>'))
+                        parts = link_text
+                        last = pos
+                        link_text_end = close
+                        link_url_end = end
+                        has_link = True
+            elif (close == p + 1 and p > 0 and text[p - 1] == '!'
+                    and close + 1 < n and text[close + 1] == '('):
+                # Only images with empty alt text survive the link pass
+                start, end = paren_search
+                if not start <= close + 2 <= (end if end >= 0 else n):
+                    end = find(')', close + 2)
+                    paren_search = (close + 2, end)
+                if end > close + 2:
+                    if find('[', close + 2, end) >= 0:
+                        return None
+                    parts.append(text[last:p - 1])
+                    parts.append('<img src="')
+                    last = pos = close + 2
+                    image_end = end
+
+    parts.append(text[last:])
+    if has_link:
+        return ''.join(part if isinstance(part, str) else ''.join(part)
+                       for part in root)
+    return ''.join(root)
+
+
+def cached_find(text, char):
+    """Return find(start) -> text.find(char, start) for non-decreasing starts.
+
+    The last answer is reused while the start has not passed it, so a run of
+    failed matches searching for the same closer stays linear.
+    """
+    last = [len(text) + 1, -1]
+
+    def find(start):
+        if not last[0] <= start <= (last[1] if last[1] >= 0 else len(text)):
+            last[0], last[1] = start, text.find(char, start)
+        return last[1]
+    return find
+
+
+def replace_lazy(text, delim, tag):
+    """``re.sub(D(.+?)D, <tag>\\1</tag>)`` for a literal D, on a single line."""
+    find = text.find
+    width = len(delim)
+    parts = []
+    last = 0
+    while True:
+        p = find(delim, last)
+        if p < 0:
+            break
+        # No closer after the first opener means none after any later one
+        close = find(delim, p + width + 1)
+        if close < 0:
+            break
+        parts.extend((text[last:p], f'<{tag}>', text[p + width:close], f'</{tag}>'))
+        last = close + width
+    parts.append(text[last:])
+    return ''.join(parts)
+
+
+def replace_code(text):
+    """``re.sub(`([^`]+)`, <code>\\1</code>)``."""
+    find = text.find
+    parts = []
+    last = pos = 0
+    while True:
+        p = find('`', pos)
+        close = find('`', p + 1) if p >= 0 else -1
+        if close < 0:
+            break
+        if close == p + 1:
+            pos = close
+            continue
+        parts.extend((text[last:p], '<code>', text[p + 1:close], '</code>'))
+        last = pos = close + 1
+    parts.append(text[last:])
+    return ''.join(parts)
+
+
+def replace_links(text, image=False):
+    """The link (or image) regex pass: ``[text](url)`` or ``![alt](url)``."""
+    opener = '![' if image else '['
+    find = text.find
+    find_bracket = cached_find(text, ']')
+    find_paren = cached_find(text, ')')
+    n = len(text)
+    parts = []
+    last = pos = 0
+    while True:
+        p = find(opener, pos)
+        if p < 0:
+            break
+        start = p + len(opener)
+        close = find_bracket(start)
+        if close < 0:
+            break
+        pos = p + 1
+        if (close == start and not image) or close + 1 >= n or text[close + 1] != '(':
+            continue
+        end = find_paren(close + 2)
+        if end < 0:
+            break
+        if end == close + 2:
+            continue
+        url = text[close + 2:end]
+        label = text[start:close]
+        parts.append(text[last:p])
+        parts.append(f'<img src="{url}" alt="{label}">' if image else f'<a href="{url}">{label}</a>')
+        last = pos = end + 1
+    parts.append(text[last:])
+    return ''.join(parts)
+
+
+def replay_inline(text):
+    """Apply the regex passes of ``convert_inline_formatting_legacy`` one by
+    one, each in a single linear scan.
+
+    Used for the lines ``scan_inline`` hands back, where the regexes would
+    rescan the rest of the line for every unmatched opener. Returns None for
+    text spanning several lines.
+    """
+    if '\n' in text:
+        return None
+    text = replace_code(text)
+    text = replace_lazy(text, '**', 'strong')
+    text = replace_lazy(text, '__', 'strong')
+    text = replace_lazy(text, '*', 'em')
+    text = replace_lazy(text, '_', 'em')
+    text = replace_links(text)
+    text = replace_links(text, image=True)
+    return replace_lazy(text, '~~', 'del')
+
+
+def has_glob_magic(pattern):
+    """Return True if the pattern contains glob wildcards."""
+    return any(char in pattern for char in '*?[')
+
+
+def iter_markdown_lines(file):
+    """Yield the lines of a text file the way ``str.split('\\n')`` would."""
+    line = ''
+    for line in file:
+        yield line[:-1] if line.endswith('\n') else line
+    if not line or line.endswith('\n'):
+        yield ''
+
+
+def _next_line(buffer, start, end):
+    """Return (line_end, next_start) for the line at `start`.
+
+    Accepts '\\n', '\\r\\n' and '\\r' endings like text mode does;
+    `next_start` is None when the line runs to the end of the buffer.
+    """
+    newline = buffer.find(b'\n', start, end)
+    carriage = buffer.find(b'\r', start, end if newline < 0 else newline)
+    if carriage >= 0:
+        if carriage + 1 == newline:
+            return carriage, newline + 1
+        return carriage, carriage + 1
+    if newline >= 0:
+        return newline, newline + 1
+    return end, None
+
+
+def _decode_block(raw):
+    """Decode several raw lines at once, normalizing their line endings."""
+    text = raw.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def iter_mmap_lines(buffer, window=MMAP_WINDOW):
+    """Yield the Markdown lines of a UTF-8 buffer (such as an mmap) for ``iter_html``.
+
+    Text outside code blocks is decoded a window of whole lines at a time,
+    so at most about `window` bytes of it are held as strings, and mapped
+    pages behind the current window are released as conversion moves on. The body of
+    each code fence is found with ``find`` over the buffer, decoded in one
+    piece and yielded as a single string holding its lines joined by
+    '\n', which the parser copies to the output unchanged. The HTML is the
+    same as for the text-mode lines of ``iter_markdown_lines``.
+    """
+    end = len(buffer)
+    find = buffer.find
+    # Pages already converted are handed back so the mapping's RSS stays flat
+    release = getattr(buffer, 'madvise', None) if hasattr(mmap, 'MADV_DONTNEED') else None
+    released = 0
+    start = 0
+    while start is not None:
+        if release and start - released >= window:
+            page = start - start % mmap.PAGESIZE
+            release(mmap.MADV_DONTNEED, released, page - released)
+            released = page
+
+        # Decode up to the last line ending before the window's end or the next ```
+        limit = min(start + window, end)
+        fence = find(b'```', start, limit)
+        if fence < 0 and limit == end:
+            yield from _decode_block(buffer[start:end]).split('\n')
+            return
+        cut = buffer.rfind(b'\n', start, limit if fence < 0 else fence)
+        if cut >= 0:
+            # Leave out the line ending itself, '\r\n' included
+            line_end = cut - 1 if cut > start and buffer[cut - 1:cut] == b'\r' else cut
+            yield from _decode_block(buffer[start:line_end]).split('\n')
+            start = cut + 1
+            continue
+
+        # The line at `start` may open a code fence (or is longer than the window)
+        line_end, next_start = _next_line(buffer, start, end)
+        line = buffer[start:line_end].decode('utf-8')
+        start = next_start
+        yield line
+        if not line.strip().startswith('```') or start is None:
+            continue
+
+        # Jump to the closing fence: only a line holding ``` can close it
+        body_start = start
+        search = start
+        while True:
+            fence = find(b'```', search, end)
+            if fence < 0:
+                yield _decode_block(buffer[body_start:end])
+                return
+            line_start = max(buffer.rfind(b'\n', body_start, fence),
+                             buffer.rfind(b'\r', body_start, fence), body_start - 1) + 1
+            line_end, next_start = _next_line(buffer, line_start, end)
+            line = buffer[line_start:line_end].decode('utf-8')
+            if line.strip().startswith('```'):
+                break
+            search = fence + 3
+        if line_start > body_start:
+            # The body runs up to the line ending before the closing fence
+            body_end = line_start - 1
+            if buffer[body_end - 1:line_start] == b'\r\n':
+                body_end -= 1
+            yield _decode_block(buffer[body_start:body_end])
+        yield line
+        start = next_start
+
+
+class MarkdownToHtml:
+    # Block-level patterns, compiled once for every instance
+    HEADER_RE = re.compile(r'^(#{1,6})\s+(.+)$')
+    UNORDERED_RE = re.compile(r'^(\s*)([-*+])\s+(.+)$')
+    ORDERED_RE = re.compile(r'^(\s*)(\d+\.)\s+(.+)$')
+    HR_RE = re.compile(r'^(\*{3,}|-{3,}|_{3,})$')
+    BLOCKQUOTE_RE = re.compile(r'^>\s+(.+)$')
+
+    # Inline regex passes, applied in this order by the legacy converter
+    INLINE_RULES = (
+        # Code blocks (backticks) - handle first to avoid conflicts
+        (re.compile(r'`([^`]+)`'), r'<code>\1</code>'),
+        # Bold (**text** or __text__)
+        (re.compile(r'\*\*(.+?)\*\*'), r'<strong>\1</strong>'),
+        (re.compile(r'__(.+?)__'), r'<strong>\1</strong>'),
+        # Italics (*text* or _text_)
+        (re.compile(r'\*(.+?)\*'), r'<em>\1</em>'),
+        (re.compile(r'_(.+?)_'), r'<em>\1</em>'),
+        # Links [text](url)
+        (re.compile(r'\[([^\]]+)\]\(([^)]+)\)'), r'<a href="\2">\1</a>'),
+        # Images ![alt](url)
+        (re.compile(r'!\[([^\]]*)\]\(([^)]+)\)'), r'<img src="\2" alt="\1">'),
+        # Strikethrough ~~text~~
+        (re.compile(r'~~(.+?)~~'), r'<del>\1</del>'),
+    )
+
+    # Encoded document shell (start, end of head, tail), keyed by include_css
+    DOCUMENT_SHELLS = {
+        include_css: (
+            DOCUMENT_START.encode('utf-8'),
+            DOCUMENT_HEAD_END.format(style=DOCUMENT_STYLE if include_css else '').encode('utf-8'),
+            DOCUMENT_TAIL.encode('utf-8'),
+        )
+        for include_css in (True, False)
+    }
+
+    def __init__(self):
+        self.html_content = []
+        self.in_code_block = False
+        self.in_list = False
+        self.list_type = None
+        self.list_level = 0
+    
+    def convert_inline_formatting(self, text):
+        """Convert inline Markdown formatting to HTML."""
+        if INLINE_DELIMS_RE.search(text) is None:
+            return text
+        html = scan_inline(text)
+        if html is None:
+            html = replay_inline(text)
+        if html is None:
+            return self.convert_inline_formatting_legacy(text)
+        return html
+
+    def convert_inline_formatting_legacy(self, text):
+        """Convert inline formatting with one regex pass per token type.
+
+        This is the reference behaviour ``scan_inline`` reproduces.
+        """
+        for pattern, replacement in self.INLINE_RULES:
+            text = pattern.sub(replacement, text)
+        
+        return text
+    
+    def process_headers(self, line):
+        """Process header lines (#, ##, ###, etc.)."""
+        header_match = self.HEADER_RE.match(line)
+        if header_match:
+            level = len(header_match.group(1))
+            text = self.convert_inline_formatting(header_match.group(2))
+            return f'<h{level}>{text}</h{level}>'
+        return None
+    
+    def process_lists(self, line):
+        """Process ordered and unordered lists."""
+        # Unordered list (-, *, +)
+        unordered_match = self.UNORDERED_RE.match(line)
+        if unordered_match:
+            indent = len(unordered_match.group(1))
+            text = self.convert_inline_formatting(unordered_match.group(3))
+            
+            if not self.in_list or self.list_type != 'ul':
+                if self.in_list:
+                    self.html_content.append(f'</{self.list_type}>')
+                self.html_content.append('<ul>')
+                self.in_list = True
+                self.list_type = 'ul'
+            
+            return f'<li>{text}</li>'
+        
+        # Ordered list (1., 2., 3., etc.)
+        ordered_match = self.ORDERED_RE.match(line)
+        if ordered_match:
+            indent = len(ordered_match.group(1))
+            text = self.convert_inline_formatting(ordered_match.group(3))
+            
+            if not self.in_list or self.list_type != 'ol':
+                if self.in_list:
+                    self.html_content.append(f'</{self.list_type}>')
+                self.html_content.append('<ol>')
+                self.in_list = True
+                self.list_type = 'ol'
+            
+            return f'<li>{text}</li>'
+        
+        # Not a list item, close any open list
+        if self.in_list:
+            self.html_content.append(f'</{self.list_type}>')
+            self.in_list = False
+            self.list_type = None
+        
+        return None
+    
+    def process_code_blocks(self, line):
+        """Process code blocks (```language)."""
+        if line.strip().startswith('```'):
+            if not self.in_code_block:
+                # Starting code block
+                lang = line.strip()[3:].strip()
+                if lang:
+                    self.html_content.append(f'<pre><code class="language-{lang}">')
+                else:
+                    self.html_content.append('<pre><code>')
+                self.in_code_block = True
+                return True
+            else:
+                # Ending code block
+                self.html_content.append('</code></pre>')
+                self.in_code_block = False
+                return True
+        
+        if self.in_code_block:
+            # Inside code block, don't process formatting
+            self.html_content.append(line)
+            return True
+        
+        return False
+    
+    def process_horizontal_rule(self, line):
+        """Process horizontal rules (---, ***, ___)."""
+        if self.HR_RE.match(line.strip()):
+            return '<hr>'
+        return None
+    
+    def process_blockquotes(self, line):
+        """Process blockquotes (> text)."""
+        blockquote_match = self.BLOCKQUOTE_RE.match(line)
+        if blockquote_match:
+            text = self.convert_inline_formatting(blockquote_match.group(1))
+            return f'<blockquote><p>{text}</p></blockquote>'
+        return None
+    
+    def process_paragraph(self, line):
+        """Process regular paragraphs."""
+        if line.strip():
+            text = self.convert_inline_formatting(line)
+            return f'<p>{text}</p>'
+        return None
+    
+    def convert_line(self, line):
+        """Convert one line, dispatching on its first non-space character.
+
+        Matches the legacy check order (code fence, header, list,
+        horizontal rule, blockquote, paragraph) but only runs the patterns
+        that can match the line.
+        """
+        html = self.html_content
+        stripped = line.strip()
+
+        if self.in_code_block:
+            if stripped.startswith('```'):
+                html.append('</code></pre>')
+                self.in_code_block = False
+            else:
+                html.append(line)
+            return
+
+        if not stripped:
+            return
+
+        first = stripped[0]
+
+        if first == '`' and stripped.startswith('```'):
+            lang = stripped[3:].strip()
+            if lang:
+                html.append(f'<pre><code class="language-{lang}">')
+            else:
+                html.append('<pre><code>')
+            self.in_code_block = True
+            return
+
+        if first == '#':
+            header_match = self.HEADER_RE.match(line)
+            if header_match:
+                level = len(header_match.group(1))
+                text = self.convert_inline_formatting(header_match.group(2))
+                html.append(f'<h{level}>{text}</h{level}>')
+                return
+        elif first in '-*+' or first.isdecimal():
+            list_type = 'ol' if first.isdecimal() else 'ul'
+            list_match = (self.ORDERED_RE if list_type == 'ol' else self.UNORDERED_RE).match(line)
+            if list_match:
+                text = self.convert_inline_formatting(list_match.group(3))
+                if not self.in_list or self.list_type != list_type:
+                    if self.in_list:
+                        html.append(f'</{self.list_type}>')
+                    html.append(f'<{list_type}>')
+                    self.in_list = True
+                    self.list_type = list_type
+                html.append(f'<li>{text}</li>')
+                return
+
+        # Anything that is not a list item closes an open list
+        if self.in_list:
+            html.append(f'</{self.list_type}>')
+            self.in_list = False
+            self.list_type = None
+
+        if first in '-*_' and self.HR_RE.match(stripped):
+            html.append('<hr>')
+            return
+
+        if first == '>':
+            blockquote_match = self.BLOCKQUOTE_RE.match(line)
+            if blockquote_match:
+                text = self.convert_inline_formatting(blockquote_match.group(1))
+                html.append(f'<blockquote><p>{text}</p></blockquote>')
+                return
+
+        html.append(f'<p>{self.convert_inline_formatting(line)}</p>')
+
+    def convert_markdown_to_html(self, markdown_content):
+        """Convert Markdown content to HTML."""
+        self.html_content = []
+        self.in_code_block = False
+        self.in_list = False
+
+        convert_line = self.convert_line
+        for line in markdown_content.split('\n'):
+            convert_line(line)
+
+        # Close any remaining open lists
+        if self.in_list:
+            self.html_content.append(f'</{self.list_type}>')
+
+        return '\n'.join(self.html_content)
+
+    def iter_html(self, lines):
+        """Convert Markdown lines to HTML, yielding each block as it closes.
+
+        `lines` are Markdown lines without their line endings. Lists and
+        code blocks are held back until they close, everything else is
+        yielded straight away. Joined together, the chunks equal the
+        output of ``convert_markdown_to_html``.
+        """
+        self.html_content = []
+        self.in_code_block = False
+        self.in_list = False
+
+        html = self.html_content
+        convert_line = self.convert_line
+        separator = ''
+        for line in lines:
+            convert_line(line)
+            if html and not self.in_list and not self.in_code_block:
+                yield separator + '\n'.join(html)
+                html.clear()
+                separator = '\n'
+
+        # Close any remaining open lists
+        if self.in_list:
+            html.append(f'</{self.list_type}>')
+        if html:
+            yield separator + '\n'.join(html)
+            html.clear()
+
+    def parser_state(self):
+        """Return the state that decides how the next line is converted."""
+        return (self.in_code_block, self.in_list, self.list_type if self.in_list else None)
+
+    def convert_lines_from(self, lines, state):
+        """Convert lines starting in `state`; return (HTML lines, end state)."""
+        self.html_content = []
+        self.in_code_block, self.in_list, self.list_type = state
+        convert_line = self.convert_line
+        for line in lines:
+            convert_line(line)
+        return self.html_content, self.parser_state()
+
+    def convert_markdown_to_html_legacy(self, markdown_content):
+        """Convert Markdown content to HTML, trying every block pattern per line."""
+        lines = markdown_content.split('\n')
+        self.html_content = []
+        self.in_code_block = False
+        self.in_list = False
+        
+        for line in lines:
+            # Skip empty lines unless in code block
+            if not line.strip() and not self.in_code_block:
+                continue
+            
+            # Process code blocks first
+            if self.process_code_blocks(line):
+                continue
+            
+            # Process other elements
+            html_line = None
+            
+            # Headers
+            html_line = self.process_headers(line)
+            if html_line:
+                self.html_content.append(html_line)
+                continue
+            
+            # Lists
+            html_line = self.process_lists(line)
+            if html_line:
+                self.html_content.append(html_line)
+                continue
+            
+            # Horizontal rules
+            html_line = self.process_horizontal_rule(line)
+            if html_line:
+                self.html_content.append(html_line)
+                continue
+            
+            # Blockquotes
+            html_line = self.process_blockquotes(line)
+            if html_line:
+                self.html_content.append(html_line)
+                continue
+            
+            # Regular paragraphs
+            html_line = self.process_paragraph(line)
+            if html_line:
+                self.html_content.append(html_line)
+        
+        # Close any remaining open lists
+        if self.in_list:
+            self.html_content.append(f'</{self.list_type}>')
+        
+        return '\n'.join(self.html_content)
+    
+    def convert_file(self, input_path, output_path, title, include_css=True, stream=False):
+        """Convert a Markdown file and write the complete HTML document.
+
+        `stream` converts line by line instead of reading the whole file;
+        ``'mmap'`` streams from a memory map of the file instead of a
+        text-mode reader.
+        """
+        start, head_end, tail = self.DOCUMENT_SHELLS[include_css]
+
+        if stream == 'mmap':
+            with open(input_path, 'rb') as src, open(output_path, 'wb') as out:
+                out.write(start + title.encode('utf-8') + head_end)
+                if os.fstat(src.fileno()).st_size:
+                    with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                        for chunk in self.iter_html(iter_mmap_lines(buffer)):
+                            out.write(chunk.encode('utf-8'))
+                out.write(tail)
+            return
+
+        if stream:
+            # Convert line by line, writing each block as soon as it closes
+            with open(input_path, 'r', encoding='utf-8') as src, open(output_path, 'wb') as out:
+                out.write(start + title.encode('utf-8') + head_end)
+                for chunk in self.iter_html(iter_markdown_lines(src)):
+                    out.write(chunk.encode('utf-8'))
+                out.write(tail)
+            return
+        
+        # Read Markdown file
+        with open(input_path, 'r', encoding='utf-8') as f:
+            markdown_content = f.read()
+        
+        # Convert to HTML
+        html_body = self.convert_markdown_to_html(markdown_content)
+        
+        # Write HTML file
+        with open(output_path, 'wb') as f:
+            f.write(self.create_document_bytes(html_body, title, include_css))
+
+    def create_document_bytes(self, body_content, title="Converted Document", include_css=True):
+        """Create the complete HTML document as UTF-8 bytes from the prebuilt shell."""
+        start, head_end, tail = self.DOCUMENT_SHELLS[include_css]
+        return b''.join((start, title.encode('utf-8'), head_end, body_content.encode('utf-8'), tail))
+
+    def create_html_head(self, title="Converted Document", include_css=True):
+        """Create the HTML document up to and including the opening body tag."""
+        style = DOCUMENT_STYLE if include_css else ''
+        return DOCUMENT_START + title + DOCUMENT_HEAD_END.format(style=style)
+
+    def create_html_tail(self):
+        """Create the HTML document from the closing body tag onwards."""
+        return DOCUMENT_TAIL
+
+    def create_complete_html(self, body_content, title="Converted Document", include_css=True):
+        """Create a complete HTML document with proper structure."""
+        return self.create_html_head(title, include_css) + body_content + DOCUMENT_TAIL
+
+
+class IncrementalRenderer:
+    """Re-render a document block by block, for live previews.
+
+    The source is split into blocks, each starting at a non-blank line that
+    follows a blank one. A block's HTML is cached under its text and the
+    parser state at its start (inside a code block, inside a list and which
+    kind), so after an edit only the edited blocks, and any later blocks
+    whose start state changed, are converted again.
+    """
+
+    INITIAL_STATE = (False, False, None)
+
+    def __init__(self, converter=None):
+        self.converter = converter or MarkdownToHtml()
+        self.blocks = []       # source text of each block
+        self.states = []       # parser state at the start of each block
+        self.end_states = []   # parser state after each block
+        self.block_html = []   # HTML each block converts to
+        self.html = []         # the same, with a list still open at the end closed
+        self.cache = {}        # (text, start state) -> (HTML, end state)
+        self.converted = 0     # blocks converted by the last update
+
+    @staticmethod
+    def split_blocks(markdown_content):
+        """Split Markdown source into block texts."""
+        blocks = []
+        current = []
+        previous_blank = False
+        for line in markdown_content.split('\n'):
+            blank = not line.strip()
+            if current and previous_blank and not blank:
+                blocks.append('\n'.join(current))
+                current = []
+            current.append(line)
+            previous_blank = blank
+        blocks.append('\n'.join(current))
+        return blocks
+
+    def render_block(self, text, state):
+        """Return (HTML, end state) for a block, converting it only on a cache miss."""
+        key = (text, state)
+        cached = self.cache.get(key)
+        if cached is None:
+            html_lines, end_state = self.converter.convert_lines_from(text.split('\n'), state)
+            cached = ('\n'.join(html_lines), end_state)
+            self.cache[key] = cached
+            self.converted += 1
+        return cached
+
+    def update(self, markdown_content):
+        """Re-render the document and return a patch of changed blocks.
+
+        The patch maps block index to its new HTML ('' for a block with no
+        output); indices past the new block count map to None and should be
+        removed. Applying it to the previous block list gives ``self.html``.
+        """
+        old_blocks, old_states = self.blocks, self.states
+        old_ends, old_html = self.end_states, self.block_html
+        blocks = self.split_blocks(markdown_content)
+        self.converted = 0
+
+        # Unchanged leading blocks keep their state and HTML
+        limit = min(len(blocks), len(old_blocks))
+        prefix = 0
+        while prefix < limit and blocks[prefix] == old_blocks[prefix]:
+            prefix += 1
+        # Unchanged trailing blocks are reused once the state reaching them agrees
+        suffix = 0
+        while suffix < limit - prefix and blocks[-1 - suffix] == old_blocks[-1 - suffix]:
+            suffix += 1
+
+        states = old_states[:prefix]
+        end_states = old_ends[:prefix]
+        block_html = old_html[:prefix]
+        state = end_states[-1] if end_states else self.INITIAL_STATE
+        shift = len(old_blocks) - len(blocks)
+
+        for index in range(prefix, len(blocks)):
+            if index >= len(blocks) - suffix and state == old_states[index + shift]:
+                states.extend(old_states[index + shift:])
+                end_states.extend(old_ends[index + shift:])
+                block_html.extend(old_html[index + shift:])
+                break
+            html, end_state = self.render_block(blocks[index], state)
+            states.append(state)
+            end_states.append(end_state)
+            block_html.append(html)
+            state = end_state
+
+        # Keep only the cache entries the current document uses
+        self.cache = {(text, start): (html, end)
+                      for text, start, end, html in zip(blocks, states, end_states, block_html)}
+
+        # Close a list left open at the end of the document
+        html = list(block_html)
+        end_state = end_states[-1]
+        if end_state[1]:
+            closing = f'</{end_state[2]}>'
+            html[-1] = f'{html[-1]}\n{closing}' if html[-1] else closing
+
+        previous = self.html
+        self.blocks, self.states, self.end_states = blocks, states, end_states
+        self.block_html, self.html = block_html, html
+
+        patch = {index: block for index, block in enumerate(html)
+                 if index >= len(previous) or previous[index] != block}
+        for index in range(len(html), len(previous)):
+            patch[index] = None
+        return patch
+
+    def render(self):
+        """Return the full HTML body, identical to ``convert_markdown_to_html``."""
+        return '\n'.join(html for html in self.html if html)
+
+
+def run_batch_mode(args):
+    """Convert every matched file into the output tree and return the exit code."""
+    from batch import collect_sources, plan_jobs, convert_batch, BuildManifest, default_manifest_path
+    
+    sources = collect_sources(args.input_file)
+    if not sources:
+        print("Error: No Markdown files matched the given inputs.", file=sys.stderr)
+        return 1
+    
+    jobs = plan_jobs(sources, args.output, args.title, include_css=not args.no_css, stream=args.stream)
+    
+    # Skip sources whose recorded output is still current
+    manifest = None
+    if args.incremental:
+        manifest = BuildManifest(args.manifest or default_manifest_path(args.output))
+        jobs = manifest.select(jobs)
+    
+    failures = convert_batch(jobs, workers=args.jobs, quiet=args.quiet, manifest=manifest)
+    
+    if manifest is not None:
+        manifest.collect_garbage()
+        manifest.save()
+        print(f"Cache: {manifest.hits} hit(s), {manifest.misses} miss(es), "
+              f"{manifest.removed} orphaned output(s) removed")
+    return 1 if failures else 0
+
+
+def run_watch_mode(args, jobs=None):
+    """Re-render the inputs as they change, until interrupted."""
+    from batch import collect_sources, plan_jobs
+    from watch import Watcher
+    
+    def plan():
+        if jobs is not None:
+            return jobs
+        return plan_jobs(collect_sources(args.input_file), args.output, args.title,
+                         include_css=not args.no_css, stream=args.stream)
+    
+    Watcher(plan, interval=args.poll_interval, debounce=args.debounce, quiet=args.quiet).run()
+    return 0
+
+
+def main():
+    # `serve` starts the long-running rendering server instead
+    if sys.argv[1:2] == ['serve']:
+        from server import main as serve
+        serve(sys.argv[2:])
+        return
+    
+    parser = argparse.ArgumentParser(
+        description='Convert Markdown files to HTML',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  %(prog)s input.md                    # Creates input.html
+  %(prog)s input.md -o output.html     # Creates output.html
+  %(prog)s input.md --title "My Doc"   # Sets HTML title
+  %(prog)s input.md --stream           # Converts block by block
+  %(prog)s huge.md --mmap              # Streams from a memory map
+  %(prog)s docs/ -o site/ --jobs 8     # Converts a whole tree
+  %(prog)s "docs/**/*.md" -o site/     # Converts glob matches
+  %(prog)s docs/ -o site/ --incremental  # Skips unchanged files
+  %(prog)s input.md --watch            # Re-renders on every save
+  %(prog)s serve --port 8000           # Starts the rendering server
+        '''
+    )
+    
+    parser.add_argument('input_file', nargs='+',
+                        help='Input Markdown file, or several files, directories and glob patterns')
+    parser.add_argument('-o', '--output',
+                        help='Output HTML file, or output directory when converting several files '
+                             '(defaults to input filename with .html extension)')
+    parser.add_argument('-t', '--title', help='HTML document title (defaults to filename)')
+    parser.add_argument('--no-css', action='store_true', help='Generate HTML without embedded CSS')
+    parser.add_argument('--stream', action='store_true',
+                        help='Write HTML while reading, keeping only the current block in memory')
+    parser.add_argument('--mmap', action='store_true',
+                        help='Like --stream, but memory-maps the input and only decodes the lines it needs')
+    parser.add_argument('-j', '--jobs', type=int,
+                        help='Worker processes for batch conversion (defaults to the CPU count)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Only print the batch summary')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Skip files whose content and options are unchanged since the last batch run')
+    parser.add_argument('--manifest',
+                        help='Build manifest for --incremental (defaults to a file next to the output directory)')
+    parser.add_argument('--watch', action='store_true', help='Keep running and re-render files when they change')
+    parser.add_argument('--poll-interval', type=float, default=0.01,
+                        help='Seconds between file system polls in --watch mode, stretched on large trees '
+                             'so polling stays under 5%% of a core (default: 0.01)')
+    parser.add_argument('--debounce', type=float, default=0.01,
+                        help='Seconds a file must stay unchanged before it is re-rendered (default: 0.01)')
+    
+    args = parser.parse_args()
+    if args.mmap:
+        args.stream = 'mmap'
+    
+    # Several inputs, directories or globs go through the batch converter
+    if len(args.input_file) > 1 or Path(args.input_file[0]).is_dir() or has_glob_magic(args.input_file[0]):
+        sys.exit(run_watch_mode(args) if args.watch else run_batch_mode(args))
+    args.input_file = args.input_file[0]
+    
+    # Validate input file
+    input_path = Path(args.input_file)
+    if not input_path.exists():
+        print(f"Error: Input file '{args.input_file}' not found.", file=sys.stderr)
+        sys.exit(1)
+    
+    if not input_path.suffix.lower() == '.md':
+        print(f"Warning: Input file doesn't have .md extension")
+    
+    # Determine output file
+    if args.output:
+        output_path = Path(args.output)
+    else:
+        output_path = input_path.with_suffix('.html')
+    
+    # Determine title
+    title = args.title or input_path.stem
+    
+    if args.watch:
+        job = (str(input_path), str(output_path), title, not args.no_css, args.stream)
+        sys.exit(run_watch_mode(args, [job]))
+    
+    try:
+        converter = MarkdownToHtml()
+        converter.convert_file(input_path, output_path, title,
+                               include_css=not args.no_css, stream=args.stream)
+        
+        print(f"Successfully converted '{input_path}' to '{output_path}'")
+        
+    except FileNotFoundError:
+        print(f"Error: Could not read file '{input_path}'", file=sys.stderr)
+        sys.exit(1)
+    except PermissionError:
+        print(f"Error: Permission denied when writing to '{output_path}'", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
     main()
\ No newline at end of file
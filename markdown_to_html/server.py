@@ -0,0 +1,257 @@
+"""
+Markdown Rendering Server
+Keeps converters warm in a pool of worker processes and answers
+conversion requests over HTTP, with an LRU cache of rendered results.
+
+    POST /convert?title=Doc&css=0&fragment=1   Markdown in, HTML out
+    GET  /stats                                 cache and latency figures
+"""
+
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from html import escape
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from markdown import MarkdownToHtml
+
+
+# Converter reused by every request that runs in this worker process
+_worker_converter = None
+
+
+def _init_worker():
+    global _worker_converter
+    _worker_converter = MarkdownToHtml()
+
+
+def render(markdown_bytes, title, include_css, fragment):
+    """Render UTF-8 Markdown to UTF-8 HTML, either a full document or the body only.
+
+    Line endings are normalized the way reading the file in text mode would.
+    """
+    if _worker_converter is None:
+        _init_worker()
+    markdown_content = markdown_bytes.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+    body = _worker_converter.convert_markdown_to_html(markdown_content)
+    if fragment:
+        return body.encode('utf-8')
+    return _worker_converter.create_document_bytes(body, title, include_css)
+
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class RenderCache:
+    """Thread-safe LRU cache of rendered HTML, bounded by entry count and total size.
+
+    Documents larger than the whole byte budget are not cached at all.
+    """
+
+    def __init__(self, capacity, max_bytes=256 * 1024 * 1024):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            html = self.entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key, html):
+        if self.capacity <= 0 or len(html) > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous)
+            self.entries[key] = html
+            self.bytes += len(html)
+            while len(self.entries) > self.capacity or self.bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'capacity': self.capacity,
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class RenderService:
+    """Conversion front end shared by all request threads."""
+
+    def __init__(self, workers=None, cache_size=1024, cache_bytes=256 * 1024 * 1024, latency_window=10000):
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        self.cache = RenderCache(cache_size, cache_bytes)
+        self.latencies = deque(maxlen=latency_window)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.started = time.time()
+
+    def convert(self, markdown_bytes, title, include_css, fragment):
+        """Return rendered HTML bytes, from the cache when possible."""
+        start = time.perf_counter()
+        digest = hashlib.sha256(markdown_bytes).hexdigest()
+        key = (digest, title, include_css, fragment)
+        html = self.cache.get(key)
+        if html is None:
+            html = self.executor.submit(render, markdown_bytes, title, include_css, fragment).result()
+            self.cache.put(key, html)
+        self.record(time.perf_counter() - start)
+        return html
+
+    def record(self, seconds, error=False):
+        with self.lock:
+            self.requests += 1
+            if error:
+                self.errors += 1
+            else:
+                self.latencies.append(seconds)
+
+    def stats(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            requests, errors = self.requests, self.errors
+        return {
+            'requests': requests,
+            'errors': errors,
+            'uptime_seconds': int(time.time() - self.started),
+            'cache': self.cache.stats(),
+            'latency_ms': {
+                'samples': len(latencies),
+                'p50': round(percentile(latencies, 0.50) * 1000, 3),
+                'p99': round(percentile(latencies, 0.99) * 1000, 3),
+            },
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    service = None
+    max_body = 64 * 1024 * 1024
+
+    def send_body(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, payload):
+        self.send_body(status, 'application/json', json.dumps(payload).encode('utf-8'))
+
+    def do_GET(self):
+        if urlsplit(self.path).path == '/stats':
+            self.send_json(200, self.service.stats())
+        else:
+            self.send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/convert':
+            self.send_json(404, {'error': 'Not found'})
+            return
+
+        if self.headers.get('Content-Length') is None:
+            self.send_json(411, {'error': 'Content-Length required'})
+            return
+        try:
+            length = int(self.headers['Content-Length'])
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.send_json(400, {'error': 'Bad Content-Length'})
+            return
+        if length > self.max_body:
+            self.send_json(413, {'error': f'Body larger than {self.max_body} bytes'})
+            return
+
+        query = parse_qs(url.query)
+        # The title lands in <title> as is, so it must not carry markup
+        title = escape(query.get('title', ['Converted Document'])[0])
+        include_css = query.get('css', ['1'])[0] not in ('0', 'false', 'no')
+        fragment = query.get('fragment', ['0'])[0] in ('1', 'true', 'yes')
+
+        try:
+            html = self.service.convert(self.rfile.read(length), title, include_css, fragment)
+        except UnicodeDecodeError:
+            self.service.record(0, error=True)
+            self.send_json(400, {'error': 'Body is not valid UTF-8'})
+            return
+        except Exception as e:
+            self.service.record(0, error=True)
+            self.send_json(500, {'error': str(e)})
+            return
+
+        self.send_body(200, 'text/html; charset=utf-8', html)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='markdown.py serve',
+        description='Serve Markdown to HTML conversion over HTTP'
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    parser.add_argument('-j', '--jobs', type=int, help='Converter worker processes (defaults to the CPU count)')
+    parser.add_argument('--cache-size', type=int, default=1024,
+                        help='Rendered documents kept in the LRU cache (default: 1024, 0 disables)')
+    parser.add_argument('--cache-mb', type=float, default=256,
+                        help='Total size of the rendered documents kept in the cache (default: 256)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Do not log each request')
+    args = parser.parse_args(argv)
+
+    service = RenderService(workers=args.jobs, cache_size=args.cache_size,
+                            cache_bytes=int(args.cache_mb * 1024 * 1024))
+    handler = type('Handler', (RenderRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    server.daemon_threads = True
+    server.quiet = args.quiet
+
+    print(f"Serving on http://{args.host}:{server.server_address[1]} (POST /convert, GET /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down")
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
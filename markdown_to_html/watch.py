@@ -0,0 +1,134 @@
+"""
+Watch Mode
+Polls Markdown sources and re-renders each one shortly after it changes,
+keeping a single warm converter for the whole session.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+from markdown import MarkdownToHtml
+
+
+# Largest share of a core spent polling, and again rescanning: after either,
+# the watcher waits long enough to keep it under this, so large trees are
+# polled and rescanned less often
+POLL_CPU_SHARE = 0.05
+
+
+def throttled(seconds, spent):
+    """Return the wait after work that took `spent` seconds: at least `seconds`,
+    and long enough to keep that work under POLL_CPU_SHARE of a core."""
+    return max(seconds, spent * (1 / POLL_CPU_SHARE - 1))
+
+
+def stat_signature(path):
+    """Return (mtime_ns, size) for a file, or None if it cannot be read."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class Watcher:
+    """Re-render changed sources after a quiet period.
+
+    `plan` returns the current list of batch jobs (input, output, title,
+    include_css, stream); it is called again every `rescan` seconds to pick
+    up new and deleted files. A changed file is rendered once it has not
+    changed for `debounce` seconds, so a burst of writes renders once.
+    Polls and rescans are spaced further apart on trees big enough that
+    they would otherwise take more than POLL_CPU_SHARE of a core; renders
+    don't wait for a poll, the loop wakes as soon as a debounce expires.
+    """
+
+    def __init__(self, plan, interval=0.01, debounce=0.01, rescan=1.0, quiet=False):
+        self.plan = plan
+        self.interval = interval
+        self.debounce = debounce
+        self.rescan = rescan
+        self.quiet = quiet
+        self.converter = MarkdownToHtml()
+        self.jobs = {}
+        self.signatures = {}
+        self.pending = {}
+
+    def refresh(self):
+        """Re-plan the jobs, queueing new files and forgetting deleted ones."""
+        jobs = {job[0]: job for job in self.plan()}
+        now = time.monotonic()
+        for path in jobs.keys() - self.jobs.keys():
+            self.pending[path] = now
+        for path in self.jobs.keys() - jobs.keys():
+            self.signatures.pop(path, None)
+            self.pending.pop(path, None)
+        self.jobs = jobs
+
+    def poll(self):
+        """Note every file whose signature changed since the last poll."""
+        now = time.monotonic()
+        for path in self.jobs:
+            signature = stat_signature(path)
+            if signature != self.signatures.get(path):
+                self.signatures[path] = signature
+                self.pending[path] = now
+
+    def render(self, job, report=True):
+        input_path, output_path, title, include_css, stream = job
+        signature = self.signatures.get(input_path)
+        if signature is None:
+            return
+        start = time.perf_counter()
+        try:
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            self.converter.convert_file(input_path, output_path, title, include_css, stream)
+        except Exception as e:
+            print(f"Error: {input_path}: {e}", file=sys.stderr)
+            return
+        if report and not self.quiet:
+            elapsed = (time.perf_counter() - start) * 1000
+            since_save = (time.time_ns() - signature[0]) / 1e6
+            print(f"Rendered {input_path} -> {output_path} in {elapsed:.1f} ms "
+                  f"({since_save:.0f} ms after save)")
+
+    def render_ready(self):
+        """Render every pending file that has been quiet for the debounce period."""
+        now = time.monotonic()
+        ready = [path for path, changed in self.pending.items() if now - changed >= self.debounce]
+        for path in ready:
+            del self.pending[path]
+            self.render(self.jobs[path])
+        return len(ready)
+
+    def run(self):
+        """Build everything once, then watch until interrupted."""
+        self.refresh()
+        self.poll()
+        start = time.perf_counter()
+        self.pending.clear()
+        for job in self.jobs.values():
+            self.render(job, report=False)
+        print(f"Rendered {len(self.jobs)} file(s) in {time.perf_counter() - start:.2f}s, "
+              f"watching for changes (Ctrl+C to stop)")
+
+        next_rescan = time.monotonic() + self.rescan
+        next_poll = time.monotonic()
+        try:
+            while True:
+                if time.monotonic() >= next_rescan:
+                    started = time.monotonic()
+                    self.refresh()
+                    next_rescan = time.monotonic() + throttled(self.rescan, time.monotonic() - started)
+                if time.monotonic() >= next_poll:
+                    started = time.monotonic()
+                    self.poll()
+                    next_poll = time.monotonic() + throttled(self.interval, time.monotonic() - started)
+                self.render_ready()
+                # Sleep until the next poll, or until the first pending file has been quiet long enough
+                wake = min([next_poll] + [changed + self.debounce for changed in self.pending.values()])
+                time.sleep(max(wake - time.monotonic(), 0))
+        except KeyboardInterrupt:
+            print("Stopped watching")
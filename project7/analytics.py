@@ -0,0 +1,340 @@
+"""
+Resume Cohort Analytics
+Loads analyzed resumes into a dense resumes x skills count matrix and
+derives cohort statistics from it with NumPy: skill prevalence overall and
+per best-fit role, skill co-occurrence, category balance and role gap rates.
+
+    python cli.py analytics results.jsonl --output-dir analytics/
+"""
+
+import sys
+import csv
+import json
+import time
+import argparse
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print("NumPy not found. Install with: pip install numpy")
+    sys.exit(1)
+
+from cli import ResumeAnalyzer
+
+
+class SkillMatrix:
+    """Mention counts of every taxonomy skill in every resume.
+
+    Column j is always the j-th (category, skill) pair of the taxonomy, in
+    taxonomy order, so matrices built from different batches line up.
+    """
+
+    def __init__(self, skill_categories, files, counts):
+        self.skill_categories = skill_categories
+        self.columns = [(category, skill) for category, skills in skill_categories.items() for skill in skills]
+        self.files = files
+        self.counts = counts
+
+    @classmethod
+    def from_records(cls, records, skill_categories):
+        """Build the matrix from report records; error records are skipped.
+
+        Returns (matrix, number of skill counts not in the taxonomy).
+        """
+        column_of = {}
+        for category, skills in skill_categories.items():
+            for skill in skills:
+                column_of[category, skill] = len(column_of)
+
+        latest = {}
+        for record in records:
+            if 'skill_counts' in record:
+                # A resume analyzed twice keeps its last result
+                latest.pop(record['file'], None)
+                latest[record['file']] = record['skill_counts']
+
+        rows, cols, values = [], [], []
+        unknown = 0
+        for row, skill_counts in enumerate(latest.values()):
+            for category, skills in skill_counts.items():
+                for skill, count in skills.items():
+                    col = column_of.get((category, skill))
+                    if col is None:
+                        unknown += 1
+                        continue
+                    rows.append(row)
+                    cols.append(col)
+                    values.append(count)
+
+        counts = np.zeros((len(latest), len(column_of)), dtype=np.uint32)
+        counts[rows, cols] = values
+        return cls(skill_categories, list(latest), counts), unknown
+
+    @property
+    def present(self):
+        """Boolean resumes x skills matrix: does the resume mention the skill at all?"""
+        return self.counts > 0
+
+    def save(self, path):
+        np.savez_compressed(path, counts=self.counts, files=np.array(self.files, dtype=str),
+                            categories=np.array([c for c, _ in self.columns], dtype=str),
+                            skills=np.array([s for _, s in self.columns], dtype=str))
+
+
+class CohortAnalytics:
+    """Vectorized cohort statistics over a SkillMatrix.
+
+    Role recommendations name skills, not (category, skill) pairs, so a
+    resume has a role skill when any column of that name is present, just
+    like suggest_improvements.
+    """
+
+    def __init__(self, matrix, role_recommendations=ResumeAnalyzer.ROLE_RECOMMENDATIONS):
+        self.matrix = matrix
+        self.roles = list(role_recommendations)
+        self.role_recommendations = role_recommendations
+
+        # Skill name -> columns, then resumes x names presence via one product
+        self.names = list(dict.fromkeys(skill for _, skill in matrix.columns))
+        name_index = {name: i for i, name in enumerate(self.names)}
+        column_names = np.zeros((len(matrix.columns), len(self.names)), dtype=np.int64)
+        column_names[np.arange(len(matrix.columns)), [name_index[s] for _, s in matrix.columns]] = 1
+        name_counts = matrix.counts.astype(np.int64) @ column_names
+        self.name_present = name_counts > 0
+
+        # Names x roles membership; skills missing from the taxonomy can never be found
+        role_skills = np.zeros((len(self.names), len(self.roles)), dtype=np.int64)
+        for r, role in enumerate(self.roles):
+            for skill in role_recommendations[role]:
+                if skill in name_index:
+                    role_skills[name_index[skill], r] = 1
+        self.name_index = name_index
+
+        # Resumes x roles: share of the role's skills found, and their mentions.
+        # Ranking uses the share rounded as score_roles rounds it; averages use raw_fit
+        role_sizes = np.array([len(role_recommendations[role]) for role in self.roles])
+        self.raw_fit = (self.name_present.astype(np.int64) @ role_skills) / role_sizes
+        self.fit = np.round(self.raw_fit, 3)
+        self.mentions = name_counts @ role_skills
+        # Best fit first, more mentions breaking ties, then role order, as score_roles ranks;
+        # lexsort is stable and takes its primary key last
+        if len(self.fit):
+            self.best = np.lexsort((-self.mentions.T, -self.fit.T), axis=0)[0]
+        else:
+            self.best = np.zeros(0, dtype=np.intp)
+
+    def skills_table(self):
+        """Per skill: resumes mentioning it, prevalence, mean and total mentions, prevalence per best-fit role."""
+        counts = self.matrix.counts
+        present = self.matrix.present
+        resumes = present.sum(axis=0)
+        n = max(len(counts), 1)
+        table = {
+            'category': [c for c, _ in self.matrix.columns],
+            'skill': [s for _, s in self.matrix.columns],
+            'resumes': resumes,
+            'prevalence': np.round(resumes / n, 4),
+            'mean_mentions': np.round(counts.sum(axis=0) / n, 3),
+            'total_mentions': counts.sum(axis=0, dtype=np.uint64),
+        }
+        best = self.best
+        for r, role in enumerate(self.roles):
+            cohort = present[best == r]
+            # NaN when no resume fits the role best
+            table[f'prevalence_{role}'] = (np.round(cohort.mean(axis=0), 4) if len(cohort)
+                                          else np.full(len(resumes), np.nan))
+        return table
+
+    def cooccurrence(self):
+        """Skills x skills matrix of the number of resumes mentioning both (the diagonal: either alone)."""
+        # float32 goes through BLAS and stays exact up to 2**24 resumes
+        present = self.matrix.present.astype(np.float32)
+        return np.rint(present.T @ present).astype(np.uint32)
+
+    def cooccurrence_table(self, min_resumes=1):
+        """Long-format skill pairs (a before b in taxonomy order) with resumes, share and lift."""
+        both = self.cooccurrence()
+        n = max(len(self.matrix.counts), 1)
+        single = np.diag(both).astype(np.float64)
+        a, b = np.triu_indices(len(both), k=1)
+        together = both[a, b]
+        keep = together >= min_resumes
+        a, b, together = a[keep], b[keep], together[keep]
+        # lift = P(a and b) / (P(a) P(b)); above 1 means the pair appears together more than by chance
+        lift = together * n / (single[a] * single[b])
+        columns = self.matrix.columns
+        return {
+            'skill_a': [columns[i][1] for i in a],
+            'skill_b': [columns[i][1] for i in b],
+            'resumes': together,
+            'share': np.round(together / n, 4),
+            'lift': np.round(lift, 3),
+        }
+
+    def categories_table(self):
+        """Per category: its skills, mean skills found per resume, and share of resumes with none."""
+        present = self.matrix.present
+        categories = list(self.matrix.skill_categories)
+        sizes = np.array([len(self.matrix.skill_categories[c]) for c in categories])
+        # Columns are grouped by category, so one reduceat sums each group per resume
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        nonempty = sizes > 0
+        found = np.zeros((len(present), len(categories)), dtype=np.int64)
+        if present.size:
+            found[:, nonempty] = np.add.reduceat(present.astype(np.int64), starts[nonempty], axis=1)
+        n = max(len(present), 1)
+        return {
+            'category': categories,
+            'skills': sizes,
+            'mean_skills_found': np.round(found.sum(axis=0) / n, 3),
+            'mean_share_found': np.round(found.sum(axis=0) / n / np.maximum(sizes, 1), 4),
+            'share_without_any': np.round((found == 0).sum(axis=0) / n if len(present) else np.zeros(len(categories)), 4),
+        }
+
+    def roles_table(self):
+        """Per role: best-fit cohort size, mean fit over all resumes, and share with every skill."""
+        fit, best = self.raw_fit, self.best
+        n = max(len(fit), 1)
+        return {
+            'role': self.roles,
+            'best_fit_resumes': np.bincount(best, minlength=len(self.roles)),
+            'mean_fit': np.round(fit.sum(axis=0) / n, 4),
+            'full_fit_share': np.round((fit >= 1.0).sum(axis=0) / n, 4),
+        }
+
+    def role_gaps_table(self):
+        """Per role and recommended skill: share of all resumes, and of the role's cohort, missing it."""
+        best = self.best
+        n = max(len(self.name_present), 1)
+        missing = ~self.name_present
+        name_index = self.name_index
+        table = {'role': [], 'skill': [], 'gap_rate': [], 'cohort_resumes': [], 'cohort_gap_rate': []}
+        for r, role in enumerate(self.roles):
+            cohort = missing[best == r]
+            for skill in self.role_recommendations[role]:
+                i = name_index.get(skill)
+                table['role'].append(role)
+                table['skill'].append(skill)
+                table['gap_rate'].append(round(missing[:, i].sum() / n, 4) if i is not None else 1.0)
+                table['cohort_resumes'].append(len(cohort))
+                if not len(cohort):
+                    table['cohort_gap_rate'].append(float('nan'))
+                else:
+                    table['cohort_gap_rate'].append(round(cohort[:, i].mean(), 4) if i is not None else 1.0)
+        return table
+
+    def tables(self):
+        return {
+            'skills': self.skills_table(),
+            'cooccurrence': self.cooccurrence_table(),
+            'categories': self.categories_table(),
+            'roles': self.roles_table(),
+            'role_gaps': self.role_gaps_table(),
+        }
+
+
+def plain(value):
+    """Turn NumPy scalars into Python ones for csv and Parquet writers."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def write_csv(table, path):
+    columns = list(table)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in zip(*(table[column] for column in columns)):
+            writer.writerow([plain(value) for value in row])
+
+
+def write_parquet(table, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    pq.write_table(pa.table({column: list(map(plain, values)) if isinstance(values, list) else values
+                             for column, values in table.items()}), path)
+
+
+def read_records(paths):
+    """Yield report records from batch JSON Lines files and single --format json reports."""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            if Path(path).suffix.lower() == '.json':
+                yield json.load(f)
+                continue
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def analytics_main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='cli.py analytics',
+        description='Cohort statistics over analyzed resumes',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  cli.py analytics results.jsonl
+  cli.py analytics batch1.jsonl batch2.jsonl --output-dir analytics/ --format parquet
+  cli.py analytics results.jsonl --taxonomy skills.yaml --matrix counts.npz
+        """
+    )
+    parser.add_argument('results', nargs='+', help='Batch JSON Lines files (or single --format json reports)')
+    parser.add_argument('--output-dir', '-o', default='analytics',
+                        help='Directory for the tables (default: analytics)')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help='Table format (default: csv; parquet needs pyarrow)')
+    parser.add_argument('--taxonomy', help='Skill taxonomy the results were analyzed with (default: built-in)')
+    parser.add_argument('--matrix', metavar='FILE', help='Also save the count matrix to FILE (.npz)')
+    parser.add_argument('--top', type=int, default=10, help='Skills listed in the printed summary (default: 10)')
+    args = parser.parse_args(argv)
+
+    if args.format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("pyarrow not found. Install with: pip install pyarrow", file=sys.stderr)
+            return 1
+
+    start = time.perf_counter()
+    try:
+        skill_categories = ResumeAnalyzer(taxonomy=args.taxonomy).skill_categories
+    except (OSError, ValueError) as e:
+        print(f"Error loading taxonomy: {e}", file=sys.stderr)
+        return 1
+    try:
+        matrix, unknown = SkillMatrix.from_records(read_records(args.results), skill_categories)
+    except (OSError, ValueError) as e:
+        print(f"Error reading results: {e}", file=sys.stderr)
+        return 1
+    if not matrix.files:
+        print("Error: No analyzed resumes in the results.", file=sys.stderr)
+        return 1
+    if unknown:
+        print(f"Warning: {unknown} skill count(s) are not in the taxonomy and were ignored", file=sys.stderr)
+    loaded = time.perf_counter()
+
+    analytics = CohortAnalytics(matrix)
+    tables = analytics.tables()
+    computed = time.perf_counter()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    write = write_parquet if args.format == 'parquet' else write_csv
+    for name, table in tables.items():
+        write(table, output_dir / f'{name}.{args.format}')
+    if args.matrix:
+        matrix.save(args.matrix)
+
+    skills = tables['skills']
+    print(f"{len(matrix.files)} resume(s) x {len(matrix.columns)} skill(s)")
+    print(f"\nMost prevalent skills:")
+    for i in np.argsort(-skills['prevalence'], kind='stable')[:args.top]:
+        print(f"  {skills['skill'][i]:<20} {skills['prevalence'][i]:>7.1%}")
+    roles = tables['roles']
+    print(f"\nBest-fit roles:")
+    for role, cohort, mean_fit in zip(roles['role'], roles['best_fit_resumes'], roles['mean_fit']):
+        print(f"  {role:<20} {cohort:>7} resume(s), mean fit {mean_fit:.0%}")
+    print(f"\nTables saved to: {output_dir}/ ({', '.join(tables)})")
+    print(f"Loaded in {loaded - start:.2f}s, computed in {computed - loaded:.3f}s", file=sys.stderr)
+    return 0
@@ -0,0 +1,145 @@
+"""
+Bulk Resume Screening
+Analyzes directories, globs and manifests of PDF resumes across a pool of
+worker processes and streams one JSON record per resume as it finishes.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from cli import ResumeAnalyzer
+from cache import ExtractionCache
+from timing import STAGES, summarize, print_timing_summary
+
+
+# Analyzer reused by every resume analyzed in this worker process
+_worker_analyzer = None
+
+
+def has_glob_magic(pattern):
+    return any(char in pattern for char in '*?[')
+
+
+def read_manifest(manifest_path):
+    """Return the PDF paths listed in a manifest, one per line ('#' starts a comment)."""
+    paths = []
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                paths.append(line)
+    return paths
+
+
+def collect_pdfs(patterns, manifest_path=None):
+    """Expand files, directories, globs and a manifest into a list of PDF paths."""
+    if manifest_path:
+        patterns = list(patterns) + read_manifest(manifest_path)
+
+    pdfs = []
+    seen = set()
+    for pattern in patterns:
+        if has_glob_magic(pattern):
+            matches = [Path(match) for match in sorted(glob.glob(pattern, recursive=True))]
+        elif Path(pattern).is_dir():
+            matches = sorted(path for path in Path(pattern).rglob('*') if path.suffix.lower() == '.pdf')
+        else:
+            # Missing files are kept so they come back as error records
+            matches = [Path(pattern)]
+        for path in matches:
+            key = str(path.resolve())
+            if key not in seen and not path.is_dir():
+                seen.add(key)
+                pdfs.append(str(path))
+    return pdfs
+
+
+def _init_worker(options=None):
+    """Create this process's analyzer, with its own connection to the cache.
+
+    `options` may hold 'cache' (the cache's path and size in bytes, or
+    None to always extract with PyMuPDF), 'max_pages', 'taxonomy' and
+    'timing'.
+    """
+    global _worker_analyzer
+    options = options or {}
+    cache = None
+    if options.get('cache'):
+        try:
+            cache = ExtractionCache(*options['cache'])
+        except Exception as e:
+            print(f"Warning: extraction cache unavailable ({e})", file=sys.stderr)
+    _worker_analyzer = ResumeAnalyzer(cache=cache, max_pages=options.get('max_pages'),
+                                      taxonomy=options.get('taxonomy'), timing=options.get('timing', False))
+
+
+def analyze_file(pdf_path, job_role=None):
+    """Analyze one resume, returning its report or an error record."""
+    try:
+        return _worker_analyzer.analyze(pdf_path, job_role)
+    except Exception as e:
+        return {'file': str(pdf_path), 'error': str(e)}
+
+
+def run_batch(pdf_paths, job_role=None, workers=None, options=None, max_pending=None):
+    """Analyze every resume, yielding records in completion order.
+
+    `options` configures each worker's analyzer (see _init_worker).
+
+    At most `max_pending` resumes are queued at once (four per worker by
+    default), so huge batches do not build up a backlog of futures.
+    """
+    if workers == 1 or len(pdf_paths) <= 1:
+        _init_worker(options)
+        for pdf_path in pdf_paths:
+            yield analyze_file(pdf_path, job_role)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 4
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(options,)) as executor:
+        paths = iter(pdf_paths)
+        pending = set()
+        while True:
+            for pdf_path in paths:
+                pending.add(executor.submit(analyze_file, pdf_path, job_role))
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def screen(pdf_paths, out, job_role=None, workers=None, options=None):
+    """Write one JSON line per resume to `out` and a summary to stderr.
+
+    Returns the number of resumes that failed. With timing enabled the
+    summary ends with the mean, p95 and max of every stage.
+    """
+    failures = 0
+    # Per-stage milliseconds of every timed report, in arrival order
+    stage_ms = {stage: [] for stage in STAGES + ('total',)}
+    start = time.perf_counter()
+    for record in run_batch(pdf_paths, job_role, workers, options):
+        if 'error' in record:
+            failures += 1
+        elif 'timings' in record:
+            for stage, samples in stage_ms.items():
+                samples.append(record['timings'][stage])
+        out.write(json.dumps(record) + '\n')
+        out.flush()
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"Analyzed {len(pdf_paths)} resume(s) in {elapsed:.2f}s "
+          f"({len(pdf_paths) / elapsed:.1f} resumes/s), {failures} failed", file=sys.stderr)
+    if stage_ms['total']:
+        print_timing_summary({stage: summarize(samples) for stage, samples in stage_ms.items()})
+    return failures
@@ -0,0 +1,118 @@
+"""
+Extraction Cache
+Keeps the text extracted from each PDF, keyed by the SHA-256 of the file's
+bytes, in a SQLite database shared by every run and worker process.
+"""
+
+import time
+import sqlite3
+from pathlib import Path
+
+
+DEFAULT_CACHE_PATH = Path.home() / '.cache' / 'resume_analyzer' / 'extractions.sqlite3'
+DEFAULT_CACHE_SIZE_MB = 512
+
+
+class ExtractionCache:
+    """Size-bounded LRU cache of extracted and normalized resume text.
+
+    Every lookup refreshes the entry's last-used time; when the stored
+    text grows past `max_bytes`, the least recently used entries are
+    evicted until it is back under 90% of the limit. The total size is
+    kept in a meta row by triggers, so checking it costs no table scan
+    whichever process wrote last.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_CACHE_SIZE_MB * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; the timeout lets worker processes share the database
+        self.db = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS extractions (
+                digest TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                normalized TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self.db.execute('CREATE INDEX IF NOT EXISTS extractions_last_used ON extractions (last_used)')
+        # Created together with the starting total, so a cache from before the
+        # meta table is summed exactly once
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            self.db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            self.db.execute('''
+                INSERT OR IGNORE INTO meta
+                SELECT 'total_size', COALESCE(SUM(size), 0) FROM extractions
+            ''')
+            self.db.execute('''
+                CREATE TRIGGER IF NOT EXISTS extractions_insert AFTER INSERT ON extractions BEGIN
+                    UPDATE meta SET value = value + NEW.size WHERE key = 'total_size';
+                END
+            ''')
+            self.db.execute('''
+                CREATE TRIGGER IF NOT EXISTS extractions_delete AFTER DELETE ON extractions BEGIN
+                    UPDATE meta SET value = value - OLD.size WHERE key = 'total_size';
+                END
+            ''')
+            self.db.execute('''
+                CREATE TRIGGER IF NOT EXISTS extractions_resize AFTER UPDATE OF size ON extractions BEGIN
+                    UPDATE meta SET value = value - OLD.size + NEW.size WHERE key = 'total_size';
+                END
+            ''')
+            self.db.execute('COMMIT')
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest):
+        """Return (text, normalized) for a digest, or None."""
+        row = self.db.execute('SELECT text, normalized FROM extractions WHERE digest = ?',
+                              (digest,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.db.execute('UPDATE extractions SET last_used = ? WHERE digest = ?', (time.time(), digest))
+        return row
+
+    def put(self, digest, text, normalized):
+        size = len(text.encode('utf-8')) + len(normalized.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        # An upsert rather than INSERT OR REPLACE: REPLACE deletes without
+        # firing the delete trigger, which would skew the total
+        self.db.execute('''
+            INSERT INTO extractions VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (digest) DO UPDATE SET text = excluded.text, normalized = excluded.normalized,
+                size = excluded.size, last_used = excluded.last_used
+        ''', (digest, text, normalized, size, time.time()))
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries while the cache is over its limit."""
+        total = self.total_size()
+        if total <= self.max_bytes:
+            return
+        excess = total - int(self.max_bytes * 0.9)
+        victims = []
+        for digest, size in self.db.execute('SELECT digest, size FROM extractions ORDER BY last_used'):
+            victims.append((digest,))
+            excess -= size
+            if excess <= 0:
+                break
+        self.db.executemany('DELETE FROM extractions WHERE digest = ?', victims)
+
+    def total_size(self):
+        """Bytes of text stored, from the running total."""
+        return self.db.execute("SELECT value FROM meta WHERE key = 'total_size'").fetchone()[0]
+
+    def close(self):
+        self.db.close()
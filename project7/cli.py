@@ -1,303 +1,633 @@
-#!/usr/bin/env python3
-"""
-Resume Analyzer CLI Tool
-A tool to extract text from PDF resumes, count skill mentions, and suggest improvements.
-"""
-
-import argparse
-import sys
-import re
-from collections import Counter
-from pathlib import Path
-import json
-
-try:
-    import fitz  # PyMuPDF
-except ImportError:
-    print("PyMuPDF not found. Install with: pip install PyMuPDF")
-    sys.exit(1)
-
-class ResumeAnalyzer:
-    def __init__(self):
-        # Comprehensive skill categories with variations
-        self.skill_categories = {
-            'Programming Languages': {
-                'python': ['python', 'py', 'python3'],
-                'javascript': ['javascript', 'js', 'node.js', 'nodejs', 'react', 'vue', 'angular'],
-                'java': ['java', 'spring', 'hibernate'],
-                'sql': ['sql', 'mysql', 'postgresql', 'postgres', 'sqlite', 'oracle', 'mssql'],
-                'r': ['r programming', 'r language', 'rstudio'],
-                'c++': ['c++', 'cpp', 'c plus plus'],
-                'c#': ['c#', 'csharp', 'c sharp', '.net'],
-                'go': ['golang', 'go language'],
-                'rust': ['rust language', 'rust programming'],
-                'scala': ['scala programming'],
-                'ruby': ['ruby', 'ruby on rails', 'rails'],
-                'php': ['php', 'laravel', 'symfony'],
-                'swift': ['swift', 'ios development'],
-                'kotlin': ['kotlin', 'android development']
-            },
-            'Data Science & ML': {
-                'machine learning': ['machine learning', 'ml', 'artificial intelligence', 'ai'],
-                'deep learning': ['deep learning', 'neural networks', 'tensorflow', 'pytorch', 'keras'],
-                'data science': ['data science', 'data scientist', 'data analysis', 'analytics'],
-                'statistics': ['statistics', 'statistical analysis', 'statistical modeling'],
-                'pandas': ['pandas', 'dataframe'],
-                'numpy': ['numpy', 'numerical computing'],
-                'scikit-learn': ['scikit-learn', 'sklearn', 'sci-kit learn'],
-                'nlp': ['nlp', 'natural language processing', 'text mining', 'sentiment analysis'],
-                'computer vision': ['computer vision', 'opencv', 'image processing'],
-                'big data': ['big data', 'hadoop', 'spark', 'kafka', 'elasticsearch']
-            },
-            'Cloud & DevOps': {
-                'aws': ['aws', 'amazon web services', 'ec2', 's3', 'lambda', 'cloudformation'],
-                'azure': ['azure', 'microsoft azure', 'azure devops'],
-                'gcp': ['gcp', 'google cloud platform', 'google cloud'],
-                'docker': ['docker', 'containerization', 'containers'],
-                'kubernetes': ['kubernetes', 'k8s', 'orchestration'],
-                'ci/cd': ['ci/cd', 'continuous integration', 'continuous deployment', 'jenkins', 'gitlab ci'],
-                'terraform': ['terraform', 'infrastructure as code', 'iac'],
-                'ansible': ['ansible', 'configuration management'],
-                'linux': ['linux', 'unix', 'bash', 'shell scripting']
-            },
-            'Web Development': {
-                'html/css': ['html', 'css', 'html5', 'css3', 'sass', 'less'],
-                'frontend': ['frontend', 'front-end', 'ui/ux', 'responsive design'],
-                'backend': ['backend', 'back-end', 'api development', 'rest api', 'graphql'],
-                'databases': ['database', 'mongodb', 'redis', 'nosql', 'relational database'],
-                'web frameworks': ['django', 'flask', 'fastapi', 'express', 'spring boot']
-            },
-            'Tools & Platforms': {
-                'git': ['git', 'github', 'gitlab', 'version control'],
-                'jira': ['jira', 'project management', 'agile', 'scrum'],
-                'tableau': ['tableau', 'data visualization', 'power bi', 'looker'],
-                'excel': ['excel', 'spreadsheet', 'vlookup', 'pivot tables'],
-                'jupyter': ['jupyter', 'jupyter notebook', 'ipython']
-            }
-        }
-
-    def extract_text_from_pdf(self, pdf_path):
-        """Extract text from PDF using PyMuPDF"""
-        try:
-            doc = fitz.open(pdf_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
-        except Exception as e:
-            print(f"Error extracting text from PDF: {e}")
-            return None
-
-    def normalize_text(self, text):
-        """Normalize text for better matching"""
-        # Convert to lowercase and remove extra whitespace
-        text = re.sub(r'\s+', ' ', text.lower().strip())
-        # Remove special characters but keep periods for abbreviations
-        text = re.sub(r'[^\w\s\.\-\+#]', ' ', text)
-        return text
-
-    def count_skills(self, text):
-        """Count skill mentions in the text"""
-        normalized_text = self.normalize_text(text)
-        skill_counts = {}
-        
-        for category, skills in self.skill_categories.items():
-            skill_counts[category] = {}
-            for skill_name, variations in skills.items():
-                count = 0
-                for variation in variations:
-                    # Use word boundaries for exact matches
-                    pattern = r'\b' + re.escape(variation.lower()) + r'\b'
-                    matches = re.findall(pattern, normalized_text)
-                    count += len(matches)
-                
-                if count > 0:
-                    skill_counts[category][skill_name] = count
-        
-        return skill_counts
-
-    def suggest_improvements(self, skill_counts, job_role=None):
-        """Suggest improvements based on missing skills"""
-        suggestions = []
-        
-        # Define recommended skills for different roles
-        role_recommendations = {
-            'data_scientist': ['python', 'sql', 'machine learning', 'statistics', 'pandas', 'scikit-learn'],
-            'software_engineer': ['python', 'javascript', 'sql', 'git', 'docker', 'ci/cd'],
-            'web_developer': ['javascript', 'html/css', 'frontend', 'backend', 'git', 'databases'],
-            'devops_engineer': ['linux', 'docker', 'kubernetes', 'aws', 'ci/cd', 'terraform'],
-            'ml_engineer': ['python', 'machine learning', 'deep learning', 'docker', 'aws', 'git']
-        }
-        
-        # Get flat list of found skills
-        found_skills = set()
-        for category_skills in skill_counts.values():
-            found_skills.update(category_skills.keys())
-        
-        # General suggestions based on common requirements
-        common_missing = []
-        important_skills = ['python', 'sql', 'git', 'machine learning', 'javascript']
-        
-        for skill in important_skills:
-            if skill not in found_skills:
-                common_missing.append(skill)
-        
-        if common_missing:
-            suggestions.append({
-                'type': 'missing_common_skills',
-                'title': 'Consider adding these commonly sought skills',
-                'skills': common_missing
-            })
-        
-        # Role-specific suggestions
-        if job_role and job_role in role_recommendations:
-            role_missing = []
-            for skill in role_recommendations[job_role]:
-                if skill not in found_skills:
-                    role_missing.append(skill)
-            
-            if role_missing:
-                suggestions.append({
-                    'type': 'role_specific',
-                    'title': f'Skills recommended for {job_role.replace("_", " ").title()}',
-                    'skills': role_missing
-                })
-        
-        # Category balance suggestions
-        category_counts = {cat: len(skills) for cat, skills in skill_counts.items() if skills}
-        
-        if not category_counts.get('Cloud & DevOps', 0):
-            suggestions.append({
-                'type': 'category_gap',
-                'title': 'Consider adding Cloud/DevOps skills',
-                'skills': ['docker', 'aws', 'kubernetes', 'ci/cd']
-            })
-        
-        if not category_counts.get('Data Science & ML', 0) and job_role != 'web_developer':
-            suggestions.append({
-                'type': 'category_gap',
-                'title': 'Consider adding Data Science skills',
-                'skills': ['pandas', 'machine learning', 'statistics']
-            })
-        
-        return suggestions
-
-    def generate_report(self, pdf_path, job_role=None, output_format='text'):
-        """Generate complete analysis report"""
-        print(f"Analyzing resume: {pdf_path}")
-        
-        # Extract text
-        text = self.extract_text_from_pdf(pdf_path)
-        if not text:
-            return None
-        
-        # Count skills
-        skill_counts = self.count_skills(text)
-        
-        # Generate suggestions
-        suggestions = self.suggest_improvements(skill_counts, job_role)
-        
-        # Create report
-        report = {
-            'file': str(pdf_path),
-            'total_skills_found': sum(len(skills) for skills in skill_counts.values()),
-            'skill_counts': skill_counts,
-            'suggestions': suggestions,
-            'text_length': len(text)
-        }
-        
-        if output_format == 'json':
-            return json.dumps(report, indent=2)
-        else:
-            return self.format_text_report(report)
-
-    def format_text_report(self, report):
-        """Format report as readable text"""
-        output = []
-        output.append("=" * 60)
-        output.append("RESUME ANALYSIS REPORT")
-        output.append("=" * 60)
-        output.append(f"File: {report['file']}")
-        output.append(f"Total Skills Found: {report['total_skills_found']}")
-        output.append(f"Text Length: {report['text_length']} characters")
-        output.append("")
-        
-        # Skill counts by category
-        output.append("SKILLS BREAKDOWN")
-        output.append("-" * 30)
-        
-        for category, skills in report['skill_counts'].items():
-            if skills:
-                output.append(f"\n{category}:")
-                for skill, count in sorted(skills.items(), key=lambda x: x[1], reverse=True):
-                    output.append(f"  • {skill.title()}: {count} mention(s)")
-        
-        # Suggestions
-        if report['suggestions']:
-            output.append("\n" + "=" * 60)
-            output.append("IMPROVEMENT SUGGESTIONS")
-            output.append("=" * 60)
-            
-            for i, suggestion in enumerate(report['suggestions'], 1):
-                output.append(f"\n{i}. {suggestion['title']}:")
-                for skill in suggestion['skills']:
-                    output.append(f"   • {skill.title()}")
-        
-        output.append("\n" + "=" * 60)
-        return "\n".join(output)
-
-def main():
-    parser = argparse.ArgumentParser(
-        description="Analyze PDF resumes for skill mentions and improvement suggestions",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  python resume_analyzer.py resume.pdf
-  python resume_analyzer.py resume.pdf --role data_scientist
-  python resume_analyzer.py resume.pdf --output report.txt
-  python resume_analyzer.py resume.pdf --format json --output report.json
-        """
-    )
-    
-    parser.add_argument('pdf_path', help='Path to the PDF resume file')
-    parser.add_argument('--role', choices=['data_scientist', 'software_engineer', 'web_developer', 'devops_engineer', 'ml_engineer'],
-                       help='Target job role for specific recommendations')
-    parser.add_argument('--format', choices=['text', 'json'], default='text',
-                       help='Output format (default: text)')
-    parser.add_argument('--output', '-o', help='Output file path (default: print to console)')
-    
-    args = parser.parse_args()
-    
-    # Validate input file
-    pdf_path = Path(args.pdf_path)
-    if not pdf_path.exists():
-        print(f"Error: File '{pdf_path}' not found.")
-        sys.exit(1)
-    
-    if not pdf_path.suffix.lower() == '.pdf':
-        print(f"Error: File '{pdf_path}' is not a PDF file.")
-        sys.exit(1)
-    
-    # Create analyzer and generate report
-    analyzer = ResumeAnalyzer()
-    report = analyzer.generate_report(pdf_path, args.role, args.format)
-    
-    if report is None:
-        print("Error: Could not analyze the resume.")
-        sys.exit(1)
-    
-    # Output report
-    if args.output:
-        try:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                f.write(report)
-            print(f"Report saved to: {args.output}")
-        except Exception as e:
-            print(f"Error saving report: {e}")
-            sys.exit(1)
-    else:
-        print(report)
-
-if __name__ == "__main__":
+#!/usr/bin/env python3
+"""
+Resume Analyzer CLI Tool
+A tool to extract text from PDF resumes, count skill mentions, and suggest improvements.
+"""
+
+import argparse
+import sys
+import re
+import hashlib
+import cProfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import json
+import time
+
+from matcher import SkillMatcher, load_matcher
+from cache import ExtractionCache, DEFAULT_CACHE_PATH, DEFAULT_CACHE_SIZE_MB
+from timing import StageTimer, save_profile
+
+try:
+    import pymupdf as fitz  # PyMuPDF 1.24.3+, without the deprecation notice on stdout
+except ImportError:
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        print("PyMuPDF not found. Install with: pip install PyMuPDF")
+        sys.exit(1)
+
+# Documents shorter than this are never split across processes
+PARALLEL_MIN_PAGES = 8
+
+def extract_page_range(pdf_path, data, start, stop):
+    """Extract the text of pages [start, stop) in a worker process"""
+    doc = fitz.open(stream=data, filetype='pdf') if data is not None else fitz.open(pdf_path)
+    try:
+        return [doc[number].get_text() for number in range(start, stop)]
+    finally:
+        doc.close()
+
+class ResumeAnalyzer:
+    # Recommended skills for different roles, in suggestion order
+    ROLE_RECOMMENDATIONS = {
+        'data_scientist': ('python', 'sql', 'machine learning', 'statistics', 'pandas', 'scikit-learn'),
+        'software_engineer': ('python', 'javascript', 'sql', 'git', 'docker', 'ci/cd'),
+        'web_developer': ('javascript', 'html/css', 'frontend', 'backend', 'git', 'databases'),
+        'devops_engineer': ('linux', 'docker', 'kubernetes', 'aws', 'ci/cd', 'terraform'),
+        'ml_engineer': ('python', 'machine learning', 'deep learning', 'docker', 'aws', 'git')
+    }
+    # The same tables as sets, built once for role scoring
+    ROLE_SKILL_SETS = {role: frozenset(skills) for role, skills in ROLE_RECOMMENDATIONS.items()}
+    
+    # Skills suggested whatever the role
+    IMPORTANT_SKILLS = ('python', 'sql', 'git', 'machine learning', 'javascript')
+    
+    # The two normalize_text passes
+    WHITESPACE_RE = re.compile(r'\s+')
+    SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.\-\+#]')
+    
+    def __init__(self, cache=None, max_pages=None, page_jobs=1, taxonomy=None, timing=False):
+        # Comprehensive skill categories with variations
+        self.skill_categories = {
+            'Programming Languages': {
+                'python': ['python', 'py', 'python3'],
+                'javascript': ['javascript', 'js', 'node.js', 'nodejs', 'react', 'vue', 'angular'],
+                'java': ['java', 'spring', 'hibernate'],
+                'sql': ['sql', 'mysql', 'postgresql', 'postgres', 'sqlite', 'oracle', 'mssql'],
+                'r': ['r programming', 'r language', 'rstudio'],
+                'c++': ['c++', 'cpp', 'c plus plus'],
+                'c#': ['c#', 'csharp', 'c sharp', '.net'],
+                'go': ['golang', 'go language'],
+                'rust': ['rust language', 'rust programming'],
+                'scala': ['scala programming'],
+                'ruby': ['ruby', 'ruby on rails', 'rails'],
+                'php': ['php', 'laravel', 'symfony'],
+                'swift': ['swift', 'ios development'],
+                'kotlin': ['kotlin', 'android development']
+            },
+            'Data Science & ML': {
+                'machine learning': ['machine learning', 'ml', 'artificial intelligence', 'ai'],
+                'deep learning': ['deep learning', 'neural networks', 'tensorflow', 'pytorch', 'keras'],
+                'data science': ['data science', 'data scientist', 'data analysis', 'analytics'],
+                'statistics': ['statistics', 'statistical analysis', 'statistical modeling'],
+                'pandas': ['pandas', 'dataframe'],
+                'numpy': ['numpy', 'numerical computing'],
+                'scikit-learn': ['scikit-learn', 'sklearn', 'sci-kit learn'],
+                'nlp': ['nlp', 'natural language processing', 'text mining', 'sentiment analysis'],
+                'computer vision': ['computer vision', 'opencv', 'image processing'],
+                'big data': ['big data', 'hadoop', 'spark', 'kafka', 'elasticsearch']
+            },
+            'Cloud & DevOps': {
+                'aws': ['aws', 'amazon web services', 'ec2', 's3', 'lambda', 'cloudformation'],
+                'azure': ['azure', 'microsoft azure', 'azure devops'],
+                'gcp': ['gcp', 'google cloud platform', 'google cloud'],
+                'docker': ['docker', 'containerization', 'containers'],
+                'kubernetes': ['kubernetes', 'k8s', 'orchestration'],
+                'ci/cd': ['ci/cd', 'continuous integration', 'continuous deployment', 'jenkins', 'gitlab ci'],
+                'terraform': ['terraform', 'infrastructure as code', 'iac'],
+                'ansible': ['ansible', 'configuration management'],
+                'linux': ['linux', 'unix', 'bash', 'shell scripting']
+            },
+            'Web Development': {
+                'html/css': ['html', 'css', 'html5', 'css3', 'sass', 'less'],
+                'frontend': ['frontend', 'front-end', 'ui/ux', 'responsive design'],
+                'backend': ['backend', 'back-end', 'api development', 'rest api', 'graphql'],
+                'databases': ['database', 'mongodb', 'redis', 'nosql', 'relational database'],
+                'web frameworks': ['django', 'flask', 'fastapi', 'express', 'spring boot']
+            },
+            'Tools & Platforms': {
+                'git': ['git', 'github', 'gitlab', 'version control'],
+                'jira': ['jira', 'project management', 'agile', 'scrum'],
+                'tableau': ['tableau', 'data visualization', 'power bi', 'looker'],
+                'excel': ['excel', 'spreadsheet', 'vlookup', 'pivot tables'],
+                'jupyter': ['jupyter', 'jupyter notebook', 'ipython']
+            }
+        }
+        
+        # Every variation compiled into one automaton, scanned once per resume;
+        # a taxonomy file replaces the built-in one and loads precompiled
+        if taxonomy:
+            self.skill_categories, self.matcher, _ = load_matcher(taxonomy)
+        else:
+            self.matcher = SkillMatcher(self.skill_categories)
+        
+        # Optional ExtractionCache consulted before running PyMuPDF
+        self.cache = cache
+        # Only the first `max_pages` pages are read; long documents are
+        # split across `page_jobs` processes
+        self.max_pages = max_pages
+        self.page_jobs = page_jobs
+        # Per-stage timings are added to each report under 'timings'
+        self.timing = timing
+
+    def extract_text_from_pdf(self, pdf_path):
+        """Extract text from PDF using PyMuPDF"""
+        try:
+            return self.read_pdf_text(pdf_path)
+        except Exception as e:
+            print(f"Error extracting text from PDF: {e}")
+            return None
+
+    def read_pdf_text(self, pdf_path, data=None):
+        """Extract text from PDF (or from its bytes in `data`), raising on failure"""
+        return "".join(self.iter_pages(pdf_path, data))
+
+    def iter_pages(self, pdf_path, data=None):
+        """Yield the text of each page as it is extracted, up to max_pages"""
+        doc = fitz.open(stream=data, filetype='pdf') if data is not None else fitz.open(pdf_path)
+        try:
+            page_count = len(doc) if self.max_pages is None else min(len(doc), self.max_pages)
+            if self.page_jobs > 1 and page_count >= PARALLEL_MIN_PAGES:
+                yield from self.iter_pages_parallel(pdf_path, data, page_count)
+                return
+            for number in range(page_count):
+                yield doc[number].get_text()
+        finally:
+            doc.close()
+
+    def iter_pages_parallel(self, pdf_path, data, page_count):
+        """Extract contiguous page ranges in worker processes, yielding pages in order"""
+        step = -(-page_count // self.page_jobs)
+        starts = range(0, page_count, step)
+        with ProcessPoolExecutor(max_workers=len(starts)) as executor:
+            ranges = executor.map(extract_page_range, [pdf_path] * len(starts), [data] * len(starts),
+                                  starts, [min(start + step, page_count) for start in starts])
+            for pages in ranges:
+                yield from pages
+
+    def lookup_cached(self, pdf_path, timer=None):
+        """Read a PDF and look it up in the cache; return (digest, data, cached)
+
+        `cached` is (text, normalized text) or None on a miss. With a
+        StageTimer, reading, hashing and the lookup count as extraction.
+        """
+        start = time.perf_counter() if timer is not None else 0
+        with open(pdf_path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if self.max_pages is not None:
+            digest += f':{self.max_pages}'
+        cached = self.cache.get(digest)
+        if timer is not None:
+            timer.add('extract', time.perf_counter() - start)
+        return digest, data, cached
+
+    def normalize_text(self, text):
+        """Normalize text for better matching"""
+        # Convert to lowercase and remove extra whitespace
+        text = self.WHITESPACE_RE.sub(' ', text.lower().strip())
+        # Remove special characters but keep periods for abbreviations
+        text = self.SPECIAL_CHARS_RE.sub(' ', text)
+        return text
+
+    def count_pages(self, pages, timer=None, record=None):
+        """Count skill mentions over page texts as they arrive; return (skill_counts, text_length)
+
+        Each page is normalized on its own, with whitespace runs collapsed
+        across page breaks, so the counts equal count_skills on the joined
+        text without ever holding it. With a StageTimer, producing pages
+        counts as extraction and each page's work is split between
+        normalize and count. `record`, a pair of lists, receives every page
+        read and its normalized text, which joined give the text and
+        normalize_text of it for the cache.
+        """
+        if timer is not None:
+            pages = timer.timed_iter('extract', pages)
+        counter = self.matcher.counter()
+        text_length = 0
+        # Starts true so leading whitespace is dropped, as strip() does
+        in_whitespace = True
+        for page in pages:
+            start = time.perf_counter() if timer is not None else 0
+            text_length += len(page)
+            raw, page = page, page.lower()
+            if in_whitespace:
+                page = page.lstrip()
+            if record is not None:
+                record[0].append(raw)
+            if not page:
+                continue
+            in_whitespace = page[-1].isspace()
+            page = self.SPECIAL_CHARS_RE.sub(' ', self.WHITESPACE_RE.sub(' ', page))
+            if record is not None:
+                record[1].append(page)
+            if timer is None:
+                counter.feed(page)
+            else:
+                middle = time.perf_counter()
+                timer.add('normalize', middle - start)
+                counter.feed(page)
+                timer.add('count', time.perf_counter() - middle)
+        if record is not None and in_whitespace and record[1]:
+            # normalize_text strips the trailing whitespace run
+            record[1][-1] = record[1][-1][:-1]
+        if timer is None:
+            return counter.skill_counts(), text_length
+        with timer.stage('count'):
+            return counter.skill_counts(), text_length
+
+    def count_skills(self, text):
+        """Count skill mentions in the text"""
+        return self.matcher.count_skills(self.normalize_text(text))
+
+    def count_skills_legacy(self, text):
+        """Count skill mentions with one regex scan per variation"""
+        normalized_text = self.normalize_text(text)
+        skill_counts = {}
+        
+        for category, skills in self.skill_categories.items():
+            skill_counts[category] = {}
+            for skill_name, variations in skills.items():
+                count = 0
+                for variation in variations:
+                    # Use word boundaries for exact matches
+                    pattern = r'\b' + re.escape(variation.lower()) + r'\b'
+                    matches = re.findall(pattern, normalized_text)
+                    count += len(matches)
+                
+                if count > 0:
+                    skill_counts[category][skill_name] = count
+        
+        return skill_counts
+
+    def suggest_improvements(self, skill_counts, job_role=None):
+        """Suggest improvements based on missing skills"""
+        suggestions = []
+        
+        # Get flat set of found skills
+        found_skills = set()
+        for category_skills in skill_counts.values():
+            found_skills.update(category_skills.keys())
+        
+        # General suggestions based on common requirements
+        common_missing = [skill for skill in self.IMPORTANT_SKILLS if skill not in found_skills]
+        
+        if common_missing:
+            suggestions.append({
+                'type': 'missing_common_skills',
+                'title': 'Consider adding these commonly sought skills',
+                'skills': common_missing
+            })
+        
+        # Role-specific suggestions
+        if job_role and job_role in self.ROLE_RECOMMENDATIONS:
+            role_missing = [skill for skill in self.ROLE_RECOMMENDATIONS[job_role] if skill not in found_skills]
+            
+            if role_missing:
+                suggestions.append({
+                    'type': 'role_specific',
+                    'title': f'Skills recommended for {job_role.replace("_", " ").title()}',
+                    'skills': role_missing
+                })
+        
+        # Category balance suggestions
+        category_counts = {cat: len(skills) for cat, skills in skill_counts.items() if skills}
+        
+        if not category_counts.get('Cloud & DevOps', 0):
+            suggestions.append({
+                'type': 'category_gap',
+                'title': 'Consider adding Cloud/DevOps skills',
+                'skills': ['docker', 'aws', 'kubernetes', 'ci/cd']
+            })
+        
+        if not category_counts.get('Data Science & ML', 0) and job_role != 'web_developer':
+            suggestions.append({
+                'type': 'category_gap',
+                'title': 'Consider adding Data Science skills',
+                'skills': ['pandas', 'machine learning', 'statistics']
+            })
+        
+        return suggestions
+
+    def score_roles(self, skill_counts):
+        """Rank every role by the share of its recommended skills found in one set of counts"""
+        found = {}
+        for category_skills in skill_counts.values():
+            found.update(category_skills)
+        
+        table = []
+        for role, skills in self.ROLE_RECOMMENDATIONS.items():
+            matched = self.ROLE_SKILL_SETS[role] & found.keys()
+            table.append({
+                'role': role,
+                'fit': round(len(matched) / len(skills), 3),
+                'mentions': sum(found[skill] for skill in matched),
+                'matched': [skill for skill in skills if skill in matched],
+                'missing': [skill for skill in skills if skill not in matched]
+            })
+        
+        # Best fit first, more mentions breaking ties
+        table.sort(key=lambda row: (-row['fit'], -row['mentions']))
+        return table
+
+    def generate_report(self, pdf_path, job_role=None, output_format='text'):
+        """Generate complete analysis report"""
+        print(f"Analyzing resume: {pdf_path}")
+        
+        # Extract text and count skills
+        timer = StageTimer() if self.timing else None
+        try:
+            skill_counts, text_length = self.extract_skills(pdf_path, timer)
+        except Exception as e:
+            print(f"Error extracting text from PDF: {e}")
+            return None
+        if not text_length:
+            return None
+        
+        report = self.build_timed_report(pdf_path, skill_counts, text_length, job_role, timer)
+        
+        if output_format == 'json':
+            return json.dumps(report, indent=2)
+        else:
+            return self.format_text_report(report)
+
+    def analyze(self, pdf_path, job_role=None):
+        """Analyze one resume and return the report dict, raising on failure"""
+        timer = StageTimer() if self.timing else None
+        skill_counts, text_length = self.extract_skills(pdf_path, timer)
+        if not text_length:
+            raise ValueError("No text could be extracted")
+        return self.build_timed_report(pdf_path, skill_counts, text_length, job_role, timer)
+
+    def extract_skills(self, pdf_path, timer=None):
+        """Extract a resume and count its skills; return (skill_counts, text_length)"""
+        if self.cache is None:
+            # Pages are counted as they are read, never joined
+            return self.count_pages(self.iter_pages(pdf_path), timer)
+        digest, data, cached = self.lookup_cached(pdf_path, timer)
+        if cached is None:
+            # Counted as the pages arrive, kept only to be stored
+            record = ([], [])
+            result = self.count_pages(self.iter_pages(pdf_path, data), timer, record)
+            self.cache.put(digest, ''.join(record[0]), ''.join(record[1]))
+            return result
+        text, normalized = cached
+        if timer is None:
+            return self.matcher.count_skills(normalized), len(text)
+        with timer.stage('count'):
+            return self.matcher.count_skills(normalized), len(text)
+
+    def build_timed_report(self, pdf_path, skill_counts, text_length, job_role=None, timer=None):
+        """build_report, timed as the suggest stage and given a 'timings' key when a timer is passed"""
+        if timer is None:
+            return self.build_report(pdf_path, skill_counts, text_length, job_role)
+        with timer.stage('suggest'):
+            report = self.build_report(pdf_path, skill_counts, text_length, job_role)
+        report['timings'] = timer.as_ms()
+        return report
+
+    def build_report(self, pdf_path, skill_counts, text_length, job_role=None):
+        """Assemble the report dict from a resume's skill counts"""
+        # Generate suggestions; 'all' scores every role from the same counts
+        all_roles = job_role == 'all'
+        suggestions = self.suggest_improvements(skill_counts, None if all_roles else job_role)
+        
+        # Create report
+        report = {
+            'file': str(pdf_path),
+            'total_skills_found': sum(len(skills) for skills in skill_counts.values()),
+            'skill_counts': skill_counts,
+            'suggestions': suggestions,
+            'text_length': text_length
+        }
+        if all_roles:
+            report['role_fit'] = self.score_roles(skill_counts)
+        return report
+
+    def format_text_report(self, report):
+        """Format report as readable text"""
+        output = []
+        output.append("=" * 60)
+        output.append("RESUME ANALYSIS REPORT")
+        output.append("=" * 60)
+        output.append(f"File: {report['file']}")
+        output.append(f"Total Skills Found: {report['total_skills_found']}")
+        output.append(f"Text Length: {report['text_length']} characters")
+        output.append("")
+        
+        # Skill counts by category
+        output.append("SKILLS BREAKDOWN")
+        output.append("-" * 30)
+        
+        for category, skills in report['skill_counts'].items():
+            if skills:
+                output.append(f"\n{category}:")
+                for skill, count in sorted(skills.items(), key=lambda x: x[1], reverse=True):
+                    output.append(f"  • {skill.title()}: {count} mention(s)")
+        
+        # Role fit table
+        if report.get('role_fit'):
+            output.append("\n" + "=" * 60)
+            output.append("ROLE FIT")
+            output.append("=" * 60)
+            
+            for i, row in enumerate(report['role_fit'], 1):
+                found = len(row['matched'])
+                total = found + len(row['missing'])
+                output.append(f"\n{i}. {row['role'].replace('_', ' ').title()}: {row['fit']:.0%} "
+                              f"({found}/{total} skills, {row['mentions']} mention(s))")
+                if row['missing']:
+                    output.append(f"   Missing: {', '.join(skill.title() for skill in row['missing'])}")
+        
+        # Stage timings
+        if report.get('timings'):
+            output.append("\n" + "=" * 60)
+            output.append("TIMINGS")
+            output.append("=" * 60)
+            for stage, ms in report['timings'].items():
+                output.append(f"  {stage.title()}: {ms:.3f} ms")
+        
+        # Suggestions
+        if report['suggestions']:
+            output.append("\n" + "=" * 60)
+            output.append("IMPROVEMENT SUGGESTIONS")
+            output.append("=" * 60)
+            
+            for i, suggestion in enumerate(report['suggestions'], 1):
+                output.append(f"\n{i}. {suggestion['title']}:")
+                for skill in suggestion['skills']:
+                    output.append(f"   • {skill.title()}")
+        
+        output.append("\n" + "=" * 60)
+        return "\n".join(output)
+
+def cache_options(args):
+    """Return (path, max bytes) for the extraction cache, or None when disabled"""
+    if args.no_cache:
+        return None
+    return args.cache, args.cache_size * 1024 * 1024
+
+def analyzer_options(args):
+    """Options for the analyzers of batch worker processes"""
+    return {'cache': cache_options(args), 'max_pages': args.max_pages, 'taxonomy': args.taxonomy,
+            'timing': args.timings}
+
+def open_cache(args):
+    options = cache_options(args)
+    if options is None:
+        return None
+    try:
+        return ExtractionCache(*options)
+    except Exception as e:
+        print(f"Warning: extraction cache unavailable ({e}), continuing without it", file=sys.stderr)
+        return None
+
+def run_batch_mode(args):
+    """Analyze many resumes in parallel, writing JSON Lines as they finish."""
+    from batch import collect_pdfs, screen
+    
+    try:
+        pdf_paths = collect_pdfs(args.pdf_path, args.manifest)
+    except OSError as e:
+        print(f"Error reading manifest: {e}", file=sys.stderr)
+        return 1
+    if not pdf_paths:
+        print("Error: No PDF files found.", file=sys.stderr)
+        return 1
+    
+    # A profile only sees the process it runs in, so profiled batches run in this one
+    jobs = 1 if args.profile else args.jobs
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            failures = screen(pdf_paths, out, args.role, jobs, analyzer_options(args))
+        print(f"Results saved to: {args.output}", file=sys.stderr)
+    else:
+        failures = screen(pdf_paths, sys.stdout, args.role, jobs, analyzer_options(args))
+    if profiler is not None:
+        profiler.disable()
+        save_profile(profiler, args.profile)
+    return 1 if failures else 0
+
+def main():
+    # `index` and `query` work with the resume search index, `serve` runs the HTTP service,
+    # `analytics` summarizes batch results
+    if sys.argv[1:2] == ['serve']:
+        from service import main as serve_main
+        sys.exit(serve_main(sys.argv[2:]))
+    if sys.argv[1:2] == ['analytics']:
+        from analytics import analytics_main
+        sys.exit(analytics_main(sys.argv[2:]))
+    if sys.argv[1:2] == ['index']:
+        from index import index_main
+        sys.exit(index_main(sys.argv[2:]))
+    if sys.argv[1:2] == ['query']:
+        from index import query_main
+        sys.exit(query_main(sys.argv[2:]))
+    
+    parser = argparse.ArgumentParser(
+        description="Analyze PDF resumes for skill mentions and improvement suggestions",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python resume_analyzer.py resume.pdf
+  python resume_analyzer.py resume.pdf --role data_scientist
+  python resume_analyzer.py resume.pdf --role all
+  python resume_analyzer.py resume.pdf --output report.txt
+  python resume_analyzer.py resume.pdf --format json --output report.json
+  python resume_analyzer.py resumes/ --jobs 8 --output results.jsonl
+  python resume_analyzer.py "inbox/**/*.pdf" --role devops_engineer
+  python resume_analyzer.py --manifest resumes.txt
+  python resume_analyzer.py index resumes/ --output resumes.idx
+  python resume_analyzer.py query resumes.idx "kubernetes AND terraform AND python>=3"
+  python resume_analyzer.py analytics results.jsonl --output-dir analytics/
+        """
+    )
+    
+    parser.add_argument('pdf_path', nargs='*',
+                        help='Path to the PDF resume file, or several files, directories and glob patterns')
+    parser.add_argument('--role', choices=list(ResumeAnalyzer.ROLE_RECOMMENDATIONS) + ['all'],
+                       help="Target job role for specific recommendations, or 'all' to rank every role")
+    parser.add_argument('--format', choices=['text', 'json'], default='text',
+                       help='Output format (default: text)')
+    parser.add_argument('--output', '-o', help='Output file path (default: print to console)')
+    parser.add_argument('--manifest', help='Text file listing PDF paths to analyze, one per line')
+    parser.add_argument('--jobs', '-j', type=int,
+                        help='Worker processes for batch mode (defaults to the CPU count)')
+    parser.add_argument('--cache', default=str(DEFAULT_CACHE_PATH),
+                        help=f'Extraction cache database (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE_MB,
+                        help=f'Extraction cache size limit in MB (default: {DEFAULT_CACHE_SIZE_MB})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always extract text with PyMuPDF, without reading or filling the cache')
+    parser.add_argument('--taxonomy',
+                        help='Skill taxonomy file (.json or .yaml) to use instead of the built-in one; '
+                             'compiled once into <file>.matcher.pickle')
+    parser.add_argument('--max-pages', type=int, help='Only read the first N pages of each PDF')
+    parser.add_argument('--page-jobs', type=int, default=1,
+                        help=f'Processes that split the pages of a long PDF '
+                             f'({PARALLEL_MIN_PAGES}+ pages, single-file mode, default: 1)')
+    parser.add_argument('--timings', action='store_true',
+                        help="Time each stage (extract, normalize, count, suggest) and add it to the "
+                             "report under 'timings'; batch mode also prints mean / p95 / max per stage")
+    parser.add_argument('--profile', metavar='FILE',
+                        help='Run under cProfile and save the stats to FILE (batch mode then uses one process)')
+    
+    args = parser.parse_args()
+    
+    if not args.pdf_path and not args.manifest:
+        parser.error('a PDF path or --manifest is required')
+    
+    # Several inputs, directories, globs and manifests are screened in bulk
+    if (args.manifest or len(args.pdf_path) > 1 or Path(args.pdf_path[0]).is_dir()
+            or any(char in args.pdf_path[0] for char in '*?[')):
+        sys.exit(run_batch_mode(args))
+    
+    # Validate input file
+    pdf_path = Path(args.pdf_path[0])
+    if not pdf_path.exists():
+        print(f"Error: File '{pdf_path}' not found.")
+        sys.exit(1)
+    
+    if not pdf_path.suffix.lower() == '.pdf':
+        print(f"Error: File '{pdf_path}' is not a PDF file.")
+        sys.exit(1)
+    
+    # Create analyzer and generate report
+    try:
+        analyzer = ResumeAnalyzer(cache=open_cache(args), max_pages=args.max_pages,
+                                  page_jobs=args.page_jobs, taxonomy=args.taxonomy, timing=args.timings)
+    except (OSError, ValueError) as e:
+        print(f"Error loading taxonomy: {e}")
+        sys.exit(1)
+    
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    report = analyzer.generate_report(pdf_path, args.role, args.format)
+    if profiler is not None:
+        profiler.disable()
+        save_profile(profiler, args.profile)
+    
+    if report is None:
+        print("Error: Could not analyze the resume.")
+        sys.exit(1)
+    
+    # Output report
+    if args.output:
+        try:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(report)
+            print(f"Report saved to: {args.output}")
+        except Exception as e:
+            print(f"Error saving report: {e}")
+            sys.exit(1)
+    else:
+        print(report)
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
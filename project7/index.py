@@ -0,0 +1,299 @@
+"""
+Resume Search Index
+Stores the skill counts of analyzed resumes as an inverted index
+(skill -> posting list of resume IDs and counts) and answers AND / OR /
+threshold queries over it without touching the PDFs again.
+
+    python cli.py index resumes/ --output resumes.idx
+    python cli.py query resumes.idx "kubernetes AND terraform AND python>=3"
+"""
+
+import re
+import sys
+import json
+import time
+import pickle
+import argparse
+from array import array
+from pathlib import Path
+
+from cache import DEFAULT_CACHE_PATH, DEFAULT_CACHE_SIZE_MB
+
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = 'resumes.idx'
+
+# Query tokens: parentheses and the AND / OR operators; skills are what lies between
+QUERY_TOKEN_RE = re.compile(r'(\(|\)|\bAND\b|\bOR\b)', re.IGNORECASE)
+TERM_RE = re.compile(r'^(.*?)\s*(?:>=\s*(\d+))?$')
+
+
+class QueryError(ValueError):
+    pass
+
+
+class SkillIndex:
+    """Inverted index from skill to the resumes that mention it.
+
+    Resume IDs are positions in `files`. Each posting list is a pair of
+    arrays, the IDs in ascending order and the matching mention counts.
+    `skills` holds every skill of the taxonomy, so queries for a known
+    skill nobody mentions are told apart from typos.
+    """
+
+    def __init__(self, skills=()):
+        self.files = []
+        self.postings = {}
+        self.skills = set(skills)
+
+    @classmethod
+    def build(cls, records, skills=()):
+        """Index report records (as written by batch mode); error records are skipped."""
+        latest = {}
+        for record in records:
+            if 'skill_counts' in record:
+                # A resume analyzed twice keeps its last result
+                latest.pop(record['file'], None)
+                latest[record['file']] = record['skill_counts']
+
+        index = cls(skills)
+        for resume_id, (file, skill_counts) in enumerate(latest.items()):
+            index.files.append(file)
+            for skills in skill_counts.values():
+                for skill, count in skills.items():
+                    ids, counts = index.postings.setdefault(skill, (array('I'), array('I')))
+                    ids.append(resume_id)
+                    counts.append(count)
+        index.skills.update(index.postings)
+        return index
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump({'version': INDEX_VERSION, 'files': self.files, 'postings': self.postings,
+                         'skills': sorted(self.skills)}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if not isinstance(data, dict) or data.get('version') != INDEX_VERSION:
+            raise ValueError(f"'{path}' is not a version {INDEX_VERSION} resume index")
+        index = cls(data['skills'])
+        index.files = data['files']
+        index.postings = data['postings']
+        return index
+
+    def matching(self, skill, minimum=1):
+        """Return the set of resume IDs mentioning `skill` at least `minimum` times."""
+        ids, counts = self.postings.get(skill, ((), ()))
+        if minimum <= 1:
+            return set(ids)
+        return {resume_id for resume_id, count in zip(ids, counts) if count >= minimum}
+
+    def count(self, skill, resume_id):
+        """Return how often one resume mentions `skill` (binary search of the posting list)."""
+        ids, counts = self.postings.get(skill, ((), ()))
+        low, high = 0, len(ids)
+        while low < high:
+            middle = (low + high) // 2
+            if ids[middle] < resume_id:
+                low = middle + 1
+            else:
+                high = middle
+        return counts[low] if low < len(ids) and ids[low] == resume_id else 0
+
+    def query(self, text):
+        """Return (sorted resume IDs, skills named) for a query string."""
+        node = parse_query(text)
+        skills = query_skills(node)
+        unknown = [skill for skill in skills if skill not in self.skills]
+        if unknown:
+            raise QueryError(f"Unknown skill(s): {', '.join(unknown)}")
+        return sorted(self.evaluate(node)), skills
+
+    def evaluate(self, node):
+        kind = node[0]
+        if kind == 'term':
+            return self.matching(node[1], node[2])
+        # Smallest operands first, so AND shrinks its working set quickly
+        results = sorted((self.evaluate(child) for child in node[1]), key=len)
+        if kind == 'and':
+            result = results[0]
+            for other in results[1:]:
+                result = result & other
+            return result
+        return set().union(*results)
+
+
+def parse_query(text):
+    """Parse a query into ('and' | 'or', [children]) and ('term', skill, minimum) nodes.
+
+    AND binds tighter than OR, parentheses group, and `skill>=N` asks for
+    at least N mentions. Skills are matched case-insensitively.
+    """
+    tokens = [token.strip() for token in QUERY_TOKEN_RE.split(text) if token.strip()]
+    position = 0
+
+    def peek():
+        return tokens[position].upper() if position < len(tokens) else None
+
+    def parse_or():
+        nonlocal position
+        children = [parse_and()]
+        while peek() == 'OR':
+            position += 1
+            children.append(parse_and())
+        return children[0] if len(children) == 1 else ('or', children)
+
+    def parse_and():
+        nonlocal position
+        children = [parse_term()]
+        while peek() == 'AND':
+            position += 1
+            children.append(parse_term())
+        return children[0] if len(children) == 1 else ('and', children)
+
+    def parse_term():
+        nonlocal position
+        token = peek()
+        if token is None:
+            raise QueryError("Query ends where a skill was expected")
+        if token == '(':
+            position += 1
+            node = parse_or()
+            if peek() != ')':
+                raise QueryError("Missing ')'")
+            position += 1
+            return node
+        if token in (')', 'AND', 'OR'):
+            raise QueryError(f"Expected a skill, found '{tokens[position]}'")
+        skill, minimum = TERM_RE.match(tokens[position]).groups()
+        position += 1
+        return ('term', skill.lower(), int(minimum) if minimum else 1)
+
+    node = parse_or()
+    if position < len(tokens):
+        raise QueryError(f"Unexpected '{tokens[position]}'")
+    return node
+
+
+def query_skills(node):
+    """Return the skills a parsed query names, in order of appearance."""
+    if node[0] == 'term':
+        return [node[1]]
+    skills = []
+    for child in node[1]:
+        for skill in query_skills(child):
+            if skill not in skills:
+                skills.append(skill)
+    return skills
+
+
+def read_jsonl(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def index_main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='cli.py index',
+        description='Build a skill search index from resumes or batch results'
+    )
+    parser.add_argument('pdf_path', nargs='*', help='PDF files, directories and glob patterns to analyze')
+    parser.add_argument('--manifest', help='Text file listing PDF paths to analyze, one per line')
+    parser.add_argument('--from-jsonl', action='append', default=[], metavar='FILE',
+                        help='Index the records of a batch run instead of analyzing PDFs (repeatable)')
+    parser.add_argument('--output', '-o', default=DEFAULT_INDEX_PATH,
+                        help=f'Index file to write (default: {DEFAULT_INDEX_PATH})')
+    parser.add_argument('--jobs', '-j', type=int, help='Worker processes (defaults to the CPU count)')
+    parser.add_argument('--cache', default=str(DEFAULT_CACHE_PATH),
+                        help=f'Extraction cache database (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE_MB,
+                        help=f'Extraction cache size limit in MB (default: {DEFAULT_CACHE_SIZE_MB})')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the extraction cache')
+    parser.add_argument('--taxonomy', help='Skill taxonomy file (.json or .yaml) to use instead of the built-in one')
+    args = parser.parse_args(argv)
+
+    if not (args.pdf_path or args.manifest or args.from_jsonl):
+        parser.error('PDF paths, --manifest or --from-jsonl is required')
+
+    start = time.perf_counter()
+    records = []
+    try:
+        for path in args.from_jsonl:
+            records.extend(read_jsonl(path))
+    except (OSError, ValueError) as e:
+        print(f"Error reading batch results: {e}", file=sys.stderr)
+        return 1
+
+    if args.pdf_path or args.manifest:
+        from batch import collect_pdfs, run_batch
+        from cli import cache_options
+        options = {
+            'cache': cache_options(args),
+            'taxonomy': args.taxonomy,
+        }
+        for record in run_batch(collect_pdfs(args.pdf_path, args.manifest), workers=args.jobs,
+                                options=options):
+            if 'error' in record:
+                print(f"Error: {record['file']}: {record['error']}", file=sys.stderr)
+            records.append(record)
+
+    from cli import ResumeAnalyzer
+    try:
+        skill_categories = ResumeAnalyzer(taxonomy=args.taxonomy).skill_categories
+    except (OSError, ValueError) as e:
+        print(f"Error loading taxonomy: {e}", file=sys.stderr)
+        return 1
+    skills = [skill for skills in skill_categories.values() for skill in skills]
+    index = SkillIndex.build(records, skills)
+    index.save(args.output)
+    size = Path(args.output).stat().st_size
+    print(f"Indexed {len(index.files)} resume(s), {len(index.postings)} skill(s) into "
+          f"'{args.output}' ({size / 1024:.1f} KB) in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+def query_main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='cli.py query',
+        description='Find indexed resumes by skill',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  cli.py query resumes.idx "kubernetes AND terraform AND python>=3"
+  cli.py query resumes.idx "(aws OR gcp OR azure) AND docker" --format json
+        """
+    )
+    parser.add_argument('index', help='Index file written by the index subcommand')
+    parser.add_argument('query', help="Skills joined with AND / OR, parentheses, and 'skill>=N' thresholds")
+    parser.add_argument('--limit', type=int, help='Print at most N matches')
+    parser.add_argument('--format', choices=['text', 'json'], default='text', help='Output format (default: text)')
+    args = parser.parse_args(argv)
+
+    try:
+        index = SkillIndex.load(args.index)
+    except (OSError, ValueError, pickle.UnpicklingError) as e:
+        print(f"Error: Could not load index: {e}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    try:
+        resume_ids, skills = index.query(args.query)
+    except QueryError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = (time.perf_counter() - start) * 1000
+
+    shown = resume_ids[:args.limit] if args.limit is not None else resume_ids
+    for resume_id in shown:
+        counts = {skill: index.count(skill, resume_id) for skill in skills}
+        if args.format == 'json':
+            print(json.dumps({'file': index.files[resume_id], 'skill_counts': counts}))
+        else:
+            mentions = ', '.join(f"{skill}={count}" for skill, count in counts.items())
+            print(f"{index.files[resume_id]}  {mentions}")
+    print(f"{len(resume_ids)} of {len(index.files)} resume(s) matched in {elapsed:.2f} ms", file=sys.stderr)
+    return 0
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Skill Matcher
+Compiles every skill variation into one Aho-Corasick automaton so a resume
+is scanned once, instead of once per variation. Taxonomies kept in YAML or
+JSON files are compiled once into a pickled matcher artifact that later
+runs load instead, until the taxonomy (or this file) changes.
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import hashlib
+import argparse
+from pathlib import Path
+
+try:
+    import yaml
+except ImportError:  # Only needed for YAML taxonomies
+    yaml = None
+
+
+# This file, hashed so that a changed matcher invalidates every artifact
+MATCHER_SOURCE = Path(__file__)
+
+
+def is_word_char(char):
+    """True for characters that regex ``\\w`` matches (the empty string is not one)."""
+    return char.isalnum() or char == '_'
+
+
+class SkillMatcher:
+    """Count skill mentions with the same results as one ``\\b<variation>\\b`` findall per variation.
+
+    The automaton reports every occurrence of every variation. An
+    occurrence counts when both of its ends sit on a word boundary, and,
+    like ``re.findall``, occurrences of the same variation may not overlap
+    (the leftmost one wins). Different variations are counted
+    independently, so "ruby on rails" also counts "ruby" and "rails".
+    """
+
+    def __init__(self, skill_categories):
+        self.categories = list(skill_categories)
+        # (category, skill) for every skill, in taxonomy order
+        self.skills = [(category, skill)
+                       for category, skills in skill_categories.items()
+                       for skill in skills]
+
+        # One pattern per distinct variation, listing the skills it counts for
+        self.patterns = []
+        self.targets = []
+        pattern_ids = {}
+        for index, (category, skill) in enumerate(self.skills):
+            for variation in skill_categories[category][skill]:
+                variation = variation.lower()
+                if variation not in pattern_ids:
+                    pattern_ids[variation] = len(self.patterns)
+                    self.patterns.append(variation)
+                    self.targets.append([])
+                self.targets[pattern_ids[variation]].append(index)
+
+        # Whether each pattern starts and ends with a word character
+        self.word_start = [is_word_char(pattern[:1]) for pattern in self.patterns]
+        self.word_end = [is_word_char(pattern[-1:]) for pattern in self.patterns]
+
+        self.build_automaton()
+
+    @classmethod
+    def from_state(cls, state):
+        """Recreate a matcher from the attributes of a compiled one, without rebuilding it."""
+        matcher = cls.__new__(cls)
+        matcher.__dict__.update(state)
+        return matcher
+
+    def build_automaton(self):
+        """Build the trie, its failure links and the merged output lists."""
+        goto = [{}]
+        outputs = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(pattern_id)
+
+        # Breadth-first, so a state's failure target is finished before it
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for char, next_state in goto[state].items():
+                target = fail[state]
+                while target and char not in goto[target]:
+                    target = fail[target]
+                fail[next_state] = goto[target].get(char, 0)
+                outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+                queue.append(next_state)
+
+        self.goto = goto
+        self.fail = fail
+        # (pattern id, length) pairs per state, so matching needs no lookups
+        self.outputs = [tuple((pattern_id, len(self.patterns[pattern_id])) for pattern_id in output)
+                        for output in outputs]
+
+    def counter(self):
+        """Return a SkillCounter for text that arrives in pieces."""
+        return SkillCounter(self)
+
+    def count_variations(self, text):
+        """Return the number of counted occurrences of each pattern in `text`."""
+        counter = self.counter()
+        counter.feed(text)
+        return counter.finish()
+
+    def count_skills(self, text):
+        """Return {category: {skill: count}} for the skills found in normalized `text`."""
+        return self.skill_counts(self.count_variations(text))
+
+    def skill_counts(self, variation_counts):
+        """Fold per-pattern counts into {category: {skill: count}}, in taxonomy order."""
+        skill_totals = [0] * len(self.skills)
+        for pattern_id, count in enumerate(variation_counts):
+            if count:
+                for index in self.targets[pattern_id]:
+                    skill_totals[index] += count
+
+        skill_counts = {category: {} for category in self.categories}
+        for (category, skill), count in zip(self.skills, skill_totals):
+            if count > 0:
+                skill_counts[category][skill] = count
+        return skill_counts
+
+
+class SkillCounter:
+    """Runs a SkillMatcher over text fed in consecutive pieces.
+
+    Counts are the same as for the pieces joined together: the automaton
+    state carries over, the last characters are kept so an occurrence can
+    look back across the join, and an occurrence ending exactly at the end
+    of a piece waits for the next piece's first character.
+    """
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.counts = [0] * len(matcher.patterns)
+        # End of the last counted occurrence of each pattern
+        self.last_end = [0] * len(matcher.patterns)
+        self.longest = max(map(len, matcher.patterns), default=0)
+        self.state = 0
+        self.length = 0
+        self.tail = ''
+        # (pattern id, end) of occurrences waiting for the character after them
+        self.pending = []
+
+    def settle(self, after):
+        """Decide the pending occurrences now that the character after them is known."""
+        word_end, counts, last_end = self.matcher.word_end, self.counts, self.last_end
+        for pattern_id, end in self.pending:
+            if after != word_end[pattern_id]:
+                counts[pattern_id] += 1
+                last_end[pattern_id] = end
+        self.pending = []
+
+    def feed(self, chunk):
+        if not chunk:
+            return
+        if self.pending:
+            self.settle(is_word_char(chunk[0]))
+
+        matcher = self.matcher
+        goto, fail, outputs = matcher.goto, matcher.fail, matcher.outputs
+        word_start, word_end = matcher.word_start, matcher.word_end
+        counts, last_end, pending = self.counts, self.last_end, self.pending
+        text = self.tail + chunk
+        # Absolute position of text[0]
+        base = self.length - len(self.tail)
+        length = len(text)
+        state = self.state
+
+        for position, char in enumerate(chunk, len(self.tail)):
+            transitions = goto[state]
+            while state and char not in transitions:
+                state = fail[state]
+                transitions = goto[state]
+            state = transitions.get(char, 0)
+            if not state or not outputs[state]:
+                continue
+
+            end = position + 1
+            for pattern_id, pattern_length in outputs[state]:
+                start = end - pattern_length
+                if start + base < last_end[pattern_id]:
+                    continue
+                before = start + base > 0 and is_word_char(text[start - 1])
+                if before == word_start[pattern_id]:
+                    continue
+                if end == length:
+                    pending.append((pattern_id, end + base))
+                    continue
+                if is_word_char(text[end]) == word_end[pattern_id]:
+                    continue
+                counts[pattern_id] += 1
+                last_end[pattern_id] = end + base
+
+        self.state = state
+        self.length += len(chunk)
+        self.tail = text[-self.longest:] if self.longest else ''
+
+    def finish(self):
+        """Close the text and return the number of counted occurrences of each pattern."""
+        self.settle(False)
+        return self.counts
+
+    def skill_counts(self):
+        return self.matcher.skill_counts(self.finish())
+
+
+def load_taxonomy(path):
+    """Read a {category: {skill: [variations]}} taxonomy from a JSON or YAML file."""
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix.lower() in ('.yaml', '.yml'):
+            if yaml is None:
+                raise ValueError("PyYAML not found. Install with: pip install PyYAML")
+            taxonomy = yaml.safe_load(f)
+        else:
+            taxonomy = json.load(f)
+
+    if not isinstance(taxonomy, dict):
+        raise ValueError(f"'{path}' must map categories to skills")
+    for category, skills in taxonomy.items():
+        if not isinstance(skills, dict):
+            raise ValueError(f"Category '{category}' must map skills to lists of variations")
+        for skill, variations in skills.items():
+            if (not isinstance(variations, list) or not variations
+                    or not all(isinstance(variation, str) and variation for variation in variations)):
+                raise ValueError(f"Skill '{skill}' must list one or more variations")
+    return taxonomy
+
+
+def default_artifact_path(taxonomy_path):
+    """Keep the compiled matcher next to its taxonomy file."""
+    taxonomy_path = Path(taxonomy_path)
+    return taxonomy_path.with_name(taxonomy_path.name + '.matcher.pickle')
+
+
+def taxonomy_digest(taxonomy_path):
+    """Hash the taxonomy file together with the matcher source that compiles it."""
+    digest = hashlib.sha256()
+    digest.update(MATCHER_SOURCE.read_bytes())
+    digest.update(Path(taxonomy_path).read_bytes())
+    return digest.hexdigest()
+
+
+def load_matcher(taxonomy_path, artifact_path=None):
+    """Return (skill_categories, matcher, rebuilt) for a taxonomy file.
+
+    The compiled matcher is loaded from its artifact when the artifact's
+    hash still matches; otherwise the taxonomy is compiled and the
+    artifact rewritten. An artifact that cannot be written is skipped.
+    """
+    artifact_path = Path(artifact_path or default_artifact_path(taxonomy_path))
+    version = taxonomy_digest(taxonomy_path)
+    try:
+        with open(artifact_path, 'rb') as f:
+            artifact = pickle.load(f)
+        if artifact.get('version') == version:
+            return artifact['skill_categories'], SkillMatcher.from_state(artifact['matcher']), False
+    except Exception:
+        # Missing, stale or unreadable artifacts are rebuilt
+        pass
+
+    skill_categories = load_taxonomy(taxonomy_path)
+    matcher = SkillMatcher(skill_categories)
+    artifact = {'version': version, 'skill_categories': skill_categories, 'matcher': matcher.__dict__}
+    temp_path = artifact_path.with_name(f'{artifact_path.name}.{os.getpid()}.tmp')
+    try:
+        with open(temp_path, 'wb') as f:
+            pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, artifact_path)
+    except OSError:
+        pass
+    return skill_categories, matcher, True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compile a skill taxonomy into a matcher artifact and compare start-up times'
+    )
+    parser.add_argument('taxonomy', help='Taxonomy file (.json, .yaml or .yml)')
+    parser.add_argument('--artifact', help='Artifact path (defaults to <taxonomy>.matcher.pickle)')
+    args = parser.parse_args()
+
+    try:
+        start = time.perf_counter()
+        skill_categories = load_taxonomy(args.taxonomy)
+        matcher = SkillMatcher(skill_categories)
+        compile_seconds = time.perf_counter() - start
+
+        load_matcher(args.taxonomy, args.artifact)
+        start = time.perf_counter()
+        _, _, rebuilt = load_matcher(args.taxonomy, args.artifact)
+        load_seconds = time.perf_counter() - start
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    skills = sum(len(skills) for skills in skill_categories.values())
+    print(f"Taxonomy: {len(skill_categories)} categories, {skills} skills, "
+          f"{len(matcher.patterns)} variations, {len(matcher.goto)} automaton states")
+    print(f"Parsing and compiling: {compile_seconds * 1000:8.1f} ms")
+    print(f"Loading the artifact:  {load_seconds * 1000:8.1f} ms"
+          + (" (could not be written, compiled again)" if rebuilt else ""))
+    print(f"Start-up time saved:   {(compile_seconds - load_seconds) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,310 @@
+"""
+Resume Analysis Service
+Keeps warm analyzers in a bounded pool of worker processes behind an
+asyncio HTTP front end, so an upload costs only its own analysis.
+
+    POST /analyze?role=devops_engineer   PDF body (raw or multipart), report JSON out
+    GET  /stats                          request counts and per-stage latencies
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from email.parser import BytesParser
+from email.policy import HTTP
+from urllib.parse import urlsplit, parse_qs
+
+from cli import ResumeAnalyzer, fitz
+from timing import STAGES, StageTimer, summarize
+
+
+STATUS_TEXT = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 422: 'Unprocessable Entity', 500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+# What PyMuPDF raises for damaged or unsupported files
+PDF_ERRORS = (RuntimeError, getattr(getattr(fitz, 'mupdf', None), 'FzErrorBase', RuntimeError))
+
+# Analyzer reused by every upload analyzed in this worker process
+_worker_analyzer = None
+
+
+def _init_worker(max_pages=None, taxonomy=None):
+    global _worker_analyzer
+    _worker_analyzer = ResumeAnalyzer(max_pages=max_pages, taxonomy=taxonomy)
+
+
+def analyze_upload(data, filename, job_role=None):
+    """Analyze PDF bytes; return (report JSON bytes, {stage: seconds})."""
+    if _worker_analyzer is None:
+        _init_worker()
+    analyzer = _worker_analyzer
+    timer = StageTimer()
+
+    with timer.stage('extract'):
+        try:
+            text = analyzer.read_pdf_text(filename, data)
+        except PDF_ERRORS as e:
+            # As a ValueError, it reaches the service the same way from any PyMuPDF version
+            raise ValueError(f'Could not read PDF: {e}')
+    if not text:
+        raise ValueError("No text could be extracted")
+    with timer.stage('normalize'):
+        normalized = analyzer.normalize_text(text)
+    with timer.stage('count'):
+        skill_counts = analyzer.matcher.count_skills(normalized)
+    with timer.stage('suggest'):
+        report = analyzer.build_report(filename, skill_counts, len(text), job_role)
+    return (json.dumps(report, indent=2) + '\n').encode('utf-8'), timer.seconds
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def read_upload(headers, body):
+    """Return (PDF bytes, file name) from a raw or multipart/form-data body."""
+    content_type = headers.get('content-type', '')
+    if not content_type.startswith('multipart/form-data'):
+        return body, None
+    message = BytesParser(policy=HTTP).parsebytes(
+        b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body)
+    for part in message.iter_parts():
+        if part.get_filename() or part.get_param('name', header='content-disposition') == 'file':
+            return part.get_payload(decode=True) or b'', part.get_filename()
+    raise HttpError(400, 'No file part in the upload')
+
+
+class AnalysisService:
+    """Admission control, worker pool and metrics shared by all connections.
+
+    Everything here runs on the event loop thread, so the counters need
+    no locks. At most `queue_limit` uploads are admitted at once (running
+    or waiting for a worker); the rest are turned away with 503.
+    """
+
+    def __init__(self, workers=None, queue_limit=32, max_body=20 * 1024 * 1024,
+                 max_pages=None, taxonomy=None, timeout=30.0, latency_window=10000):
+        self.workers = workers or os.cpu_count() or 1
+        self.worker_args = (max_pages, taxonomy)
+        self.executor = self.start_pool()
+        self.queue_limit = queue_limit
+        self.max_body = max_body
+        self.timeout = timeout
+        self.roles = set(ResumeAnalyzer.ROLE_RECOMMENDATIONS) | {'all'}
+        self.latencies = {stage: deque(maxlen=latency_window) for stage in STAGES + ('queue', 'total')}
+        self.admitted = 0
+        self.requests = 0
+        self.rejected = 0
+        self.errors = 0
+        self.restarts = 0
+        self.started = time.time()
+        self.quiet = False
+
+    def start_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=self.worker_args)
+
+    async def analyze(self, data, filename, job_role):
+        if self.admitted >= self.queue_limit:
+            self.rejected += 1
+            raise HttpError(503, f'Too many uploads in progress (limit {self.queue_limit})')
+        self.admitted += 1
+        start = time.perf_counter()
+        executor = self.executor
+        try:
+            loop = asyncio.get_running_loop()
+            body, timings = await loop.run_in_executor(executor, analyze_upload, data, filename, job_role)
+        except BrokenProcessPool:
+            # A worker died (e.g. PyMuPDF crashed on this file); every upload
+            # it took down fails, and the first to get here starts a new pool
+            if self.executor is executor:
+                self.restarts += 1
+                self.executor = self.start_pool()
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise HttpError(503, 'Analyzer worker crashed; retry the upload')
+        except ValueError as e:
+            raise HttpError(422, str(e))
+        finally:
+            self.admitted -= 1
+
+        total = time.perf_counter() - start
+        for stage, seconds in timings.items():
+            self.latencies[stage].append(seconds)
+        self.latencies['queue'].append(max(total - sum(timings.values()), 0.0))
+        self.latencies['total'].append(total)
+        return body
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'pool_restarts': self.restarts,
+            'in_flight': self.admitted,
+            'queue_limit': self.queue_limit,
+            'workers': self.workers,
+            'uptime_seconds': int(time.time() - self.started),
+            'latency_ms': {stage: summarize(samples, 1000) for stage, samples in self.latencies.items()},
+        }
+
+    async def route(self, method, target, headers, body):
+        """Return (status, content type, body) for one request."""
+        url = urlsplit(target)
+        if url.path == '/stats':
+            if method != 'GET':
+                raise HttpError(405, 'Use GET')
+            return 200, 'application/json', json.dumps(self.stats()).encode('utf-8')
+        if url.path != '/analyze':
+            raise HttpError(404, 'Not found')
+        if method != 'POST':
+            raise HttpError(405, 'Use POST')
+
+        query = parse_qs(url.query)
+        job_role = query.get('role', [None])[0]
+        if job_role is not None and job_role not in self.roles:
+            raise HttpError(400, f"Unknown role '{job_role}'")
+        data, filename = read_upload(headers, body)
+        if not data:
+            raise HttpError(400, 'Empty upload')
+        filename = query.get('filename', [filename or 'upload.pdf'])[0]
+        return 200, 'application/json', await self.analyze(data, filename, job_role)
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until it closes (HTTP/1.1 keep-alive)."""
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), self.timeout)
+                if not request_line.strip():
+                    break
+                keep_alive = await self.handle_request(request_line, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            # E.g. a header line over the stream limit: answer before closing
+            self.errors += 1
+            print(f'Unexpected error: {e!r}', file=sys.stderr)
+            self.respond(writer, 500, 'application/json', b'{"error": "Internal server error"}', False)
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, request_line, reader, writer):
+        """Read one request, answer it, and return whether to keep the connection."""
+        try:
+            method, target, version = request_line.decode('latin-1').split()
+        except ValueError:
+            self.respond(writer, 400, 'application/json', b'{"error": "Malformed request line"}', False)
+            return False
+
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), self.timeout)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        keep_alive = (headers.get('connection', '').lower() != 'close'
+                      and version.upper() == 'HTTP/1.1')
+
+        self.requests += 1
+        start = time.perf_counter()
+        try:
+            length = int(headers.get('content-length') or 0)
+            if length > self.max_body:
+                # The body is left unread, so the connection cannot be reused
+                raise HttpError(413, f'Upload larger than {self.max_body} bytes')
+            body = await asyncio.wait_for(reader.readexactly(length), self.timeout) if length else b''
+            status, content_type, payload = await self.route(method, target, headers, body)
+        except HttpError as e:
+            self.errors += e.status != 503
+            status, content_type = e.status, 'application/json'
+            payload = json.dumps({'error': str(e)}).encode('utf-8')
+            keep_alive = keep_alive and e.status != 413
+        except ValueError:
+            self.errors += 1
+            status, content_type, payload = 400, 'application/json', b'{"error": "Bad Content-Length"}'
+            keep_alive = False
+        except Exception as e:
+            self.errors += 1
+            print(f'Unexpected error in {method} {target}: {e!r}', file=sys.stderr)
+            status, content_type, payload = 500, 'application/json', b'{"error": "Internal server error"}'
+            keep_alive = False
+
+        self.respond(writer, status, content_type, payload, keep_alive)
+        if not self.quiet:
+            print(f'{method} {target} {status} {(time.perf_counter() - start) * 1000:.1f} ms', file=sys.stderr)
+        return keep_alive
+
+    def respond(self, writer, status, content_type, payload, keep_alive):
+        head = (f'HTTP/1.1 {status} {STATUS_TEXT.get(status, "")}\r\n'
+                f'Content-Type: {content_type}\r\n'
+                f'Content-Length: {len(payload)}\r\n'
+                f'Connection: {"keep-alive" if keep_alive else "close"}\r\n')
+        if status == 503:
+            head += 'Retry-After: 1\r\n'
+        writer.write(head.encode('latin-1') + b'\r\n' + payload)
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+async def serve(service, host, port):
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Serving on http://{address[0]}:{address[1]} (POST /analyze, GET /stats) "
+          f"with {service.workers} worker(s)", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='cli.py serve',
+        description='Serve resume analysis over HTTP',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  curl --data-binary @resume.pdf "http://127.0.0.1:8080/analyze?role=data_scientist"
+  curl -F file=@resume.pdf http://127.0.0.1:8080/analyze
+  curl http://127.0.0.1:8080/stats
+        """
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser.add_argument('--jobs', '-j', type=int, help='Analyzer worker processes (defaults to the CPU count)')
+    parser.add_argument('--queue-limit', type=int, default=32,
+                        help='Uploads admitted at once, running or waiting; more get 503 (default: 32)')
+    parser.add_argument('--max-upload-mb', type=float, default=20, help='Largest accepted upload (default: 20)')
+    parser.add_argument('--max-pages', type=int, help='Only read the first N pages of each PDF')
+    parser.add_argument('--taxonomy', help='Skill taxonomy file (.json or .yaml) to use instead of the built-in one')
+    parser.add_argument('--quiet', '-q', action='store_true', help='Do not log each request')
+    args = parser.parse_args(argv)
+
+    service = AnalysisService(workers=args.jobs, queue_limit=args.queue_limit,
+                              max_body=int(args.max_upload_mb * 1024 * 1024),
+                              max_pages=args.max_pages, taxonomy=args.taxonomy)
+    service.quiet = args.quiet
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        print("Shutting down", file=sys.stderr)
+    finally:
+        service.shutdown()
+    return 0
@@ -0,0 +1,91 @@
+"""
+Stage Timings
+Wall-clock time spent in each stage of a resume analysis, and summaries
+of those timings over a batch or a running service.
+"""
+
+import sys
+import time
+import pstats
+from contextlib import contextmanager
+
+
+# Stages of an analysis, in pipeline order
+STAGES = ('extract', 'normalize', 'count', 'suggest')
+
+
+class StageTimer:
+    """Seconds spent in each stage of one analysis.
+
+    Analyzers only create one when timing is enabled; every timed code
+    path checks for None first, so disabled timing costs nothing.
+    """
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+
+    def add(self, stage, seconds):
+        self.seconds[stage] += seconds
+
+    @contextmanager
+    def stage(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[stage] += time.perf_counter() - start
+
+    def timed_iter(self, stage, iterable):
+        """Yield from `iterable`, charging the time spent producing each item to `stage`."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.seconds[stage] += time.perf_counter() - start
+                return
+            self.seconds[stage] += time.perf_counter() - start
+            yield item
+
+    def as_ms(self):
+        """Return {stage: milliseconds} plus the total, as stored under a report's 'timings' key."""
+        timings = {stage: round(seconds * 1000, 3) for stage, seconds in self.seconds.items()}
+        timings['total'] = round(sum(self.seconds.values()) * 1000, 3)
+        return timings
+
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def summarize(samples, scale=1):
+    """Mean, p50, p95 and max of some durations, multiplied by `scale`."""
+    values = sorted(samples)
+    return {
+        'samples': len(values),
+        'mean': round(sum(values) / len(values) * scale, 3) if values else 0.0,
+        'p50': round(percentile(values, 0.50) * scale, 3),
+        'p95': round(percentile(values, 0.95) * scale, 3),
+        'max': round(values[-1] * scale, 3) if values else 0.0,
+    }
+
+
+def print_timing_summary(summary, out=sys.stderr):
+    """Print a per-stage table of mean / p95 / max milliseconds."""
+    if not summary:
+        return
+    print(f"{'stage':<10} {'mean ms':>10} {'p95 ms':>10} {'max ms':>10}", file=out)
+    for stage, stats in summary.items():
+        print(f"{stage:<10} {stats['mean']:>10.3f} {stats['p95']:>10.3f} {stats['max']:>10.3f}", file=out)
+
+
+def save_profile(profiler, path, out=sys.stderr, limit=15):
+    """Write cProfile stats to `path` and print the top functions by cumulative time."""
+    profiler.dump_stats(path)
+    print(f"Profile saved to: {path}", file=out)
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)